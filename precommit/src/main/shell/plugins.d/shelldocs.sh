@@ -35,6 +35,8 @@ if [[ -z ${SHELLDOCS} ]]; then
 fi
 
 SHELLDOCS_SPECIFICFILES=""
+SHELLDOCS_BATCH=false
+SHELLDOCS_CACHE=false
 
 function shelldocs_usage
 {
@@ -78,6 +80,23 @@ function shelldocs_precheck
     delete_test shelldocs
     return 0
   fi
+
+  # older versions of shelldocs can only lint one file per run.
+  # they treat - as a file name and fail to read it, whereas an
+  # empty list is no work at all for a newer one.
+  if [[ -z $("${SHELLDOCS}" --input - --lint < /dev/null 2>&1) ]]; then
+    SHELLDOCS_BATCH=true
+  else
+    yetus_debug "shelldocs: ${SHELLDOCS} cannot read a list of files; linting one file at a time"
+    SHELLDOCS_BATCH=false
+  fi
+
+  if "${SHELLDOCS}" --help 2>/dev/null | "${GREP}" -q -- '--cache-dir'; then
+    SHELLDOCS_CACHE=true
+  else
+    yetus_debug "shelldocs: ${SHELLDOCS} has no --cache-dir; not caching"
+    SHELLDOCS_CACHE=false
+  fi
 }
 
 function shelldocs_private_findbash
@@ -103,9 +122,44 @@ function shelldocs_private_findbash
   echo ${list} ${SHELLDOCS_SPECIFICFILES} | tr ' ' '\n' | sort -u
 }
 
+## @description  lint a list of files with a single shelldocs run
+## @audience     private
+## @stability    evolving
+## @replaceable  no
+## @param        outputfile
+## @param        filename [..]
+function shelldocs_private_lint
+{
+  declare output=$1
+  declare i
+  declare -a cacheargs
+  shift
+
+  if [[ $# -eq 0 ]]; then
+    return 0
+  fi
+
+  if [[ "${SHELLDOCS_BATCH}" != true ]]; then
+    for i in "$@"; do
+      "${SHELLDOCS}" --input "${i}" --lint >> "${output}" 2>&1
+    done
+    return 0
+  fi
+
+  if [[ "${SHELLDOCS_CACHE}" == true ]]; then
+    # the cache is shared by the branch and patch runs, so the
+    # second one only has to parse what the patch changed
+    cacheargs=(--cache-dir "${PATCH_DIR}/shelldocs-cache")
+  fi
+
+  printf '%s\0' "$@" \
+    | "${SHELLDOCS}" "${cacheargs[@]}" --input - --lint >> "${output}" 2>&1
+}
+
 function shelldocs_preapply
 {
   declare i
+  declare -a files
 
   if ! verify_needed_test shelldocs; then
     return 0
@@ -119,9 +173,10 @@ function shelldocs_preapply
   pushd "${BASEDIR}" >/dev/null || return 1
   for i in $(shelldocs_private_findbash); do
     if [[ -f ${i} ]]; then
-      "${SHELLDOCS}" --input "${i}" --lint >> "${PATCH_DIR}/branch-shelldocs-result.txt" 2>&1
+      files+=("${i}")
     fi
   done
+  shelldocs_private_lint "${PATCH_DIR}/branch-shelldocs-result.txt" "${files[@]}"
   popd > /dev/null || return 1
 
   # keep track of how much as elapsed for us already
@@ -132,6 +187,7 @@ function shelldocs_preapply
 function shelldocs_postapply
 {
   declare i
+  declare -a files
 
   if ! verify_needed_test shelldocs; then
     return 0
@@ -162,9 +218,10 @@ function shelldocs_postapply
     fi
 
     if [[ -f ${i} ]]; then
-      "${SHELLDOCS}" --input "${i}" --lint >> "${PATCH_DIR}/patch-shelldocs-result.txt" 2>&1
+      files+=("${i}")
     fi
   done
+  shelldocs_private_lint "${PATCH_DIR}/patch-shelldocs-result.txt" "${files[@]}"
 
   root_postlog_compare \
     shelldocs \
@@ -22,5 +22,6 @@
 sys.dont_write_bytecode = True
 # pylint: disable=wrong-import-position,import-self
 import releasedocmaker
-#pylint: disable=no-member
-releasedocmaker.main()
+if __name__ == "__main__":
+    #pylint: disable=no-member
+    releasedocmaker.main()
@@ -16,29 +16,34 @@
 # limitations under the License.
 """ Generate releasenotes based upon JIRA """
 
-import errno
-import http.client
+import collections
+import hashlib
 import json
 import logging
 import os
 import pathlib
-import re
-import shutil
+import queue
 import sys
-import urllib.error
-import urllib.parse
-import urllib.request
+import threading
 
-from glob import glob
+from concurrent.futures import Future, ThreadPoolExecutor
+from glob import glob, escape as glob_escape
 from argparse import ArgumentParser
-from time import gmtime, strftime, sleep
+from time import gmtime, strftime
 
 sys.dont_write_bytecode = True
 # pylint: disable=wrong-import-position
-from .getversions import GetVersions, ReleaseVersion
-from .jira import (Jira, JiraIter, Linter, RELEASE_VERSION, SORTTYPE,
-                   SORTORDER, BACKWARD_INCOMPATIBLE_LABEL, NUM_RETRIES)
-from .utils import get_jira, to_unicode, sanitize_text, processrelnote, Outputs
+from . import lintreport
+from .cache import ResponseCache
+from .getversions import GetVersions, ReleaseVersion, VersionIndex
+from .syncstore import SyncStore
+from .telemetry import METRICS
+from .jira import (Jira, JiraIter, Linter, ISSUE_CACHE, SORTTYPE,
+                   SORTORDER, BACKWARD_INCOMPATIBLE_LABEL, NUM_THREADS,
+                   set_retries, sort_key)
+from .sanitize import sanitize_text, processrelnote
+from .utils import (get_jira, to_unicode, Outputs, POOL, get_cache,
+                    set_cache)
 # pylint: enable=wrong-import-position
 
 # These are done in order of preference as to which one seems to be
@@ -48,6 +53,13 @@
 
 EXTENSION = '.md'
 
+# options that change what a version's files look like.  Only these
+# go into the --sync-db digest, so that e.g. a different --threads
+# does not cause everything to be written again.
+OUTPUT_OPTIONS = ('empty', 'extension', 'incompatible_label', 'license',
+                  'projectfiles', 'skip_credits', 'sortorder', 'sorttype',
+                  'title', 'versiondirs', 'versionfiles')
+
 ASF_LICENSE = '''
 <!---
 # Licensed to the Apache Software Foundation (ASF) under one
@@ -69,11 +81,22 @@
 '''
 
 
-def indexbuilder(title, asf_license, format_string):
+def versiondirs(outdir, pattern):
+    """the names of the things in outdir that match pattern"""
+    return [
+        os.path.basename(name)
+        for name in glob(os.path.join(glob_escape(outdir), pattern))
+    ]
+
+
+def indexbuilder(outdir, title, asf_license, format_string,
+                 extension=EXTENSION):
     """Write an index file for later conversion using mvn site"""
-    versions = glob("*[0-9]*.[0-9]*")
-    versions = sorted(versions, reverse=True, key=ReleaseVersion)
-    with open("index" + EXTENSION, "w", encoding='utf-8') as indexfile:
+    versions = versiondirs(outdir, "*[0-9]*.[0-9]*")
+    versions = ReleaseVersion.sort(versions, reverse=True)
+    with open(os.path.join(outdir, "index" + extension),
+              "w",
+              encoding='utf-8') as indexfile:
         if asf_license is True:
             indexfile.write(ASF_LICENSE)
         for version in versions:
@@ -84,28 +107,31 @@ def indexbuilder(title, asf_license, format_string):
                     (k, version, k.upper().replace(" ", ""), version))
 
 
-def buildprettyindex(title, asf_license):
+def buildprettyindex(outdir, title, asf_license, extension=EXTENSION):
     """Write an index file for later conversion using middleman"""
-    indexbuilder(title, asf_license, "    * [%s](%s/%s.%s)\n")
+    indexbuilder(outdir, title, asf_license, "    * [%s](%s/%s.%s)\n",
+                 extension)
 
 
-def buildindex(title, asf_license):
+def buildindex(outdir, title, asf_license, extension=EXTENSION):
     """Write an index file for later conversion using mvn site"""
-    indexbuilder(title, asf_license, "    * [%s](%s/%s.%s.html)\n")
+    indexbuilder(outdir, title, asf_license, "    * [%s](%s/%s.%s.html)\n",
+                 extension)
 
 
-def buildreadme(title, asf_license):
+def buildreadme(outdir, title, asf_license, extension=EXTENSION):
     """Write an index file for Github using README.md"""
-    versions = glob("[0-9]*.[0-9]*")
-    versions = sorted(versions, reverse=True, key=ReleaseVersion)
-    with open("README.md", "w", encoding='utf-8') as indexfile:
+    versions = versiondirs(outdir, "[0-9]*.[0-9]*")
+    versions = ReleaseVersion.sort(versions, reverse=True)
+    with open(os.path.join(outdir, "README.md"), "w",
+              encoding='utf-8') as indexfile:
         if asf_license is True:
             indexfile.write(ASF_LICENSE)
         for version in versions:
             indexfile.write(f"* {title} v{version}\n")
             for k in ("Changelog", "Release Notes"):
                 indexfile.write(
-                    f"    * [{k}]({version}/{k.upper().replace(' ', '')}.{version}{EXTENSION})\n"
+                    f"    * [{k}]({version}/{k.upper().replace(' ', '')}.{version}{extension})\n"
                 )
 
 
@@ -129,11 +155,30 @@ def getversion():
     return 'Unknown'
 
 
-def parse_args():  # pylint: disable=too-many-branches
-    """Parse command-line arguments with optparse."""
+def parse_args(argv=None, prog='releasedocmaker'):  # pylint: disable=too-many-branches, too-many-statements
+    """Parse command-line arguments (sys.argv by default) with argparse."""
+    if argv is None:
+        argv = sys.argv[1:]
     parser = ArgumentParser(
-        prog='releasedocmaker',
+        prog=prog,
         epilog="--project and --version may be given multiple times.")
+    parser.add_argument("--cache-dir",
+                        dest="cache_dir",
+                        type=str,
+                        help="Keep a cache of JIRA responses in this directory")
+    parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        default=512,
+        type=int,
+        help="Maximum size of the response cache in MB (default: 512)")
+    parser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        default=3600,
+        type=int,
+        help="Seconds before a cached response is checked with JIRA again "
+        "(default: 3600)")
     parser.add_argument("--dirversions",
                         dest="versiondirs",
                         action="store_true",
@@ -167,6 +212,19 @@ def parse_args():  # pylint: disable=too-many-branches
                         action="store_true",
                         default=False,
                         help="Add an ASF license")
+    parser.add_argument("--manifest",
+                        dest="manifest",
+                        metavar="FILE",
+                        help="Run every entry of a JSON or TOML manifest")
+    parser.add_argument("--metrics-file",
+                        dest="metrics_file",
+                        metavar="FILE",
+                        help="Write timings and request counts as JSON")
+    parser.add_argument("--metrics-summary",
+                        dest="metrics_summary",
+                        action="store_true",
+                        default=False,
+                        help="Log a summary of timings and request counts")
     parser.add_argument("-p",
                         "--project",
                         dest="projects",
@@ -174,6 +232,16 @@ def parse_args():  # pylint: disable=too-many-branches
                         type=str,
                         help="projects in JIRA to include in releasenotes",
                         metavar="PROJECT")
+    parser.add_argument("--offline",
+                        dest="offline",
+                        action="store_true",
+                        default=False,
+                        help="Only use responses from the cache")
+    parser.add_argument("--projectfiles",
+                        dest="projectfiles",
+                        action="store_true",
+                        default=False,
+                        help="Also write files for each project")
     parser.add_argument("--prettyindex",
                         dest="prettyindex",
                         action="store_true",
@@ -199,6 +267,12 @@ def parse_args():  # pylint: disable=too-many-branches
                         default=SORTTYPE,
                         choices=["resolutiondate", "issueid"],
                         help=f"Sorting type for issues (default: {SORTTYPE})")
+    parser.add_argument(
+        "--sync-db",
+        dest="sync_db",
+        type=str,
+        help="Keep issues in this SQLite database and only fetch changes "
+        "on later runs")
     parser.add_argument(
         "-t",
         "--projecttitle",
@@ -236,7 +310,6 @@ def parse_args():  # pylint: disable=too-many-branches
                         dest="base_url",
                         action="append",
                         type=str,
-                        default='https://issues.apache.org/jira',
                         help="specify base URL of the JIRA instance.")
     parser.add_argument(
         "--retries",
@@ -244,6 +317,36 @@ def parse_args():  # pylint: disable=too-many-branches
         action="append",
         type=int,
         help="Specify how many times to retry connection for each URL.")
+    parser.add_argument(
+        "--threads",
+        dest="threads",
+        default=NUM_THREADS,
+        type=int,
+        help=
+        f"Number of concurrent requests to make to JIRA (default: {NUM_THREADS})"
+    )
+    parser.add_argument(
+        "--prefetch",
+        dest="prefetch",
+        default=0,
+        type=int,
+        metavar="N",
+        help="Fetch issues N versions at a time in the background while "
+        "writing (default: all versions in one query)")
+    parser.add_argument(
+        "--render-jobs",
+        dest="render_jobs",
+        default=1,
+        type=int,
+        metavar="N",
+        help="Write up to N versions at once in separate processes "
+        "(default: 1)")
+    parser.add_argument(
+        "--skip-archived",
+        dest="skip_archived",
+        action="store_true",
+        default=False,
+        help="With --range, leave out versions that are archived in JIRA")
     parser.add_argument(
         "--skip-credits",
         dest="skip_credits",
@@ -256,23 +359,38 @@ def parse_args():  # pylint: disable=too-many-branches
         "-X",
         "--incompatiblelabel",
         dest="incompatible_label",
-        default="backward-incompatible",
+        default=BACKWARD_INCOMPATIBLE_LABEL,
         type=str,
         help="Specify the label to indicate backward incompatibility.")
 
     Linter.add_parser_options(parser)
 
-    if len(sys.argv) <= 1:
+    if not argv:
         parser.print_help()
         sys.exit(1)
 
-    options = parser.parse_args()
+    options = parser.parse_args(argv)
 
     # Handle the version string right away and exit
     if options.release_version:
         logging.info(getversion())
         sys.exit(0)
 
+    if options.manifest is not None:
+        # everything else is checked entry by entry, see run_manifest()
+        options.argv = []
+        skip = False
+        for arg in argv:
+            if skip:
+                skip = False
+            elif arg == '--manifest':
+                skip = True
+            elif not arg.startswith('--manifest='):
+                options.argv.append(arg)
+        if options.offline and options.cache_dir is None:
+            parser.error("--offline requires --cache-dir")
+        return options
+
     # Validate options
     if not options.release_version:
         if options.versions is None:
@@ -280,14 +398,31 @@ def parse_args():  # pylint: disable=too-many-branches
         if options.projects is None:
             parser.error("At least one project needs to be supplied")
         if options.base_url is None:
-            parser.error("Base URL must be defined")
+            options.base_url = 'https://issues.apache.org/jira'
+        elif len(options.base_url) > 1:
+            parser.error("Only one base URL should be given")
+        else:
+            options.base_url = options.base_url[0]
+        if options.offline and options.cache_dir is None:
+            parser.error("--offline requires --cache-dir")
+        if options.threads < 1:
+            parser.error("--threads must be at least 1")
+        if options.prefetch < 0:
+            parser.error("--prefetch must not be negative")
+        if options.render_jobs < 1:
+            parser.error("--render-jobs must be at least 1")
         if options.output_directory is not None:
             if len(options.output_directory) > 1:
                 parser.error("Only one output directory should be given")
             else:
                 options.output_directory = options.output_directory[0]
 
-    if options.range or len(options.versions) > 1:
+    if options.lint_only:
+        if not options.lint:
+            options.lint = ["all"]
+    elif options.lint_json is not None or options.lint_junit is not None:
+        parser.error("--lint-json and --lint-junit require --lint-only")
+    elif options.range or len(options.versions) > 1:
         if not options.versiondirs and not options.versionfiles:
             parser.error(
                 "Multiple versions require either --fileversions or --dirversions"
@@ -306,18 +441,357 @@ def generate_changelog_line_md(base_url, jira):
     return line
 
 
-def main():  # pylint: disable=too-many-statements, too-many-branches, too-many-locals
-    """ hey, it's main """
-    global BACKWARD_INCOMPATIBLE_LABEL  #pylint: disable=global-statement
-    global SORTTYPE  #pylint: disable=global-statement
-    global SORTORDER  #pylint: disable=global-statement
-    global NUM_RETRIES  #pylint: disable=global-statement
-    global EXTENSION  #pylint: disable=global-statement
+def outputpattern(options):
+    """the output directory, ready to be used in a % format"""
+    if options.output_directory is None:
+        return ""
+    return os.path.join(options.output_directory, "").replace("%", "%%")
+
+
+def project_keys(options):
+    """ the projects that get files of their own """
+    if options.projectfiles:
+        return [project.upper() for project in options.projects]
+    return []
+
+
+def output_files(options, params):
+    """ every file that a version is written to """
+    dirpart = outputpattern(options) + ("%(ver)s/"
+                                        if options.versiondirs else "")
+    verpart = ".%(ver)s" if options.versionfiles else ""
+    files = []
+    for name in ("CHANGELOG", "RELEASENOTES"):
+        files.append(f"{dirpart}{name}{verpart}%(ext)s" % params)
+        for key in project_keys(options):
+            files.append(f"{dirpart}{name}.{key}{verpart}%(ext)s" % params)
+    return files
+
+
+def render_version(options, version, jlist, params):  # pylint: disable=too-many-statements, too-many-branches, too-many-locals
+    """Write the RELEASENOTES and CHANGELOG for a single version.
+    Returns the lint report if lint failed and nothing was written,
+    otherwise None.  Runs in a worker process with --render-jobs, so
+    everything it needs is passed in."""
+    vstr = str(version)
+    linter = Linter(vstr, options)
+    jirakey = sort_key(options.sorttype, options.sortorder)
+    dirpart = outputpattern(options) + ("%(ver)s/"
+                                        if options.versiondirs else "")
+    verpart = ".%(ver)s" if options.versionfiles else ""
+
+    keys = project_keys(options)
+
+    reloutputs = Outputs(f"{dirpart}RELEASENOTES{verpart}%(ext)s",
+                         f"{dirpart}RELEASENOTES.%(key)s{verpart}%(ext)s",
+                         keys, params)
+    choutputs = Outputs(f"{dirpart}CHANGELOG{verpart}%(ext)s",
+                        f"{dirpart}CHANGELOG.%(key)s{verpart}%(ext)s", keys,
+                        params)
+
+    if options.license is True:
+        reloutputs.write_all(ASF_LICENSE)
+        choutputs.write_all(ASF_LICENSE)
+
+    relhead = '# %(title)s %(key)s %(ver)s Release Notes\n\n' \
+              'These release notes cover new developer and user-facing ' \
+              'incompatibilities, important issues, features, and major improvements.\n\n'
+    chhead = '# %(title)s Changelog\n\n' \
+             '## Release %(ver)s - %(date)s\n'\
+             '\n'
+
+    reloutputs.write_all(relhead)
+    choutputs.write_all(chhead)
+
+    incompatlist = []
+    importantlist = []
+    buglist = []
+    improvementlist = []
+    newfeaturelist = []
+    subtasklist = []
+    tasklist = []
+    testlist = []
+    otherlist = []
+
+    for jira in jlist:
+        if jira.get_incompatible_change():
+            incompatlist.append(jira)
+        elif jira.get_important():
+            importantlist.append(jira)
+        elif jira.get_type() == "Bug":
+            buglist.append(jira)
+        elif jira.get_type() == "Improvement":
+            improvementlist.append(jira)
+        elif jira.get_type() == "New Feature":
+            newfeaturelist.append(jira)
+        elif jira.get_type() == "Sub-task":
+            subtasklist.append(jira)
+        elif jira.get_type() == "Task":
+            tasklist.append(jira)
+        elif jira.get_type() == "Test":
+            testlist.append(jira)
+        else:
+            otherlist.append(jira)
+
+        line = generate_changelog_line_md(options.base_url, jira)
+
+        if jira.get_release_note() or \
+           jira.get_incompatible_change() or jira.get_important():
+            reloutputs.write_key_raw(jira.get_project(), "\n---\n\n")
+            reloutputs.write_key_raw(jira.get_project(), line)
+            if not jira.get_release_note():
+                line = '\n**WARNING: No release note provided for this change.**\n\n'
+            else:
+                line = f'\n{processrelnote(jira.get_release_note())}\n\n'
+            reloutputs.write_key_raw(jira.get_project(), line)
+
+        linter.lint(jira)
+
+    if linter.enabled:
+        if linter.had_errors():
+            reloutputs.discard()
+            choutputs.discard()
+            return linter.message()
+
+    reloutputs.write_all("\n\n")
+    reloutputs.close()
+
+    if options.skip_credits:
+        change_header21 = "| JIRA | Summary | Priority | " + \
+                 "Component |\n"
+        change_header22 = "|:---- |:---- | :--- |:---- |\n"
+    else:
+        change_header21 = "| JIRA | Summary | Priority | " + \
+                     "Component | Reporter | Contributor |\n"
+        change_header22 = "|:---- |:---- | :--- |:---- |:---- |:---- |\n"
+
+    sections = [
+        ("### INCOMPATIBLE CHANGES:\n\n", [incompatlist]),
+        ("\n\n### IMPORTANT ISSUES:\n\n", [importantlist]),
+        ("\n\n### NEW FEATURES:\n\n", [newfeaturelist]),
+        ("\n\n### IMPROVEMENTS:\n\n", [improvementlist]),
+        ("\n\n### BUG FIXES:\n\n", [buglist]),
+        ("\n\n### TESTS:\n\n", [testlist]),
+        ("\n\n### SUB-TASKS:\n\n", [subtasklist]),
+        ("\n\n### OTHER:\n\n", [otherlist, tasklist]),
+    ]
+    for heading, lists in sections:
+        rows = []
+        for mylist in lists:
+            rows.extend(
+                Outputs.format_list(mylist, options.skip_credits,
+                                    options.base_url, jirakey))
+        # each file only gets the sections it has issues for
+        choutputs.write_rows(heading + change_header21 + change_header22,
+                             rows)
+
+    choutputs.write_all("\n\n")
+    choutputs.close()
+    return None
+
+
+def lint_versions(options, versions):
+    """--lint-only: lint the versions without writing any documents.
+    Returns True if lint failed for any of them."""
+    names = [JiraIter.fix_version_name(version) for version in versions]
+    with METRICS.phase('fetch'):
+        buckets = JiraIter.collect_lint(options.base_url, names,
+                                        options.projects, options.threads,
+                                        options.incompatible_label)
+    jirakey = sort_key(options.sorttype, options.sortorder)
+
+    haderrors = False
+    linters = []
+    for version in versions:
+        with METRICS.phase('sort'):
+            jlist = sorted(buckets[JiraIter.fix_version_name(version)],
+                           key=jirakey)
+        METRICS.version(options.projects, version, len(jlist))
+        if not jlist and not options.empty:
+            logging.warning(
+                "There is no issue which has the specified version: %s",
+                version)
+            continue
+
+        linter = Linter(str(version), options)
+        with METRICS.phase('lint'):
+            for jira in jlist:
+                linter.lint(jira)
+        linters.append(linter)
+        if linter.had_errors():
+            logging.error(linter.message())
+            haderrors = True
 
+    if options.lint_json is not None:
+        lintreport.write_json(linters, options.lint_json)
+    if options.lint_junit is not None:
+        lintreport.write_junit(linters, options.lint_junit)
+    return haderrors
+
+
+def init_render_worker():
+    """ set up a --render-jobs worker process """
     logging.basicConfig(format='%(message)s', level=logging.DEBUG)
-    options = parse_args()
 
-    if options.output_directory is not None:
+
+def start_render_pool(jobs):
+    """ the worker processes for --render-jobs """
+    # multiprocessing is only loaded when there is more than one job
+    import multiprocessing  # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    return ProcessPoolExecutor(max_workers=jobs,
+                               mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_render_worker)
+
+
+def render_worker(options, version, jlist, params):
+    """render_version() in a --render-jobs worker.  The time spent
+    is handed back, since the worker's METRICS are not the parent's."""
+    with METRICS.phase('render'):
+        result = render_version(options, version, jlist, params)
+    return result, METRICS.take()
+
+
+def finish_render(options, store, fix_version, digest, result):  # pylint: disable=too-many-arguments
+    """Wait for a version to be written and record the outcome.
+    Returns True if lint failed."""
+    if isinstance(result, Future):
+        result, phases = result.result()
+        METRICS.merge(phases)
+    if result is not None:
+        logging.error(result)
+        return True
+    if store is not None:
+        store.set_digest(options.base_url, options.projects, fix_version,
+                         digest)
+    return False
+
+
+def prefetch_versions(options, versions, store):
+    """Generate (version, issues by fix version) for each version.
+
+    With --prefetch, issues are fetched a window of N versions at a time
+    by a background thread, so that the next window downloads while the
+    current one is being written.  At most one finished window waits to
+    be written, which keeps memory bounded."""
+    names = [JiraIter.fix_version_name(version) for version in versions]
+
+    def collect(window):
+        with METRICS.phase('fetch'):
+            return JiraIter.collect_versions(options.base_url, window,
+                                             options.projects,
+                                             options.threads, store,
+                                             options.incompatible_label)
+
+    if options.prefetch == 0:
+        # one query for all of the versions, split up by fix version
+        buckets = collect(names)
+        for version in versions:
+            yield version, buckets
+        return
+
+    step = options.prefetch
+    windows = [(versions[pos:pos + step], names[pos:pos + step])
+               for pos in range(0, len(versions), step)]
+    results = queue.Queue(maxsize=1)
+
+    def producer():
+        for window, wanted in windows:
+            try:
+                results.put((window, collect(wanted)))
+            except BaseException as err:  # pylint: disable=broad-except
+                # handed to the consumer, which re-raises it,
+                # so that sys.exit() in get_jira still works
+                results.put((None, err))
+                return
+
+    threading.Thread(target=producer, daemon=True).start()
+    for _ in windows:
+        window, buckets = results.get()
+        if window is None:
+            raise buckets
+        for version in window:
+            yield version, buckets
+
+
+def load_manifest(filename):
+    """Read a JSON or (with Python 3.11 or later) TOML manifest"""
+    try:
+        with open(filename, 'rb') as manifestfile:
+            if filename.endswith('.toml'):
+                try:
+                    import tomllib  # pylint: disable=import-outside-toplevel
+                except ImportError:
+                    logging.error("TOML manifests require Python 3.11 or "
+                                  "later. Use JSON instead.")
+                    sys.exit(1)
+                manifest = tomllib.load(manifestfile)
+            else:
+                manifest = json.load(manifestfile)
+    except (OSError, ValueError) as err:
+        logging.error("Unable to read manifest %s: %s", filename, err)
+        sys.exit(1)
+    if not isinstance(manifest.get('projects'), list):
+        logging.error("Manifest %s does not have a list of projects",
+                      filename)
+        sys.exit(1)
+    return manifest
+
+
+def manifest_args(entry):
+    """turn a manifest entry into command line arguments, using the
+    long option names as keys"""
+    args = []
+    for name, value in entry.items():
+        for item in value if isinstance(value, list) else [value]:
+            if item is True:
+                args.append(f"--{name}")
+            elif item is not False and item is not None:
+                args.append(f"--{name}={item}")
+    return args
+
+
+def run_manifest(options, store):
+    """Run every entry of a manifest in this process, sharing
+    connections, field maps, version lists and issues between them.
+    Returns True if any entry had lint errors."""
+    manifest = load_manifest(options.manifest)
+    defaults = manifest.get('defaults', {})
+    shared = ('cache_dir', 'cache_size', 'cache_ttl', 'offline', 'sync_db',
+              'metrics_file', 'metrics_summary', 'retries')
+
+    entries = []
+    for num, entry in enumerate(manifest['projects'], start=1):
+        args = dict(defaults)
+        args.update(entry)
+        entryoptions = parse_args(
+            options.argv + manifest_args(args),
+            prog=f"releasedocmaker (manifest entry {num})")
+        for name in shared:
+            if getattr(entryoptions, name) != getattr(options, name):
+                logging.error(
+                    "Manifest entry %d: %s can only be given on the "
+                    "command line", num, name)
+                sys.exit(1)
+        entries.append(entryoptions)
+
+    jobs = manifest.get('jobs', NUM_THREADS)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = [executor.submit(run, entry, store) for entry in entries]
+        return any([result.result() for result in results])
+
+
+def run(options, store=None):  # pylint: disable=too-many-statements, too-many-branches, too-many-locals
+    """Generate the documents for a single set of options.
+    Returns True if there were lint errors."""
+    if store is not None:
+        fingerprint = json.dumps(
+            {name: getattr(options, name)
+             for name in OUTPUT_OPTIONS},
+            sort_keys=True)
+
+    outdir = options.output_directory or "."
+    if options.output_directory is not None and not options.lint_only:
         # Create the output directory if it does not exist.
         try:
             outputpath = pathlib.Path(options.output_directory).resolve()
@@ -326,264 +800,208 @@ def main():  # pylint: disable=too-many-statements, too-many-branches, too-many-
             logging.error("Unable to create output directory %s: %s, %s",
                           options.output_directory, exc.errno, exc.strerror)
             sys.exit(1)
-        os.chdir(options.output_directory)
-
-    if options.incompatible_label is not None:
-        BACKWARD_INCOMPATIBLE_LABEL = options.incompatible_label
-
-    if options.extension is not None:
-        EXTENSION = options.extension
 
     projects = options.projects
 
-    if options.range is True:
-        versions = GetVersions(options.versions, projects,
-                               options.base_url).getlist()
-    else:
-        versions = [ReleaseVersion(v) for v in options.versions]
-    versions = sorted(versions)
+    with METRICS.phase('versions'):
+        # names, release dates, etc. of every version of the projects
+        index = VersionIndex(projects, options.base_url, options.threads)
+
+        if options.range is True:
+            versions = GetVersions(
+                options.versions,
+                projects,
+                options.base_url,
+                index=index,
+                archived=not options.skip_archived).getlist()
+        else:
+            versions = options.versions
+        versions = [ReleaseVersion(v) for v in ReleaseVersion.sort(versions)]
 
-    SORTTYPE = options.sorttype
-    SORTORDER = options.sortorder
+    # computed once, rather than on every comparison
+    jirakey = sort_key(options.sorttype, options.sortorder)
 
     if options.title is None:
         title = projects[0]
     else:
         title = options.title
 
-    if options.retries is not None:
-        NUM_RETRIES = options.retries[0]
+    if options.lint_only:
+        return lint_versions(options, versions)
 
     haderrors = False
 
-    for version in versions:
+    # versions handed to render_version() but not finished yet.  They
+    # are finished strictly in order, so that lint reports come out
+    # the same way no matter how many workers there are.
+    pending = collections.deque()
+    renderpool = None
+    if options.render_jobs > 1:
+        # report bad lint filters once, rather than from every worker
+        Linter(None, options)
+        renderpool = start_render_pool(options.render_jobs)
+
+    for version, buckets in prefetch_versions(options, versions, store):
         vstr = str(version)
-        linter = Linter(vstr, options)
-        jlist = sorted(JiraIter(options.base_url, vstr, projects))
+        jiras = JiraIter(options.base_url,
+                         vstr,
+                         projects,
+                         options.threads,
+                         store,
+                         jiras=buckets[JiraIter.fix_version_name(vstr)],
+                         incompatible_label=options.incompatible_label)
+        with METRICS.phase('sort'):
+            jlist = sorted(jiras, key=jirakey)
+        METRICS.version(projects, version, len(jlist))
         if not jlist and not options.empty:
             logging.warning(
                 "There is no issue which has the specified version: %s",
                 version)
             continue
 
-        if vstr in RELEASE_VERSION:
-            reldate = RELEASE_VERSION[vstr]
+        if index.release_date(vstr) is not None:
+            reldate = index.release_date(vstr)
         elif options.usetoday:
             reldate = strftime("%Y-%m-%d", gmtime())
         else:
             reldate = f"Unreleased (as of {strftime('%Y-%m-%d', gmtime())})"
 
-        if not os.path.exists(vstr) and options.versiondirs:
-            os.mkdir(vstr)
-
-        if options.versionfiles and options.versiondirs:
-            reloutputs = Outputs(
-                "%(ver)s/RELEASENOTES.%(ver)s%(ext)s",
-                "%(ver)s/RELEASENOTES.%(key)s.%(ver)s%(ext)s", [], {
-                    "ver": version,
-                    "date": reldate,
-                    "title": title,
-                    "ext": EXTENSION
-                })
-            choutputs = Outputs("%(ver)s/CHANGELOG.%(ver)s%(ext)s",
-                                "%(ver)s/CHANGELOG.%(key)s.%(ver)s%(ext)s", [],
-                                {
-                                    "ver": version,
-                                    "date": reldate,
-                                    "title": title,
-                                    "ext": EXTENSION
-                                })
-        elif options.versiondirs:
-            reloutputs = Outputs("%(ver)s/RELEASENOTES%(ext)s",
-                                 "%(ver)s/RELEASENOTES.%(key)s%(ext)s", [], {
-                                     "ver": version,
-                                     "date": reldate,
-                                     "title": title,
-                                     "ext": EXTENSION
-                                 })
-            choutputs = Outputs("%(ver)s/CHANGELOG%(ext)s",
-                                "%(ver)s/CHANGELOG.%(key)s%(ext)s", [], {
-                                    "ver": version,
-                                    "date": reldate,
-                                    "title": title,
-                                    "ext": EXTENSION
-                                })
-        elif options.versionfiles:
-            reloutputs = Outputs("RELEASENOTES.%(ver)s%(ext)s",
-                                 "RELEASENOTES.%(key)s.%(ver)s%(ext)s", [], {
-                                     "ver": version,
-                                     "date": reldate,
-                                     "title": title,
-                                     "ext": EXTENSION
-                                 })
-            choutputs = Outputs("CHANGELOG.%(ver)s%(ext)s",
-                                "CHANGELOG.%(key)s.%(ver)s%(ext)s", [], {
-                                    "ver": version,
-                                    "date": reldate,
-                                    "title": title,
-                                    "ext": EXTENSION
-                                })
+        params = {
+            "ver": version,
+            "date": reldate,
+            "title": title,
+            "ext": options.extension
+        }
+
+        if store is not None:
+            digest = hashlib.sha256(
+                f"{jiras.digest()} {reldate} {fingerprint}".encode(
+                    'utf-8')).hexdigest()
+            if store.digest(options.base_url, projects,
+                            jiras.fix_version) == digest and all(
+                                os.path.exists(filename) for filename in
+                                output_files(options, params)):
+                logging.info("Nothing has changed for %s, skipping it.",
+                             version)
+                continue
         else:
-            reloutputs = Outputs("RELEASENOTES%(ext)s",
-                                 "RELEASENOTES.%(key)s%(ext)s", [], {
-                                     "ver": version,
-                                     "date": reldate,
-                                     "title": title,
-                                     "ext": EXTENSION
-                                 })
-            choutputs = Outputs("CHANGELOG%(ext)s", "CHANGELOG.%(key)s%(ext)s",
-                                [], {
-                                    "ver": version,
-                                    "date": reldate,
-                                    "title": title,
-                                    "ext": EXTENSION
-                                })
-
-        if options.license is True:
-            reloutputs.write_all(ASF_LICENSE)
-            choutputs.write_all(ASF_LICENSE)
-
-        relhead = '# %(title)s %(key)s %(ver)s Release Notes\n\n' \
-                  'These release notes cover new developer and user-facing ' \
-                  'incompatibilities, important issues, features, and major improvements.\n\n'
-        chhead = '# %(title)s Changelog\n\n' \
-                 '## Release %(ver)s - %(date)s\n'\
-                 '\n'
-
-        reloutputs.write_all(relhead)
-        choutputs.write_all(chhead)
-
-        incompatlist = []
-        importantlist = []
-        buglist = []
-        improvementlist = []
-        newfeaturelist = []
-        subtasklist = []
-        tasklist = []
-        testlist = []
-        otherlist = []
-
-        for jira in jlist:
-            if jira.get_incompatible_change():
-                incompatlist.append(jira)
-            elif jira.get_important():
-                importantlist.append(jira)
-            elif jira.get_type() == "Bug":
-                buglist.append(jira)
-            elif jira.get_type() == "Improvement":
-                improvementlist.append(jira)
-            elif jira.get_type() == "New Feature":
-                newfeaturelist.append(jira)
-            elif jira.get_type() == "Sub-task":
-                subtasklist.append(jira)
-            elif jira.get_type() == "Task":
-                tasklist.append(jira)
-            elif jira.get_type() == "Test":
-                testlist.append(jira)
-            else:
-                otherlist.append(jira)
+            digest = None
 
-            line = generate_changelog_line_md(options.base_url, jira)
+        if renderpool is None:
+            with METRICS.phase('render'):
+                result = render_version(options, version, jlist, params)
+        else:
+            result = renderpool.submit(render_worker, options, version,
+                                       jlist, params)
+        pending.append((jiras.fix_version, digest, result))
 
-            if jira.get_release_note() or \
-               jira.get_incompatible_change() or jira.get_important():
-                reloutputs.write_key_raw(jira.get_project(), "\n---\n\n")
-                reloutputs.write_key_raw(jira.get_project(), line)
-                if not jira.get_release_note():
-                    line = '\n**WARNING: No release note provided for this change.**\n\n'
-                else:
-                    line = f'\n{processrelnote(jira.get_release_note())}\n\n'
-                reloutputs.write_key_raw(jira.get_project(), line)
+        # don't let the workers fall too far behind
+        while len(pending) > 2 * (options.render_jobs - 1):
+            if finish_render(options, store, *pending.popleft()):
+                haderrors = True
 
-            linter.lint(jira)
+    while pending:
+        if finish_render(options, store, *pending.popleft()):
+            haderrors = True
 
-        if linter.enabled:
-            if linter.had_errors():
-                logging.error(linter.message())
-                haderrors = True
-                if os.path.exists(vstr):
-                    shutil.rmtree(vstr)
-                continue
+    if renderpool is not None:
+        renderpool.shutdown()
 
-        reloutputs.write_all("\n\n")
-        reloutputs.close()
+    with METRICS.phase('index'):
+        if options.index:
+            buildindex(outdir, title, options.license, options.extension)
+            buildreadme(outdir, title, options.license, options.extension)
 
-        if options.skip_credits:
-            change_header21 = "| JIRA | Summary | Priority | " + \
-                     "Component |\n"
-            change_header22 = "|:---- |:---- | :--- |:---- |\n"
-        else:
-            change_header21 = "| JIRA | Summary | Priority | " + \
-                         "Component | Reporter | Contributor |\n"
-            change_header22 = "|:---- |:---- | :--- |:---- |:---- |:---- |\n"
-
-        if incompatlist:
-            choutputs.write_all("### INCOMPATIBLE CHANGES:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(incompatlist, options.skip_credits,
-                                 options.base_url)
-
-        if importantlist:
-            choutputs.write_all("\n\n### IMPORTANT ISSUES:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(importantlist, options.skip_credits,
-                                 options.base_url)
-
-        if newfeaturelist:
-            choutputs.write_all("\n\n### NEW FEATURES:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(newfeaturelist, options.skip_credits,
-                                 options.base_url)
-
-        if improvementlist:
-            choutputs.write_all("\n\n### IMPROVEMENTS:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(improvementlist, options.skip_credits,
-                                 options.base_url)
-
-        if buglist:
-            choutputs.write_all("\n\n### BUG FIXES:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(buglist, options.skip_credits,
-                                 options.base_url)
-
-        if testlist:
-            choutputs.write_all("\n\n### TESTS:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(testlist, options.skip_credits,
-                                 options.base_url)
-
-        if subtasklist:
-            choutputs.write_all("\n\n### SUB-TASKS:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(subtasklist, options.skip_credits,
-                                 options.base_url)
-
-        if tasklist or otherlist:
-            choutputs.write_all("\n\n### OTHER:\n\n")
-            choutputs.write_all(change_header21)
-            choutputs.write_all(change_header22)
-            choutputs.write_list(otherlist, options.skip_credits,
-                                 options.base_url)
-            choutputs.write_list(tasklist, options.skip_credits,
-                                 options.base_url)
-
-        choutputs.write_all("\n\n")
-        choutputs.close()
-
-    if options.index:
-        buildindex(title, options.license)
-        buildreadme(title, options.license)
-
-    if options.prettyindex:
-        buildprettyindex(title, options.license)
+        if options.prettyindex:
+            buildprettyindex(outdir, title, options.license,
+                             options.extension)
+
+    return haderrors
+
+
+def write_metrics(options):
+    """ --metrics-file and --metrics-summary """
+    stats = POOL.stats()
+    cache = get_cache()
+    if cache is not None:
+        lookups = cache.hits + cache.misses
+        cachestats = {
+            'hits': cache.hits,
+            'misses': cache.misses,
+            'hit_rate': cache.hits / lookups if lookups else 0.0
+        }
+    else:
+        cachestats = None
+    report = METRICS.report({
+        'releasedocmaker': getversion().strip(),
+        'http': {
+            'requests': stats['requests'],
+            'connections': stats['connections'],
+            'bytes': METRICS.count('bytes_received'),
+            'retries': METRICS.count('retries')
+        },
+        'cache': cachestats,
+        'issue_cache': {
+            'hits': ISSUE_CACHE.hits
+        }
+    })
+    if options.metrics_file is not None:
+        try:
+            METRICS.write_json(report, options.metrics_file)
+        except OSError as err:
+            logging.error("Unable to write %s: %s", options.metrics_file,
+                          err)
+            sys.exit(1)
+    if options.metrics_summary:
+        for line in METRICS.summary(report):
+            logging.info(line)
+
+
+def main():
+    """ hey, it's main """
+    logging.basicConfig(format='%(message)s', level=logging.DEBUG)
+    options = parse_args()
+
+    if options.cache_dir is not None:
+        set_cache(
+            ResponseCache(options.cache_dir,
+                          ttl=options.cache_ttl,
+                          max_size=options.cache_size * 1024 * 1024,
+                          offline=options.offline))
+
+    store = None
+    if options.sync_db is not None:
+        store = SyncStore(options.sync_db)
+
+    if options.retries is not None:
+        set_retries(options.retries[0])
+
+    if options.manifest is not None:
+        haderrors = run_manifest(options, store)
+    else:
+        haderrors = run(options, store)
+
+    if store is not None:
+        store.close()
+
+    if options.metrics_file is not None or options.metrics_summary:
+        write_metrics(options)
+
+    if options.lint_only:
+        if haderrors:
+            sys.exit(1)
+        return
+
+    stats = POOL.stats()
+    logging.debug("Made %d requests to JIRA over %d connections",
+                  stats['requests'], stats['connections'])
+    if ISSUE_CACHE.hits:
+        logging.debug("Reused %d issues fetched earlier in this run",
+                      ISSUE_CACHE.hits)
+    if options.cache_dir is not None:
+        cache = get_cache()
+        logging.debug("Response cache: %d hits, %d misses", cache.hits,
+                      cache.misses)
 
     if haderrors is True:
         sys.exit(1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" On-disk cache of JIRA responses """
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+
+CACHE_SUFFIX = '.rdmcache'
+
+
+class OfflineCacheMiss(Exception):
+    """A request could not be answered without going to the server"""
+
+
+class CacheEntry:  # pylint: disable=too-few-public-methods
+    """A response as it was stored in the cache"""
+    def __init__(self, path, header, body):
+        self.path = path
+        self.url = header['url']
+        self.fetched = header['fetched']
+        self.etag = header.get('etag')
+        self.last_modified = header.get('last_modified')
+        self.body = body
+
+    def validators(self):
+        """ headers to turn a request into a conditional one """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Store response bodies on disk, keyed by request.
+
+    Entries younger than ttl seconds are used as-is.  Older ones are
+    revalidated with ETag/Last-Modified when the server supplied them.
+    The least recently used entries are removed once the cache
+    grows past max_size bytes."""
+    def __init__(self, directory, ttl=3600, max_size=512 * 1024 * 1024,
+                 offline=False):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size
+                         for entry in self.directory.glob('*' + CACHE_SUFFIX))
+
+    @staticmethod
+    def key(method, url, body=None, auth=None):
+        """ build a cache key for a request """
+        digest = hashlib.sha256()
+        for part in (method, url, body, auth):
+            if part is None:
+                part = b''
+            elif isinstance(part, str):
+                part = part.encode('utf-8')
+            digest.update(part)
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory.joinpath(key + CACHE_SUFFIX)
+
+    def lookup(self, key):
+        """ return the CacheEntry for key or None """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cachefile:
+                header = json.loads(cachefile.readline())
+                body = cachefile.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(path, header, body)
+
+    def fresh(self, entry):
+        """ can this entry be used without asking the server? """
+        return self.offline or time.time() - entry.fetched < self.ttl
+
+    def touch(self, entry):
+        """ mark an entry as recently used """
+        self.hit()
+        now = time.time()
+        try:
+            os.utime(entry.path, (now, now))
+        except OSError:
+            pass
+
+    def revalidated(self, entry, etag=None, last_modified=None):
+        """ the server says entry is still current: restart its ttl and
+            keep the validators the 304 came with, if any """
+        self.hit()
+        self.store_entry(entry.path, entry.url, entry.body,
+                         etag or entry.etag, last_modified
+                         or entry.last_modified)
+
+    def hit(self):
+        """ count a request answered from the cache """
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        """ count a request that had to go to the server """
+        with self._lock:
+            self.misses += 1
+
+    def store(self, key, url, body, etag=None, last_modified=None):  # pylint: disable=too-many-arguments
+        """ add (or replace) a response in the cache """
+        self.store_entry(self._path(key), url, body, etag, last_modified)
+
+    def store_entry(self, path, url, body, etag=None, last_modified=None):  # pylint: disable=too-many-arguments
+        """ write a cache file atomically and keep the cache in bounds """
+        header = {'url': url, 'fetched': time.time()}
+        if etag:
+            header['etag'] = etag
+        if last_modified:
+            header['last_modified'] = last_modified
+        headerline = json.dumps(header).encode('utf-8') + b'\n'
+
+        try:
+            oldsize = path.stat().st_size
+        except OSError:
+            oldsize = 0
+
+        handle, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as tmpfile:
+                tmpfile.write(headerline)
+                tmpfile.write(body)
+            os.replace(tmpname, path)
+        except OSError:
+            try:
+                os.unlink(tmpname)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._size += len(headerline) + len(body) - oldsize
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """ remove least recently used entries until under max_size """
+        entries = []
+        for path in self.directory.glob('*' + CACHE_SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self._size = sum(entry[1] for entry in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_size:
+                break
+            try:
+                path.unlink()
+                self._size -= size
+            except OSError:
+                pass
@@ -16,30 +16,75 @@
 # limitations under the License.
 """ Handle versions in JIRA """
 
-import copy
 import http.client
 import json
 import logging
 import re
 import sys
+import threading
 import urllib.error
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .jira import NUM_THREADS
 from .utils import get_jira
 
+PROJECT_VERSIONS = {}
+PROJECT_VERSIONS_LOCK = threading.Lock()
+
 class ReleaseVersion:
-    ''' a very simple version handler '''
+    ''' a very simple version handler
+
+        Instances are immutable and shared: ReleaseVersion('1.0')
+        always returns the same object.  Everything needed to compare
+        two versions is worked out once, when that object is built.
+    '''
 
-    def __init__(self, version=None):
-        self.rawversion = version
-        self.rawcomponents = re.split('[ \\.]', version)
-        self.intcomponents = []
-        for value in self.rawcomponents:
+    __slots__ = ('rawversion', 'rawcomponents', 'intcomponents', '_key')
+
+    _CACHE = {}
+
+    def __new__(cls, version=None):
+        version = str(version)
+        try:
+            return cls._CACHE[version]
+        except KeyError:
+            pass
+
+        self = super().__new__(cls)
+        rawcomponents = tuple(re.split('[ \\.]', version))
+        intcomponents = []
+        for value in rawcomponents:
             try:
-                self.intcomponents.append(int(value))
+                intcomponents.append(int(value))
             except ValueError:
                 try:
-                    self.intcomponents.append(int(value[1:]))
+                    intcomponents.append(int(value[1:]))
                 except ValueError:
-                    self.intcomponents.append(-1)
+                    intcomponents.append(-1)
+        intcomponents = tuple(intcomponents)
+
+        # when every component is a non-negative number, comparing the
+        # numbers with trailing zeros removed gives the same answer as
+        # padding the shorter version with zeros
+        if all(value >= 0 for value in intcomponents):
+            key = intcomponents
+            while key and key[-1] == 0:
+                key = key[:-1]
+        else:
+            key = None
+
+        object.__setattr__(self, 'rawversion', version)
+        object.__setattr__(self, 'rawcomponents', rawcomponents)
+        object.__setattr__(self, 'intcomponents', intcomponents)
+        object.__setattr__(self, '_key', key)
+        return cls._CACHE.setdefault(version, self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (ReleaseVersion, (self.rawversion, ))
 
     def __repr__ (self):
         return f"ReleaseVersion ('{str(self)}')"
@@ -47,64 +92,178 @@ def __repr__ (self):
     def __str__(self):
         return self.rawversion
 
-    def __lt__(self, cmpver):  # pylint: disable=too-many-return-statements
-        if isinstance(cmpver, (int,str)):
+    def __hash__(self):
+        if self._key is None:
+            return hash(self.rawversion)
+        return hash(self._key)
+
+    def _compare(self, cmpver):
+        """ -1, 0, or 1 as self sorts before, with, or after cmpver """
+        if isinstance(cmpver, (int, str)):
             cmpver = ReleaseVersion(cmpver)
+        elif not isinstance(cmpver, ReleaseVersion):
+            return NotImplemented
 
         # shortcut
         if self.rawversion == cmpver.rawversion:
-            return False
+            return 0
+
+        if self._key is not None and cmpver._key is not None:  # pylint: disable=protected-access
+            return (self._key > cmpver._key) - (self._key < cmpver._key)  # pylint: disable=protected-access
+
+        # a component that isn't a number compares the whole strings
+        mine = self.intcomponents
+        theirs = cmpver.intcomponents
+        for index in range(max(len(mine), len(theirs))):
+            myvalue = mine[index] if index < len(mine) else 0
+            theirvalue = theirs[index] if index < len(theirs) else 0
+            if myvalue == -1 or theirvalue == -1:
+                if self.rawversion < cmpver.rawversion:
+                    return -1
+                return 1
+            if myvalue != theirvalue:
+                return -1 if myvalue < theirvalue else 1
+        return 0
+
+    def __eq__(self, cmpver):
+        result = self._compare(cmpver)
+        if result is NotImplemented:
+            return result
+        return result == 0
 
-        srcver = copy.deepcopy(self)
+    def __lt__(self, cmpver):
+        result = self._compare(cmpver)
+        if result is NotImplemented:
+            return result
+        return result < 0
 
-        if len(srcver.rawcomponents) < len(cmpver.rawcomponents):
-            for index in range(0, len(cmpver.rawcomponents)):
-                srcver.rawcomponents.append('0')
-                srcver.intcomponents.append(0)
+    def __le__(self, cmpver):
+        result = self._compare(cmpver)
+        if result is NotImplemented:
+            return result
+        return result <= 0
 
-        for index, rawvalue in enumerate(srcver.rawcomponents):  # pylint: disable=unused-variable
-            if index+1 > len(cmpver.rawcomponents):
-                cmpver.rawcomponents.append('0')
-                cmpver.intcomponents.append(0)
+    def __gt__(self, cmpver):
+        result = self._compare(cmpver)
+        if result is NotImplemented:
+            return result
+        return result > 0
 
-            intvalue = srcver.intcomponents[index]
-            if intvalue == -1 or cmpver.intcomponents[index] == -1:
-                return self.rawversion < cmpver.rawversion
+    def __ge__(self, cmpver):
+        result = self._compare(cmpver)
+        if result is NotImplemented:
+            return result
+        return result >= 0
 
-            if intvalue < cmpver.intcomponents[index]:
-                return True
+    @staticmethod
+    def sort(versions, reverse=False):
+        """ sort version strings (or ReleaseVersions) into version order """
+        versions = list(versions)
+        keys = [ReleaseVersion(version) for version in versions]
+        if all(key._key is not None for key in keys):  # pylint: disable=protected-access
+            # plain tuples compare much faster than our own operators
+            keys = [key._key for key in keys]  # pylint: disable=protected-access
+        order = sorted(range(len(versions)),
+                       key=keys.__getitem__,
+                       reverse=reverse)
+        return [versions[index] for index in order]
 
-            if intvalue > cmpver.intcomponents[index]:
-                return False
 
-        return False
+class VersionInfo:  # pylint: disable=too-few-public-methods
+    """ what JIRA knows about a single version """
+
+    __slots__ = ('name', 'released', 'release_date', 'archived')
+
+    def __init__(self, data):
+        self.name = data['name']
+        self.released = data.get('released', False)
+        self.release_date = data.get('releaseDate')
+        self.archived = data.get('archived', False)
+
+    def merge(self, other):
+        """ fold in the same version from another project """
+        self.released = self.released or other.released
+        if self.release_date is None:
+            self.release_date = other.release_date
+        self.archived = self.archived and other.archived
+
+
+class VersionIndex:
+    """ Every version of the projects, as listed by JIRA
+
+        One request per project, shared by every run in the process.
+        When several projects share a version name, the first project
+        listed that has a release date supplies it, and the version
+        only counts as archived if every project archived it. """
+    def __init__(self, projects, jira_base_url, threads=NUM_THREADS):
+        self.versions = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+            for datum in executor.map(
+                    lambda project: VersionIndex.load_project(
+                        jira_base_url, project), projects):
+                for data in datum:
+                    info = VersionInfo(data)
+                    if info.name in self.versions:
+                        self.versions[info.name].merge(info)
+                    else:
+                        self.versions[info.name] = info
+
+    @staticmethod
+    def load_project(jira_base_url, project):
+        """ the versions of a project, as JSON
+
+            Each project is only requested once per process. """
+        key = (jira_base_url, project.upper())
+        with PROJECT_VERSIONS_LOCK:
+            if key in PROJECT_VERSIONS:
+                return PROJECT_VERSIONS[key]
+        url = f"{jira_base_url}/rest/api/2/project/{project.upper()}/versions"
+        try:
+            resp = get_jira(url)
+        except (urllib.error.HTTPError, urllib.error.URLError,
+                http.client.BadStatusLine):
+            sys.exit(1)
+        datum = json.loads(resp.read())
+        with PROJECT_VERSIONS_LOCK:
+            return PROJECT_VERSIONS.setdefault(key, datum)
+
+    def __contains__(self, name):
+        return name in self.versions
+
+    def names(self, archived=True):
+        """ the names of the versions, leaving out archived ones
+            if archived is False """
+        return [
+            name for name, info in self.versions.items()
+            if archived or not info.archived
+        ]
+
+    def release_date(self, name):
+        """ when the version was released, or None """
+        info = self.versions.get(name)
+        if info is None:
+            return None
+        return info.release_date
 
 
 class GetVersions:  # pylint: disable=too-few-public-methods
     """ List of version strings """
-    def __init__(self, versions, projects, jira_base_url):
-        self.userversions = sorted(versions, key=ReleaseVersion)
+    def __init__(self, versions, projects, jira_base_url, index=None,
+                 archived=True):  # pylint: disable=too-many-arguments
+        self.userversions = ReleaseVersion.sort(versions)
         logging.info("Looking for %s through %s", self.userversions[0],
                      self.userversions[-1])
 
-        serverversions = set()
-        for project in projects:
-            url = f"{jira_base_url}/rest/api/2/project/{project.upper()}/versions"
-            try:
-                resp = get_jira(url)
-            except (urllib.error.HTTPError, urllib.error.URLError,
-                    http.client.BadStatusLine):
-                sys.exit(1)
-
-            datum = json.loads(resp.read())
-            for data in datum:
-                serverversions.add(data['name'])
+        if index is None:
+            index = VersionIndex(projects, jira_base_url)
+        serverversions = set(index.names(archived))
 
-        serverversions = sorted(serverversions, key=ReleaseVersion)
+        serverversions = ReleaseVersion.sort(serverversions)
 
         combolist = serverversions + self.userversions
         comboset = set(combolist)
-        combolist = sorted(comboset,  key=ReleaseVersion)
+        combolist = ReleaseVersion.sort(comboset)
 
         start_index = combolist.index(self.userversions[0])
         end_index = combolist.index(self.userversions[-1])
@@ -16,216 +16,477 @@
 # limitations under the License.
 """ Handle JIRA Issues """
 
+import collections
+import datetime
+import hashlib
+import importlib.util
 import http.client
 import json
 import logging
+import operator
 import re
 import sys
 import urllib.parse
 import urllib.error
+import threading
 import time
 
-try:
-    import dateutil.parser
-except ImportError:
+from concurrent.futures import ThreadPoolExecutor
+
+# dateutil is slow to import and only needed for dates that are not
+# in the format JIRA normally uses (see parse_other_date), but make
+# sure it is there before doing any work
+if importlib.util.find_spec('dateutil') is None:
     logging.error(
         ("This script requires python-dateutil module to be installed. "
          "You can install it using:\n\t pip install python-dateutil"))
     sys.exit(1)
 
-from .utils import get_jira, to_unicode, sanitize_text
+from .sanitize import sanitize_text
+from .telemetry import METRICS
+from .utils import get_jira, to_unicode
 
-RELEASE_VERSION = {}
+FIELD_ID_MAPS = {}
+FIELD_ID_MAPS_LOCK = threading.Lock()
 
 SORTTYPE = 'resolutiondate'
 SORTORDER = 'older'
 NUM_RETRIES = 5
+NUM_THREADS = 4
+
+# fields requested for every issue, see JiraIter.search_fields
+SEARCH_FIELDS = [
+    'summary', 'priority', 'assignee', 'reporter', 'components', 'issuetype',
+    'project', 'fixVersions', 'resolutiondate', 'labels', 'resolution',
+    'updated'
+]
+
+# how many issues ISSUE_CACHE holds on to
+ISSUE_CACHE_SIZE = 20000
+
+# how much of a search has to be in ISSUE_CACHE already before
+# collect_jiras() asks for keys first rather than for whole issues
+ISSUE_CACHE_MIN_HITS = 0.5
+
+# fields that Linter (and sorting) need, see JiraIter.lint_fields
+LINT_FIELDS = [
+    'assignee', 'components', 'fixVersions', 'labels', 'project',
+    'resolution', 'resolutiondate'
+]
+
+# how far back from the last sync to ask JIRA for updated issues
+WATERMARK_OVERLAP = 24 * 60 * 60
 
 # label to be used to mark an issue as Incompatible change.
 BACKWARD_INCOMPATIBLE_LABEL = 'backward-incompatible'
 
 
-class Jira:
-    """A single JIRA"""
-    def __init__(self, data, parent):
+# what JIRA hands out, e.g., 2015-06-30T09:04:41.000+0000
+ISO8601_PATTERN = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)'
+                             r'(?:\.(\d{1,6}))?(Z|[+-]\d\d:?\d\d)?$')
+
+
+def parse_other_date(value):
+    """ turn a date in any other format into seconds since the epoch """
+    import dateutil.parser  # pylint: disable=import-outside-toplevel
+    return dateutil.parser.parse(value).timestamp()
+
+
+def parse_date(value):
+    """ turn a JIRA date into seconds since the epoch """
+    if value is None:
+        return 0.0
+    found = ISO8601_PATTERN.match(value)
+    if found is None:
+        return parse_other_date(value)
+    year, month, day, hour, minute, second, fraction, zone = found.groups()
+    tzinfo = None
+    if zone == 'Z':
+        tzinfo = datetime.timezone.utc
+    elif zone is not None:
+        offset = int(zone[1:3]) * 60 + int(zone[-2:])
+        if zone[0] == '-':
+            offset = -offset
+        tzinfo = datetime.timezone(datetime.timedelta(minutes=offset))
+    return datetime.datetime(int(year), int(month), int(day), int(hour),
+                             int(minute), int(second),
+                             int((fraction or '0').ljust(6, '0')),
+                             tzinfo).timestamp()
+
+
+def set_retries(count):
+    """ how many times to retry a failed JIRA search """
+    global NUM_RETRIES  # pylint: disable=global-statement
+    NUM_RETRIES = count
+
+
+def sort_key(sorttype=SORTTYPE, sortorder=SORTORDER):
+    """ get a key function to sort Jira objects with """
+    if sorttype == 'issueid':
+        # dec is supported for backward compatibility
+        if sortorder in ['dec', 'desc']:
+            return lambda jira: (jira.idkey[0], -jira.idkey[1])
+        return operator.attrgetter('idkey')
+    if sortorder == 'newer':
+        return lambda jira: -jira.datekey
+    return operator.attrgetter('datekey')
+
+
+def _subfield(value, name):
+    """ pull a single value out of a JIRA object that may be missing """
+    if value is None:
+        return None
+    return value[name]
+
+
+class Jira:  # pylint: disable=too-many-instance-attributes
+    """A single JIRA
+
+    Only the values that releasedocmaker renders or lints are kept.
+    They are pulled out of the JSON once, when the issue arrives, so
+    that the rest of the payload can be thrown away."""
+
+    __slots__ = ('key', 'summary', 'priority', 'assignee', 'reporter',
+                 'components', 'issuetype', 'project', 'fix_versions',
+                 'resolutiondate', 'updated', 'fixed', 'flags', 'labels',
+                 'notes', 'incompat', 'reviewed', 'important', 'idkey',
+                 'datekey')
+
+    # computed by _derive() rather than stored by to_json()
+    _derived = ('incompat', 'reviewed', 'idkey', 'datekey')
+
+    def __init__(self,
+                 data,
+                 field_id_map,
+                 incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):
+        fields = data['fields']
         self.key = data['key']
-        self.fields = data['fields']
-        self.parent = parent
-        self.notes = None
-        self.incompat = None
-        self.reviewed = None
-        self.important = None
+        self.summary = fields.get('summary')
+        self.priority = _subfield(fields.get('priority'), 'name')
+        self.assignee = _subfield(fields.get('assignee'), 'displayName')
+        self.reporter = _subfield(fields.get('reporter'), 'displayName')
+        self.components = tuple(
+            comp['name'] for comp in fields.get('components') or [])
+        self.issuetype = _subfield(fields.get('issuetype'), 'name')
+        self.project = _subfield(fields.get('project'), 'key')
+        self.fix_versions = tuple(
+            fix_version['name'] for fix_version in fields.get(
+                field_id_map.get('Fix Version/s', 'fixVersions')) or [])
+        self.resolutiondate = fields.get('resolutiondate')
+        self.updated = fields.get('updated')
+        self.fixed = _subfield(fields.get('resolution'), 'name') == 'Fixed'
+
+        field = field_id_map.get('Hadoop Flags')
+        if field in fields:
+            self.flags = tuple(flag['value'] for flag in fields[field] or [])
+        else:
+            self.flags = None
+        field = field_id_map.get('Labels', 'labels')
+        self.labels = tuple(fields.get(field) or [])
+        field = field_id_map.get('Flags')
+        self.important = any(flag['value'] == "Important"
+                             for flag in fields.get(field) or [])
+        self._derive(incompatible_label)
+
+        field = field_id_map.get('Release Note')
+        if field in fields:
+            self.notes = to_unicode(fields[field])
+        elif self.incompat or self.important:
+            # no release note field, so the description is used
+            # instead.  None means that it still needs to be fetched.
+            if 'description' in fields:
+                self.notes = to_unicode(fields['description'])
+            else:
+                self.notes = None
+        else:
+            self.notes = ""
+
+    def _derive(self, incompatible_label):
+        """ work out the sort keys and the incompatible and reviewed flags """
+        project, _, number = self.key.partition('-')
+        self.idkey = (project, int(number) if number.isdigit() else 0)
+        self.datekey = parse_date(self.resolutiondate)
+
+        self.reviewed = False
+        self.incompat = False
+        if self.flags is not None:
+            if "Incompatible change" in self.flags:
+                self.incompat = True
+            if "Reviewed" in self.flags:
+                self.reviewed = True
+        elif incompatible_label in self.labels:
+            # Custom field 'Hadoop Flags' is not defined,
+            # search for 'backward-incompatible' label
+            self.incompat = True
+            self.reviewed = True
+
+    def to_json(self):
+        """ the values needed to rebuild this Jira with from_json """
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in self._derived
+        }
+
+    @classmethod
+    def from_json(cls, values, incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):
+        """ rebuild a Jira from the output of to_json """
+        jira = cls.__new__(cls)
+        for name, value in values.items():
+            if isinstance(value, list):
+                value = tuple(
+                    tuple(item) if isinstance(item, list) else item
+                    for item in value)
+            setattr(jira, name, value)
+        jira._derive(incompatible_label)  # pylint: disable=protected-access
+        return jira
 
     def get_id(self):
         """ get the Issue ID """
         return to_unicode(self.key)
 
-    def get_description(self):
-        """ get the description """
-        return to_unicode(self.fields['description'])
+    def needs_description(self):
+        """ does the release note still have to come from the description? """
+        return self.notes is None
+
+    def set_description(self, description):
+        """ use the description as the release note """
+        self.notes = to_unicode(description)
 
     def get_release_note(self):
         """ get the release note field """
         if self.notes is None:
-            field = self.parent.field_id_map['Release Note']
-            if field in self.fields:
-                self.notes = to_unicode(self.fields[field])
-            elif self.get_incompatible_change() or self.get_important():
-                self.notes = self.get_description()
-            else:
-                self.notes = ""
+            return ""
         return self.notes
 
     def get_priority(self):
         """ Get the priority """
-        ret = ""
-        pri = self.fields['priority']
-        if pri is not None:
-            ret = pri['name']
-        return to_unicode(ret)
+        return to_unicode(self.priority)
 
     def get_assignee(self):
         """ Get the assignee """
-        ret = ""
-        mid = self.fields['assignee']
-        if mid is not None:
-            ret = mid['displayName']
-        return to_unicode(ret)
+        return to_unicode(self.assignee)
 
     def get_components(self):
         """ Get the component(s) """
-        if self.fields['components']:
-            return ", ".join(
-                [comp['name'] for comp in self.fields['components']])
-        return ""
+        return ", ".join(self.components)
 
     def get_summary(self):
         """ Get the summary """
-        return self.fields['summary']
+        return self.summary
 
     def get_type(self):
         """ Get the Issue type """
-        ret = ""
-        mid = self.fields['issuetype']
-        if mid is not None:
-            ret = mid['name']
-        return to_unicode(ret)
+        return to_unicode(self.issuetype)
 
     def get_reporter(self):
         """ Get the issue reporter """
-        ret = ""
-        mid = self.fields['reporter']
-        if mid is not None:
-            ret = mid['displayName']
-        return to_unicode(ret)
+        return to_unicode(self.reporter)
 
     def get_project(self):
         """ get the project """
-        ret = ""
-        mid = self.fields['project']
-        if mid is not None:
-            ret = mid['key']
-        return to_unicode(ret)
+        return to_unicode(self.project)
 
-    def __lt__(self, other):
+    def get_fix_versions(self):
+        """ get the names of the fix versions """
+        return list(self.fix_versions)
 
-        if SORTTYPE == 'issueid':
-            # compare by issue name-number
-            selfsplit = self.get_id().split('-')
-            othersplit = other.get_id().split('-')
-            result = selfsplit[0] < othersplit[0]
-            if not result:
-                result = int(selfsplit[1]) < int(othersplit[1])
-                # dec is supported for backward compatibility
-                if SORTORDER in ['dec', 'desc']:
-                    result = not result
-
-        elif SORTTYPE == 'resolutiondate':
-            dts = dateutil.parser.parse(self.fields['resolutiondate'])
-            dto = dateutil.parser.parse(other.fields['resolutiondate'])
-            result = dts < dto
-            if SORTORDER == 'newer':
-                result = not result
-
-        return result
+    def __lt__(self, other):
+        key = sort_key(SORTTYPE, SORTORDER)
+        return key(self) < key(other)
 
     def get_incompatible_change(self):
         """ get incompatible flag """
-        if self.incompat is None:
-            field = self.parent.field_id_map['Hadoop Flags']
-            self.reviewed = False
-            self.incompat = False
-            if field in self.fields:
-                if self.fields[field]:
-                    for flag in self.fields[field]:
-                        if flag['value'] == "Incompatible change":
-                            self.incompat = True
-                        if flag['value'] == "Reviewed":
-                            self.reviewed = True
-            else:
-                # Custom field 'Hadoop Flags' is not defined,
-                # search for 'backward-incompatible' label
-                field = self.parent.field_id_map['Labels']
-                if field in self.fields and self.fields[field]:
-                    if BACKWARD_INCOMPATIBLE_LABEL in self.fields[field]:
-                        self.incompat = True
-                        self.reviewed = True
         return self.incompat
 
     def get_important(self):
         """ get important flag """
-        if self.important is None:
-            field = self.parent.field_id_map['Flags']
-            self.important = False
-            if field in self.fields:
-                if self.fields[field]:
-                    for flag in self.fields[field]:
-                        if flag['value'] == "Important":
-                            self.important = True
         return self.important
 
 
+class IssueCache:
+    """Jira objects already built during this run, by issue key.
+
+    An issue is only reused while its updated timestamp is the same
+    as the one JIRA reports, so a cached copy is never stale.  Once
+    there are more than max_size issues, the least recently used
+    ones are dropped.
+
+    For every scope (JIRA, incompatible label and projects) the cache
+    also remembers how much of the last search it already had, which
+    tells collect_jiras() whether asking for keys first is worth it."""
+    def __init__(self, max_size=ISSUE_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._issues = collections.OrderedDict()
+        self._overlap = {}
+        self.max_size = max_size
+        self.hits = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._issues)
+
+    def worth_stubs(self, scope):
+        """ True if the last search in scope found enough of its
+            issues here to make a keys-only search pay off """
+        with self._lock:
+            return self._overlap.get(scope, 0.0) >= ISSUE_CACHE_MIN_HITS
+
+    def record(self, scope, cached, total):
+        """ remember that cached out of total issues of a search in
+            scope were already here """
+        if total:
+            with self._lock:
+                self._overlap[scope] = cached / total
+
+    def get(self, jira_base_url, incompatible_label, key, updated):
+        """ the cached Jira for key if it is still current, else None """
+        with self._lock:
+            jira = self._issues.get((jira_base_url, incompatible_label, key))
+            if jira is None or jira.updated != updated:
+                return None
+            self._issues.move_to_end((jira_base_url, incompatible_label, key))
+            self.hits += 1
+            return jira
+
+    def current(self, jira_base_url, incompatible_label, jiras):
+        """ how many of jiras are already here, and current """
+        with self._lock:
+            return sum(1 for jira in jiras
+                       if getattr(
+                           self._issues.get((jira_base_url,
+                                             incompatible_label, jira.key)),
+                           'updated', None) == jira.updated)
+
+    def add(self, jira_base_url, incompatible_label, jiras):
+        """ remember Jira objects for later """
+        with self._lock:
+            for jira in jiras:
+                key = (jira_base_url, incompatible_label, jira.key)
+                self._issues[key] = jira
+                self._issues.move_to_end(key)
+            while len(self._issues) > self.max_size:
+                self._issues.popitem(last=False)
+
+
+ISSUE_CACHE = IssueCache()
+
+
 class JiraIter:
     """An Iterator of JIRAs"""
     @staticmethod
     def collect_fields(jira_base_url):
-        """send a query to JIRA and collect field-id map"""
-        try:
-            resp = get_jira(f"{jira_base_url}/rest/api/2/field")
-            data = json.loads(resp.read())
-        except (urllib.error.HTTPError, urllib.error.URLError,
-                http.client.BadStatusLine, ValueError) as error:
-            logging.error('Blew up trying to get a response: %s', error)
-            sys.exit(1)
-        field_id_map = {}
-        for part in data:
-            field_id_map[part['name']] = part['id']
-        return field_id_map
+        """send a query to JIRA and collect field-id map
+
+        The map is only requested once per JIRA instance."""
+        with FIELD_ID_MAPS_LOCK:
+            if jira_base_url in FIELD_ID_MAPS:
+                return FIELD_ID_MAPS[jira_base_url]
+            try:
+                resp = get_jira(f"{jira_base_url}/rest/api/2/field")
+                data = json.loads(resp.read())
+            except (urllib.error.HTTPError, urllib.error.URLError,
+                    http.client.BadStatusLine, ValueError) as error:
+                logging.error('Blew up trying to get a response: %s', error)
+                sys.exit(1)
+            field_id_map = {}
+            for part in data:
+                field_id_map[part['name']] = part['id']
+            FIELD_ID_MAPS[jira_base_url] = field_id_map
+            return field_id_map
 
     @staticmethod
-    def query_jira(jira_base_url, ver, projects, pos):
+    def search_fields(jira_base_url):
+        """the fields of an issue that Jira and Linter actually use
+
+        The description is not in here since it is only needed for
+        the few issues that fall back to it for their release note."""
+        field_id_map = JiraIter.collect_fields(jira_base_url)
+        fields = list(SEARCH_FIELDS)
+        for name in ('Release Note', 'Hadoop Flags', 'Flags', 'Labels',
+                     'Fix Version/s'):
+            if name in field_id_map and field_id_map[name] not in fields:
+                fields.append(field_id_map[name])
+        return fields
+
+    @staticmethod
+    def lint_fields(jira_base_url):
+        """the fields of an issue that Linter uses"""
+        field_id_map = JiraIter.collect_fields(jira_base_url)
+        fields = list(LINT_FIELDS)
+        for name in ('Release Note', 'Hadoop Flags', 'Flags', 'Labels',
+                     'Fix Version/s'):
+            if name in field_id_map and field_id_map[name] not in fields:
+                fields.append(field_id_map[name])
+        return fields
+
+    @staticmethod
+    def collect_lint(jira_base_url,
+                     vers,
+                     projects,
+                     threads=NUM_THREADS,
+                     incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):
+        """collect just enough of the issues of several versions to lint
+        them, returning a list of issues per version
+
+        These issues are incomplete, so they stay out of ISSUE_CACHE."""
+        field_id_map = JiraIter.collect_fields(jira_base_url)
+        jiras = JiraIter.collect_pages(
+            jira_base_url, list(vers), projects, threads, None,
+            JiraIter.lint_fields(jira_base_url),
+            lambda issue: Jira(issue, field_id_map, incompatible_label))
+        # a description only matters if it would stop a warning
+        JiraIter.collect_descriptions(jira_base_url, [
+            jira for jira in jiras
+            if jira.get_incompatible_change() or jira.get_important()
+        ], threads)
+        return JiraIter.split_versions(jiras, vers)
+
+    @staticmethod
+    def query_jira(jira_base_url, ver, projects, pos, since=None, fields=None):  # pylint: disable=too-many-arguments
         """send a query to JIRA and collect
-        a certain number of issue information"""
+        a certain number of issue information
+
+        ver may be a single version or a list of them.  If it
+        is None, every issue in the projects is a candidate.
+        If since is given, only issues updated since then are.
+        fields defaults to search_fields()."""
         count = 100
         pjs = "','".join(projects)
-        jql = f"project in ('{pjs}') and fixVersion in ('{ver}') and resolution = Fixed"
-        params = urllib.parse.urlencode({
+        jql = f"project in ('{pjs}')"
+        if ver is not None:
+            if isinstance(ver, str):
+                ver = [ver]
+            vers = "','".join(ver)
+            jql += f" and fixVersion in ('{vers}') and resolution = Fixed"
+        if since is not None:
+            jql += f' and updated >= "{since}"'
+        if fields is None:
+            fields = JiraIter.search_fields(jira_base_url)
+        params = {
             'jql': jql,
             'startAt': pos,
-            'maxResults': count
-        })
+            'maxResults': count,
+            'fields': fields
+        }
         return JiraIter.load_jira(jira_base_url, params, 0)
 
     @staticmethod
     def load_jira(jira_base_url, params, fail_count):
-        """send query to JIRA and collect with retries"""
+        """send query to JIRA and collect with retries
+
+        The query goes in the body of a POST so that long
+        lists of versions do not overflow the URL."""
         try:
-            resp = get_jira(f"{jira_base_url}/rest/api/2/search?{params}")
-        except (urllib.error.URLError, http.client.BadStatusLine) as err:
+            resp = get_jira(f"{jira_base_url}/rest/api/2/search",
+                            data=params)
+        except (urllib.error.URLError, http.client.BadStatusLine,
+                http.client.IncompleteRead) as err:
             return JiraIter.retry_load(jira_base_url, err, params, fail_count)
 
         try:
-            data = json.loads(resp.read())
+            with METRICS.phase('decode'):
+                data = json.loads(resp.read())
         except http.client.IncompleteRead as err:
             return JiraIter.retry_load(jira_base_url, err, params, fail_count)
         return data
@@ -236,6 +497,7 @@ def retry_load(jira_base_url, err, params, fail_count):
         logging.error(err)
         fail_count += 1
         if fail_count <= NUM_RETRIES:
+            METRICS.add('retries')
             logging.warning("Connection failed %s times. Retrying.",
                             fail_count)
             time.sleep(1)
@@ -244,47 +506,285 @@ def retry_load(jira_base_url, err, params, fail_count):
         sys.exit(1)
 
     @staticmethod
-    def collect_jiras(jira_base_url, ver, projects):
+    def check_page(data):
+        """abort if JIRA returned an error instead of a page of issues"""
+        if 'error_messages' in data:
+            logging.error("JIRA returns error message: %s",
+                          data['error_messages'])
+            sys.exit(1)
+
+    @staticmethod
+    def collect_pages(jira_base_url, ver, projects, threads, since, fields,
+                      convert):  # pylint: disable=too-many-arguments
+        """run a search and return convert(issue) for every issue found
+
+        The first page tells us how many issues there are, so
+        the remaining pages are fetched concurrently and then
+        put back together in order.  Each page is converted as
+        soon as it is in order, so that the JSON can go away again."""
+        results = []
+
+        def add_page(data):
+            JiraIter.check_page(data)
+            results.extend(convert(issue) for issue in data['issues'])
+
+        data = JiraIter.query_jira(jira_base_url, ver, projects, 0, since,
+                                   fields)
+        JiraIter.check_page(data)
+        step = data['maxResults']
+        offsets = range(data['startAt'] + step, data['total'], max(1, step))
+        add_page(data)
+        del data
+
+        if step > 0 and offsets:
+            with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+                for data in executor.map(
+                        lambda pos: JiraIter.query_jira(
+                            jira_base_url, ver, projects, pos, since, fields),
+                        offsets):
+                    add_page(data)
+                    del data
+        return results
+
+    @staticmethod
+    def collect_keys(jira_base_url, keys, threads=NUM_THREADS,
+                     incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):
+        """fetch the given issues in full, returning Jira objects by key"""
+        field_id_map = JiraIter.collect_fields(jira_base_url)
+        return {
+            issue['key']: Jira(issue, field_id_map, incompatible_label)
+            for issue in JiraIter.search_keys(
+                jira_base_url, keys, JiraIter.search_fields(jira_base_url),
+                threads)
+        }
+
+    @staticmethod
+    def search_keys(jira_base_url, keys, fields, threads=NUM_THREADS):
+        """fetch the given fields of the given issues, returning the
+        JSON of every issue found
+
+        The keys are searched for 100 at a time, concurrently.  JIRA
+        may return fewer issues per page than that, so each search
+        keeps paging until JIRA says it has seen all of it."""
+        count = 100
+        keys = sorted(keys)
+        chunks = [keys[pos:pos + count] for pos in range(0, len(keys), count)]
+
+        def query_chunk(chunk):
+            issues = []
+            pos = 0
+            while True:
+                params = {
+                    'jql': f"key in ({','.join(chunk)})",
+                    'startAt': pos,
+                    'maxResults': count,
+                    'fields': fields
+                }
+                data = JiraIter.load_jira(jira_base_url, params, 0)
+                JiraIter.check_page(data)
+                issues.extend(data['issues'])
+                pos = data['startAt'] + len(data['issues'])
+                if not data['issues'] or pos >= data['total']:
+                    return issues
+
+        found = []
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+            for issues in executor.map(query_chunk, chunks):
+                found.extend(issues)
+        return found
+
+    @staticmethod
+    def collect_jiras(jira_base_url,
+                      ver,
+                      projects,
+                      threads=NUM_THREADS,
+                      since=None,
+                      incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):  # pylint: disable=too-many-arguments
         """send queries to JIRA and collect all issues
-        that belongs to given version and projects"""
-        jiras = []
-        pos = 0
-        end = 1
-        while pos < end:
-            data = JiraIter.query_jira(jira_base_url, ver, projects, pos)
-            if 'error_messages' in data:
-                logging.error("JIRA returns error message: %s",
-                              data['error_messages'])
-                sys.exit(1)
-            pos = data['startAt'] + data['maxResults']
-            end = data['total']
-            jiras.extend(data['issues'])
-
-            if ver not in RELEASE_VERSION:
-                for issue in data['issues']:
-                    for fix_version in issue['fields']['fixVersions']:
-                        if 'releaseDate' in fix_version:
-                            RELEASE_VERSION[fix_version['name']] = fix_version[
-                                'releaseDate']
+        that belongs to given version(s) and projects
+
+        Issues are shared through ISSUE_CACHE by everything in the
+        run.  When the last search for the same projects found at
+        least ISSUE_CACHE_MIN_HITS of its issues in there, the search
+        only asks for each issue's key and updated time, and only
+        issues that are not cached (or have changed since) are
+        fetched in full.  Otherwise, e.g., for the first search or
+        for versions that share few issues, the whole issues are
+        requested straight away, so nothing is searched for twice."""
+        scope = (jira_base_url, incompatible_label,
+                 tuple(sorted(project.upper() for project in projects)))
+        if not ISSUE_CACHE.worth_stubs(scope):
+            field_id_map = JiraIter.collect_fields(jira_base_url)
+            jiras = JiraIter.collect_pages(
+                jira_base_url, ver, projects, threads, since, None,
+                lambda issue: Jira(issue, field_id_map, incompatible_label))
+            ISSUE_CACHE.record(
+                scope,
+                ISSUE_CACHE.current(jira_base_url, incompatible_label, jiras),
+                len(jiras))
+            ISSUE_CACHE.add(jira_base_url, incompatible_label, jiras)
+            return jiras
+
+        stubs = JiraIter.collect_pages(
+            jira_base_url, ver, projects, threads, since, ['updated'],
+            lambda issue: (issue['key'], issue['fields'].get('updated')))
+        found = {
+            key: ISSUE_CACHE.get(jira_base_url, incompatible_label, key,
+                                 updated)
+            for key, updated in stubs
+        }
+        missing = [key for key, jira in found.items() if jira is None]
+        ISSUE_CACHE.record(scope, len(found) - len(missing), len(found))
+        if missing:
+            fetched = JiraIter.collect_keys(jira_base_url, missing, threads,
+                                            incompatible_label)
+            ISSUE_CACHE.add(jira_base_url, incompatible_label,
+                            fetched.values())
+            found.update(fetched)
+        return [found[key] for key, _ in stubs if found.get(key) is not None]
+
+    @staticmethod
+    def collect_descriptions(jira_base_url, jiras, threads=NUM_THREADS):
+        """fill in the description of the issues that need it for
+        their release note, returning the issues that changed"""
+        wanted = {jira.key: jira for jira in jiras if jira.needs_description()}
+        if not wanted:
+            return []
+
+        for issue in JiraIter.search_keys(jira_base_url, wanted,
+                                          ['description'], threads):
+            if issue['key'] in wanted:
+                wanted[issue['key']].set_description(
+                    issue['fields'].get('description'))
+        return list(wanted.values())
+
+    @staticmethod
+    def split_versions(jiras, vers):
+        """put issues into one list per version based upon their
+        fix versions, keeping the order they came in"""
+        buckets = {ver: [] for ver in vers}
+        names = {ver.lower(): ver for ver in vers}
+        for jira in jiras:
+            for name in jira.get_fix_versions():
+                ver = names.get(name.lower())
+                if ver is not None:
+                    buckets[ver].append(jira)
+        return buckets
+
+    @staticmethod
+    def collect_versions(jira_base_url,
+                         vers,
+                         projects,
+                         threads=NUM_THREADS,
+                         store=None,
+                         incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):  # pylint: disable=too-many-arguments
+        """collect the issues of several versions with as few
+        queries as possible, returning a list of issues per version"""
+        if store is not None:
+            jiras = JiraIter.sync_versions(store, jira_base_url, vers,
+                                           projects, threads,
+                                           incompatible_label)
+            filled = JiraIter.collect_descriptions(jira_base_url, jiras,
+                                                   threads)
+            if filled:
+                store.add_issues(jira_base_url, filled)
+        else:
+            jiras = JiraIter.collect_jiras(jira_base_url,
+                                           list(vers),
+                                           projects,
+                                           threads,
+                                           incompatible_label=incompatible_label)
+            JiraIter.collect_descriptions(jira_base_url, jiras, threads)
+        return JiraIter.split_versions(jiras, vers)
+
+    @staticmethod
+    def sync_versions(store,
+                      jira_base_url,
+                      vers,
+                      projects,
+                      threads=NUM_THREADS,
+                      incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):  # pylint: disable=too-many-arguments
+        """bring the SyncStore up to date and return the issues
+        that belong to given versions and projects
+
+        The first time a set of projects is seen during a run, only
+        the issues updated since the last sync are requested.  Versions
+        that have never been loaded are fetched in full once."""
+        if store.needs_refresh(jira_base_url, projects):
+            started = time.time()
+            watermark = store.watermark(jira_base_url, projects)
+            if watermark is not None:
+                # JQL dates are in the JIRA server's timezone, so
+                # overlap enough to not care which one that is
+                since = time.strftime(
+                    '%Y/%m/%d %H:%M',
+                    time.gmtime(watermark - WATERMARK_OVERLAP))
+                store.add_issues(
+                    jira_base_url,
+                    JiraIter.collect_jiras(jira_base_url, None, projects,
+                                           threads, since,
+                                           incompatible_label))
+            store.set_watermark(jira_base_url, projects, started)
+
+        missing = [
+            ver for ver in vers
+            if not store.loaded(jira_base_url, projects, ver)
+        ]
+        if missing:
+            store.add_issues(
+                jira_base_url,
+                JiraIter.collect_jiras(jira_base_url,
+                                       missing,
+                                       projects,
+                                       threads,
+                                       incompatible_label=incompatible_label))
+            for ver in missing:
+                store.set_loaded(jira_base_url, projects, ver)
+
+        jiras = store.issues(jira_base_url, projects, vers,
+                             incompatible_label)
         return jiras
 
-    def __init__(self, jira_base_url, version, projects):
+    def __init__(self,
+                 jira_base_url,
+                 version,
+                 projects,
+                 threads=NUM_THREADS,
+                 store=None,
+                 jiras=None,
+                 incompatible_label=BACKWARD_INCOMPATIBLE_LABEL):  # pylint: disable=too-many-arguments
         self.version = version
         self.projects = projects
         self.jira_base_url = jira_base_url
         self.field_id_map = JiraIter.collect_fields(jira_base_url)
-        ver = str(version).replace("-SNAPSHOT", "")
-        self.jiras = JiraIter.collect_jiras(jira_base_url, ver, projects)
+        ver = JiraIter.fix_version_name(version)
+        self.fix_version = ver
+        if jiras is None:
+            jiras = JiraIter.collect_versions(jira_base_url, [ver], projects,
+                                              threads, store,
+                                              incompatible_label)[ver]
+        self.jiras = jiras
         self.iter = self.jiras.__iter__()
 
+    @staticmethod
+    def fix_version_name(version):
+        """the name of the version as JIRA knows it"""
+        return str(version).replace("-SNAPSHOT", "")
+
+    def digest(self):
+        """a digest of which issues are in this version and when
+        each of them last changed"""
+        digest = hashlib.sha256()
+        for jira in sorted(self.jiras, key=lambda jira: jira.key):
+            digest.update(f"{jira.key} {jira.updated}\n".encode('utf-8'))
+        return digest.hexdigest()
+
     def __iter__(self):
         return self
 
     def __next__(self):
         """ get next """
-        data = next(self.iter)
-        j = Jira(data, self)
-        return j
+        return next(self.iter)
 
 
 class Linter:
@@ -300,6 +800,9 @@ def __init__(self, version, options):
         self._error_count = 0
         self._lint_message = ""
         self._version = version
+        # the keys of the issues linted, and what was found, for reports
+        self.checked = []
+        self.results = []
 
         self._filters = dict(
             list(zip(self._valid_filters, [False] * len(self._valid_filters))))
@@ -321,6 +824,22 @@ def add_parser_options(parser):
             ". " + "'all' enables all lint filters. " +
             "Multiple filters can be specified comma-delimited and " +
             "filters can be negated, e.g. 'all,-component'.")
+        parser.add_argument(
+            "--lint-only",
+            dest="lint_only",
+            action="store_true",
+            default=False,
+            help="Only lint, fetching just the fields lint needs and "
+            "writing no documents. Implies --lint=all if no filters are given.")
+        parser.add_argument("--lint-json",
+                            dest="lint_json",
+                            metavar="FILE",
+                            help="With --lint-only, write the results as JSON")
+        parser.add_argument(
+            "--lint-junit",
+            dest="lint_junit",
+            metavar="FILE",
+            help="With --lint-only, write the results as JUnit XML")
 
     def _parse_options(self, options):
         """Parse options from optparse."""
@@ -331,10 +850,10 @@ def _parse_options(self, options):
 
         # Valid filter specifications are
         # self._valid_filters, negations, and "all"
-        valid_list = self._valid_filters
-        valid_list += ["-" + v for v in valid_list]
-        valid_list += ["all"]
-        valid = set(valid_list)
+        valid = set(self._valid_filters) | {
+            "-" + v
+            for v in self._valid_filters
+        } | {"all"}
 
         enabled = []
         disabled = []
@@ -360,6 +879,23 @@ def _parse_options(self, options):
         for disopt in disabled:
             self._filters[disopt] = False
 
+    def version(self):
+        """Returns the version being linted."""
+        return self._version
+
+    def counts(self):
+        """Returns (errors, warnings)."""
+        return self._error_count, self._warning_count
+
+    def _record(self, jira, severity, check, message):
+        """Remember a lint problem for reports."""
+        self.results.append({
+            'issue': jira.get_id(),
+            'severity': severity,
+            'check': check,
+            'message': message
+        })
+
     def had_errors(self):
         """Returns True if a lint error was encountered, else False."""
         return self._error_count > 0
@@ -378,7 +914,7 @@ def _check_missing_component(self, jira):
         if not self._filters["component"]:
             return False
 
-        if jira.fields['components']:
+        if jira.components:
             return False
         return True
 
@@ -387,7 +923,7 @@ def _check_missing_assignee(self, jira):
         if not self._filters["assignee"]:
             return False
 
-        if jira.fields['assignee'] is not None:
+        if jira.assignee is not None:
             return False
         return True
 
@@ -396,9 +932,8 @@ def _check_version_string(self, jira):
         if not self._filters["version"]:
             return False
 
-        field = jira.parent.field_id_map['Fix Version/s']
-        for ver in jira.fields[field]:
-            found = re.match(r'^((\d+)(\.\d+)*).*$|^(\w+\-\d+)$', ver['name'])
+        for ver in jira.get_fix_versions():
+            found = re.match(r'^((\d+)(\.\d+)*).*$|^(\w+\-\d+)$', ver)
             if not found:
                 return True
         return False
@@ -407,20 +942,26 @@ def lint(self, jira):
         """Run lint check on a JIRA."""
         if not self.enabled:
             return
+        self.checked.append(jira.get_id())
         if not jira.get_release_note():
             jiraid = sanitize_text(jira.get_id())
             if self._filters["incompatible"] and jira.get_incompatible_change(
             ):
                 self._warning_count += 1
                 self._lint_message += f"\nWARNING: incompatible change {jiraid} lacks release notes."  #pylint: disable=line-too-long
+                self._record(jira, 'warning', 'incompatible',
+                             'incompatible change lacks release notes')
 
             if self._filters["important"] and jira.get_important():
                 self._warning_count += 1
                 self._lint_message += f"\nWARNING: important issue {jiraid} lacks release notes."
+                self._record(jira, 'warning', 'important',
+                             'important issue lacks release notes')
 
         if self._check_version_string(jira):
             self._warning_count += 1
             self._lint_message += f"\nWARNING: Version string problem for {jira.get_id()} "
+            self._record(jira, 'warning', 'version', 'version string problem')
 
         if self._check_missing_component(jira) or self._check_missing_assignee(
                 jira):
@@ -428,7 +969,9 @@ def lint(self, jira):
             error_message = []
             if self._check_missing_component(jira):
                 error_message.append("component")
+                self._record(jira, 'error', 'component', 'missing component')
             if self._check_missing_assignee(jira):
                 error_message.append("assignee")
+                self._record(jira, 'error', 'assignee', 'missing assignee')
             multimessage = ' and '.join(error_message)
             self._lint_message += f"\nERROR: missing {multimessage} for {jira.get_id()} "
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Machine-readable lint results """
+
+import json
+
+
+def write_json(linters, filename):
+    """ write the results of several Linters as JSON """
+    report = {'versions': []}
+    for linter in linters:
+        errors, warnings = linter.counts()
+        report['versions'].append({
+            'version': linter.version(),
+            'issues': len(linter.checked),
+            'errors': errors,
+            'warnings': warnings,
+            'results': linter.results
+        })
+    with open(filename, 'w', encoding='utf-8') as reportfile:
+        json.dump(report, reportfile, indent=2)
+        reportfile.write('\n')
+
+
+def write_junit(linters, filename):
+    """ write the results of several Linters as JUnit XML
+
+        Each version is a test suite and each issue a test case.
+        Errors are failures; warnings only show up as output. """
+    import xml.etree.ElementTree as ET  # pylint: disable=import-outside-toplevel
+    suites = ET.Element('testsuites')
+    for linter in linters:
+        errors, _ = linter.counts()
+        suite = ET.SubElement(suites,
+                              'testsuite',
+                              name=f'releasedocmaker.lint.{linter.version()}',
+                              tests=str(len(linter.checked)),
+                              failures=str(errors),
+                              errors='0')
+        byissue = {}
+        for result in linter.results:
+            byissue.setdefault(result['issue'], []).append(result)
+        for issue in linter.checked:
+            case = ET.SubElement(suite,
+                                 'testcase',
+                                 classname=f'releasedocmaker.lint.{linter.version()}',
+                                 name=issue)
+            results = byissue.get(issue, [])
+            failed = [r['message'] for r in results if r['severity'] == 'error']
+            if failed:
+                ET.SubElement(case, 'failure',
+                              message=', '.join(failed)).text = '\n'.join(
+                                  failed)
+            warned = [
+                r['message'] for r in results if r['severity'] == 'warning'
+            ]
+            if warned:
+                ET.SubElement(case, 'system-out').text = '\n'.join(
+                    f'WARNING: {message}' for message in warned)
+    ET.ElementTree(suites).write(filename,
+                                 encoding='utf-8',
+                                 xml_declaration=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Escape JIRA text for MultiMarkdown output """
+
+import functools
+import re
+
+NAME_PATTERN = re.compile(r' \([0-9]+\)')
+RELNOTE_PATTERN = re.compile(r'^\<\!\-\- ([a-z]+) \-\-\>')
+
+# See: https://daringfireball.net/projects/markdown/syntax#backslash
+# We only escape a subset of special characters. We ignore characters
+# that only have significance at the start of a line.  The backslash
+# has to come first, so that nothing gets escaped twice.  (A chain of
+# str.replace() calls is several times faster than str.translate()
+# with multi-character replacements.)
+ESCAPES = tuple((char, "\\" + char) for char in "\\_<>*|`")
+
+# priorities, people, and components come up over and over again,
+# so short values are remembered rather than escaped every time
+SHORT_TEXT = 80
+CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def format_components(input_string):
+    """ format the string """
+    input_string = NAME_PATTERN.sub('', input_string).replace("'", "")
+    if input_string != "":
+        ret = input_string
+    else:
+        # some markdown parsers don't like empty tables
+        ret = "."
+    # dropping the quotes may have made a new match
+    return sanitize_markdown(NAME_PATTERN.sub("", ret))
+
+
+def sanitize_markdown(input_string):
+    """ Sanitize Markdown input so it can be handled by Python.
+
+        The expectation is that the input is already valid Markdown,
+        so no additional escaping is required. """
+    input_string = input_string.replace('\r', '')
+    input_string = input_string.rstrip()
+    return input_string
+
+
+def _sanitize_text(input_string):
+    for char, escaped in ESCAPES:
+        if char in input_string:
+            input_string = input_string.replace(char, escaped)
+    return sanitize_markdown(input_string.rstrip())
+
+
+_sanitize_short_text = functools.lru_cache(maxsize=CACHE_SIZE)(_sanitize_text)
+
+
+def sanitize_text(input_string):
+    """ Sanitize arbitrary text so it can be embedded in MultiMarkdown output.
+
+      Note that MultiMarkdown is not Markdown, and cannot be parsed as such.
+      For instance, when using pandoc, invoke it as `pandoc -f markdown_mmd`.
+
+      Calls sanitize_markdown at the end as a final pass.
+    """
+    if len(input_string) <= SHORT_TEXT:
+        return _sanitize_short_text(input_string)
+    return _sanitize_text(input_string)
+
+
+def processrelnote(input_string):
+    """ if release notes have a special marker, we'll treat them as already in markdown format """
+    fmt = RELNOTE_PATTERN.match(input_string)
+    if fmt is not None and fmt.group(1) == 'markdown':
+        return sanitize_markdown(input_string)
+    return sanitize_text(input_string)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Local store of JIRA issues for incremental runs """
+
+import json
+import threading
+
+from .jira import Jira
+
+# bump whenever SCHEMA or what Jira.to_json() returns changes
+SCHEMA_VERSION = 3
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS issues (
+    base_url TEXT NOT NULL,
+    key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    updated TEXT,
+    fixed INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (base_url, key)
+);
+CREATE TABLE IF NOT EXISTS fixversions (
+    base_url TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (base_url, key, version)
+);
+CREATE INDEX IF NOT EXISTS fixversions_by_version
+    ON fixversions (base_url, version);
+CREATE TABLE IF NOT EXISTS syncs (
+    base_url TEXT NOT NULL,
+    projects TEXT NOT NULL,
+    watermark REAL NOT NULL,
+    PRIMARY KEY (base_url, projects)
+);
+CREATE TABLE IF NOT EXISTS versions (
+    base_url TEXT NOT NULL,
+    projects TEXT NOT NULL,
+    version TEXT NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (base_url, projects, version)
+);
+'''
+
+
+class SyncStore:
+    """SQLite store of every issue seen, keyed by issue key.
+
+    Once a version has been loaded in full, later runs only need
+    the issues that JIRA says were updated since the last sync
+    of the project(s) to bring it up to date."""
+    def __init__(self, filename):
+        # sqlite3 is only loaded for --sync-db
+        import sqlite3  # pylint: disable=import-outside-toplevel
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        version = self._db.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # a store from a different release: start over
+            self._db.executescript(
+                'DROP TABLE IF EXISTS issues;'
+                'DROP TABLE IF EXISTS fixversions;'
+                'DROP TABLE IF EXISTS syncs;'
+                'DROP TABLE IF EXISTS versions;'
+                f'PRAGMA user_version = {SCHEMA_VERSION};')
+        self._db.executescript(SCHEMA)
+        self._refreshed = set()
+
+    @staticmethod
+    def _projects(projects):
+        return ','.join(sorted(p.upper() for p in projects))
+
+    def close(self):
+        """ flush and close the database """
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def needs_refresh(self, base_url, projects):
+        """ True the first time a set of projects is seen in this run """
+        key = (base_url, self._projects(projects))
+        with self._lock:
+            if key in self._refreshed:
+                return False
+            self._refreshed.add(key)
+            return True
+
+    def watermark(self, base_url, projects):
+        """ when the projects were last brought up to date, or None """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT watermark FROM syncs WHERE base_url=? AND projects=?',
+                (base_url, self._projects(projects))).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set_watermark(self, base_url, projects, watermark):
+        """ record that the projects are current as of watermark """
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)',
+                (base_url, self._projects(projects), watermark))
+
+    def loaded(self, base_url, projects, version):
+        """ has this version been loaded in full before? """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT 1 FROM versions '
+                'WHERE base_url=? AND projects=? AND version=?',
+                (base_url, self._projects(projects), version)).fetchone()
+        return row is not None
+
+    def set_loaded(self, base_url, projects, version):
+        """ record that a version has been loaded in full """
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR IGNORE INTO versions VALUES (?, ?, ?, NULL)',
+                (base_url, self._projects(projects), version))
+
+    def add_issues(self, base_url, jiras):
+        """ add or replace Jira objects """
+        with self._lock, self._db:
+            for jira in jiras:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?)',
+                    (base_url, jira.key,
+                     (jira.project or jira.key.split('-')[0]).upper(),
+                     jira.updated, jira.fixed, json.dumps(jira.to_json())))
+                self._db.execute(
+                    'DELETE FROM fixversions WHERE base_url=? AND key=?',
+                    (base_url, jira.key))
+                self._db.executemany(
+                    'INSERT OR IGNORE INTO fixversions VALUES (?, ?, ?)',
+                    [(base_url, jira.key, name)
+                     for name in jira.get_fix_versions()])
+
+    def issues(self, base_url, projects, versions, incompatible_label):
+        """ all of the stored, fixed issues for any of the versions """
+        projects = [p.upper() for p in projects]
+        pmarks = ','.join('?' * len(projects))
+        vmarks = ','.join('?' * len(versions))
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT DISTINCT issues.key, issues.data '
+                'FROM issues JOIN fixversions '
+                'ON issues.base_url = fixversions.base_url '
+                'AND issues.key = fixversions.key '
+                'WHERE issues.base_url=? '
+                f'AND fixversions.version COLLATE NOCASE IN ({vmarks}) '
+                f'AND issues.fixed AND issues.project IN ({pmarks}) '
+                'ORDER BY issues.key', [base_url] + list(versions) +
+                projects).fetchall()
+        return [
+            Jira.from_json(json.loads(row[1]), incompatible_label)
+            for row in rows
+        ]
+
+    def digest(self, base_url, projects, version):
+        """ the digest recorded the last time a version was written """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT digest FROM versions '
+                'WHERE base_url=? AND projects=? AND version=?',
+                (base_url, self._projects(projects), version)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set_digest(self, base_url, projects, version, digest):
+        """ remember what a version looked like when it was written """
+        with self._lock, self._db:
+            self._db.execute(
+                'UPDATE versions SET digest=? '
+                'WHERE base_url=? AND projects=? AND version=?',
+                (digest, base_url, self._projects(projects), version))
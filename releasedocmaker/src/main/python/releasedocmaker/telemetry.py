@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Where the time of a run goes """
+
+import contextlib
+import json
+import threading
+import time
+
+
+class Telemetry:
+    """Wall and CPU time per phase, plus counters, for a whole run.
+
+    Phases may nest (render includes write) and, with threads,
+    overlap, so their times are not meant to add up to the total."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = (time.perf_counter(), time.process_time())
+        self._phases = {}
+        self._counters = {}
+        self._versions = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ time the body of a with statement as part of phase name """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.merge({
+                name: [
+                    time.perf_counter() - wall,
+                    time.process_time() - cpu, 1
+                ]
+            })
+
+    def merge(self, phases):
+        """ add phase times, as returned by take() """
+        with self._lock:
+            for name, (wall, cpu, count) in phases.items():
+                totals = self._phases.setdefault(name, [0.0, 0.0, 0])
+                totals[0] += wall
+                totals[1] += cpu
+                totals[2] += count
+
+    def take(self):
+        """ hand over the phase times recorded so far and start again """
+        with self._lock:
+            phases = self._phases
+            self._phases = {}
+        return phases
+
+    def add(self, name, amount=1):
+        """ bump a counter """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def count(self, name):
+        """ the current value of a counter """
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def version(self, projects, version, issues):
+        """ record how many issues a version had """
+        with self._lock:
+            self._versions.append({
+                'projects': list(projects),
+                'version': str(version),
+                'issues': issues
+            })
+
+    def report(self, extra=None):
+        """ everything recorded, as a dict ready for json """
+        with self._lock:
+            report = {
+                'wall': time.perf_counter() - self._started[0],
+                'cpu': time.process_time() - self._started[1],
+                'phases': {
+                    name: {
+                        'wall': wall,
+                        'cpu': cpu,
+                        'count': count
+                    }
+                    for name, (wall, cpu, count) in self._phases.items()
+                },
+                'counters': dict(self._counters),
+                'versions': list(self._versions)
+            }
+        if extra:
+            report.update(extra)
+        return report
+
+    @staticmethod
+    def write_json(report, filename):
+        """ write a report() to a file """
+        with open(filename, 'w', encoding='utf-8') as reportfile:
+            json.dump(report, reportfile, indent=2, sort_keys=True)
+            reportfile.write('\n')
+
+    @staticmethod
+    def summary(report):
+        """ a report() as lines of text """
+        lines = [
+            f"Total: {report['wall']:.2f}s wall, {report['cpu']:.2f}s CPU"
+        ]
+        for name, phase in sorted(report['phases'].items()):
+            lines.append(f"  {name:<10} {phase['wall']:8.2f}s wall "
+                         f"{phase['cpu']:8.2f}s CPU {phase['count']:6d}x")
+        http = report['http']
+        lines.append(f"HTTP: {http['requests']} requests over "
+                     f"{http['connections']} connections, "
+                     f"{http['bytes']} bytes received, "
+                     f"{http['retries']} retries")
+        cache = report['cache']
+        if cache is not None:
+            lines.append(f"Response cache: {cache['hits']} hits, "
+                         f"{cache['misses']} misses "
+                         f"({cache['hit_rate']:.0%} hit rate)")
+        lines.append(f"Issues reused within the run: "
+                     f"{report['issue_cache']['hits']}")
+        for version in report['versions']:
+            lines.append(f"  {','.join(version['projects'])} "
+                         f"{version['version']}: {version['issues']} issues")
+        return lines
+
+
+METRICS = Telemetry()
@@ -18,8 +18,9 @@
 """ Utility methods used by releasedocmaker """
 
 import base64
+import gzip
 import os
-import re
+import threading
 import urllib.request
 import urllib.error
 import urllib.parse
@@ -28,32 +29,224 @@
 import http.client
 
 sys.dont_write_bytecode = True
+# pylint: disable=wrong-import-position
+from .cache import OfflineCacheMiss
+from .telemetry import METRICS
+# kept importable from here for existing callers
+from .sanitize import (NAME_PATTERN, format_components, sanitize_markdown,  # pylint: disable=unused-import
+                       sanitize_text, processrelnote)
+# pylint: enable=wrong-import-position
 
-NAME_PATTERN = re.compile(r' \([0-9]+\)')
+MAX_REDIRECTS = 5
 
 
-def get_jira(jira_url):
+class JiraResponse:  # pylint: disable=too-few-public-methods
+    """A fully read, already decoded, response from JIRA"""
+    def __init__(self, url, status, reason, headers, body):  # pylint: disable=too-many-arguments
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def read(self):
+        """ get the body of the response """
+        return self.body
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, shared by everything
+    that talks to JIRA during a run"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}
+        self.connections = 0
+        self.requests = 0
+
+    @staticmethod
+    def _route(scheme, netloc):
+        """ figure out if a proxy is in the way """
+        proxies = urllib.request.getproxies()
+        if scheme in proxies and not urllib.request.proxy_bypass(
+                netloc.split(':')[0]):
+            return urllib.parse.urlsplit(proxies[scheme]).netloc
+        return None
+
+    def _checkout(self, scheme, netloc):
+        """ get an idle connection or make a new one """
+        with self._lock:
+            self.requests += 1
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+            self.connections += 1
+
+        proxy = self._route(scheme, netloc)
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(proxy or netloc)
+            if proxy:
+                conn.set_tunnel(netloc)
+        else:
+            conn = http.client.HTTPConnection(proxy or netloc)
+        conn.proxied = proxy is not None and scheme != 'https'
+        return conn, False
+
+    def _checkin(self, scheme, netloc, conn):
+        """ return a connection so that it may be used again """
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(conn)
+
+    def request(self, method, url, body=None, headers=None):
+        """ make a request and read the whole (decoded) response """
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip')
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            response = self._request(parts, method, url, body, headers)
+            if response.status in (301, 302, 303, 307, 308) \
+               and 'Location' in response.headers:
+                url = urllib.parse.urljoin(url, response.headers['Location'])
+                if response.status == 303:
+                    method = 'GET'
+                    body = None
+                continue
+            return response
+        raise urllib.error.URLError(f'too many redirects for {url}')
+
+    def _request(self, parts, method, url, body, headers):  # pylint: disable=too-many-arguments
+        """ do a single request/response on a pooled connection """
+        while True:
+            conn, reused = self._checkout(parts.scheme, parts.netloc)
+            path = url if conn.proxied else urllib.parse.urlunsplit(
+                ('', '', parts.path or '/', parts.query, ''))
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError,
+                    ConnectionResetError) as err:
+                conn.close()
+                # the server may have quietly dropped an idle
+                # connection, so try again on a fresh one
+                if reused:
+                    continue
+                raise urllib.error.URLError(err) from err
+            except OSError as err:
+                conn.close()
+                raise urllib.error.URLError(err) from err
+            except http.client.HTTPException:
+                conn.close()
+                raise
+            break
+
+        METRICS.add('bytes_received', len(data))
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(parts.scheme, parts.netloc, conn)
+
+        if resp.getheader('Content-Encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        return JiraResponse(url, resp.status, resp.reason, resp.headers,
+                            data)
+
+    def stats(self):
+        """ how many connections were needed for how many requests """
+        with self._lock:
+            return {'connections': self.connections, 'requests': self.requests}
+
+    def close(self):
+        """ close all of the idle connections """
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle = {}
+
+
+POOL = ConnectionPool()
+CACHE = None
+
+
+def set_cache(cache):
+    """ use a ResponseCache (or None) for all JIRA requests """
+    global CACHE  # pylint: disable=global-statement
+    CACHE = cache
+
+
+def get_cache():
+    """ the ResponseCache in use, if any """
+    return CACHE
+
+
+def fetch(method, url, headers, body=None):
+    """ make a request, going through the response cache if there is one """
+    if CACHE is None:
+        return POOL.request(method, url, body=body, headers=headers)
+
+    key = CACHE.key(method, url, body, headers.get('Authorization'))
+    entry = CACHE.lookup(key)
+    if entry is not None and CACHE.fresh(entry):
+        CACHE.touch(entry)
+        return JiraResponse(url, 200, 'OK', {}, entry.body)
+    if CACHE.offline:
+        raise OfflineCacheMiss(url)
+
+    if entry is not None:
+        headers = dict(headers)
+        headers.update(entry.validators())
+    response = POOL.request(method, url, body=body, headers=headers)
+    if response.status == 304 and entry is not None:
+        CACHE.revalidated(entry, response.headers.get('ETag'),
+                          response.headers.get('Last-Modified'))
+        return JiraResponse(url, 200, 'OK', response.headers, entry.body)
+
+    CACHE.miss()
+    if response.status == 200:
+        CACHE.store(key, url, response.read(), response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'))
+    return response
+
+
+def get_jira(jira_url, data=None):
     """ Provide standard method for fetching content from apache jira and
-        handling of potential errors. Returns urllib2 response or
+        handling of potential errors. If data is given, it is sent
+        as the JSON body of a POST. Returns a JiraResponse or
         raises one of several exceptions."""
 
     username = os.environ.get('RDM_JIRA_USERNAME')
     password = os.environ.get('RDM_JIRA_PASSWORD')
 
-    req = urllib.request.Request(jira_url)
+    headers = {}
     if username and password:
-        basicauth = base64.b64encode(f"{username}:{password}").replace(
-            '\n', '')
-        req.add_header('Authorization', f'Basic {basicauth}')
+        basicauth = base64.b64encode(
+            f"{username}:{password}".encode('utf-8')).decode('ascii')
+        headers['Authorization'] = f'Basic {basicauth}'
+
+    method = 'GET'
+    body = None
+    if data is not None:
+        method = 'POST'
+        body = json.dumps(data).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
 
     try:
-        response = urllib.request.urlopen(req)  # pylint: disable=consider-using-with
-    except urllib.error.HTTPError as http_err:
-        code = http_err.code
-        print(f"JIRA returns HTTP error {code}: {http_err.msg}. Aborting.")
-        error_response = http_err.read()
+        response = fetch(method, jira_url, headers, body)
+    except urllib.error.URLError as url_err:
+        print(f"Error contacting JIRA: {jira_url}\n")
+        print(f"Reason: {url_err.reason}")
+        raise url_err
+    except http.client.BadStatusLine as err:
+        raise err
+    except OfflineCacheMiss:
+        print(f"{jira_url} is not in the response cache. Aborting.")
+        sys.exit(1)
+
+    if response.status >= 400:
+        print(f"JIRA returns HTTP error {response.status}: "
+              f"{response.reason}. Aborting.")
         try:
-            error_response = json.loads(error_response)
+            error_response = json.loads(response.read())
             print("- Please ensure that specified authentication, projects,"\
                   " fixVersions etc. are correct.")
             for message in error_response['errorMessages']:
@@ -61,80 +254,9 @@ def get_jira(jira_url):
         except ValueError:
             print("FATAL: Could not parse json response from server.")
         sys.exit(1)
-    except urllib.error.URLError as url_err:
-        print(f"Error contacting JIRA: {jira_url}\n")
-        print(f"Reason: {url_err.reason}")
-        raise url_err
-    except http.client.BadStatusLine as err:
-        raise err
     return response
 
 
-def format_components(input_string):
-    """ format the string """
-    input_string = re.sub(NAME_PATTERN, '', input_string).replace("'", "")
-    if input_string != "":
-        ret = input_string
-    else:
-        # some markdown parsers don't like empty tables
-        ret = "."
-    return sanitize_markdown(re.sub(NAME_PATTERN, "", ret))
-
-
-def sanitize_markdown(input_string):
-    """ Sanitize Markdown input so it can be handled by Python.
-
-        The expectation is that the input is already valid Markdown,
-        so no additional escaping is required. """
-    input_string = input_string.replace('\r', '')
-    input_string = input_string.rstrip()
-    return input_string
-
-
-def sanitize_text(input_string):
-    """ Sanitize arbitrary text so it can be embedded in MultiMarkdown output.
-
-      Note that MultiMarkdown is not Markdown, and cannot be parsed as such.
-      For instance, when using pandoc, invoke it as `pandoc -f markdown_mmd`.
-
-      Calls sanitize_markdown at the end as a final pass.
-    """
-    escapes = {}
-    # See: https://daringfireball.net/projects/markdown/syntax#backslash
-    # We only escape a subset of special characters. We ignore characters
-    # that only have significance at the start of a line.
-    slash_escapes = "_<>*|"
-    slash_escapes += "`"
-    slash_escapes += "\\"
-    all_chars = set()
-    # Construct a set of escapes
-    for char in slash_escapes:
-        all_chars.add(char)
-    for char in all_chars:
-        escapes[char] = "\\" + char
-
-    # Build the output string character by character to prevent double escaping
-    output_string = ""
-    for char in input_string:
-        out = char
-        if escapes.get(char):
-            out = escapes[char]
-        output_string += out
-
-    return sanitize_markdown(output_string.rstrip())
-
-
-def processrelnote(input_string):
-    """ if release notes have a special marker, we'll treat them as already in markdown format """
-    relnote_pattern = re.compile(r'^\<\!\-\- ([a-z]+) \-\-\>')
-    fmt = relnote_pattern.match(input_string)
-    if fmt is None:
-        return sanitize_text(input_string)
-    return {
-        'markdown': sanitize_markdown(input_string),
-    }.get(fmt.group(1), sanitize_text(input_string))
-
-
 def to_unicode(obj):
     """ convert string to unicode """
     if obj is None:
@@ -143,50 +265,82 @@ def to_unicode(obj):
 
 
 class Outputs:
-    """Several different files to output to at the same time"""
+    """Several different files to output to at the same time.
+
+    Everything is kept in memory until close(), which writes each file
+    in one go to a temporary name and then renames it into place.
+    discard() throws it all away instead, so nothing is ever left
+    half-written."""
     def __init__(self, base_file_name, file_name_pattern, keys, params=None):
         if params is None:
             params = {}
         self.params = params
-        self.base = open(base_file_name % params, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+        self.base_file_name = base_file_name % dict(params, key='')
+        self.base = []
+        self._base_params = dict(params, key='')
+        self.file_names = {}
         self.others = {}
+        self._params = {}
         for key in keys:
-            both = dict(params)
-            both['key'] = key
-            filename = file_name_pattern % both
-            self.others[key] = open(filename, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+            self._params[key] = dict(params, key=key)
+            self.file_names[key] = file_name_pattern % self._params[key]
+            self.others[key] = []
 
     def write_all(self, pattern):
         """ write everything given a pattern """
-        both = dict(self.params)
-        both['key'] = ''
-        self.base.write(pattern % both)
-        for key, filehandle in self.others.items():
-            both = dict(self.params)
-            both['key'] = key
-            filehandle.write(pattern % both)
+        self.base.append(pattern % self._base_params)
+        for key, buffer in self.others.items():
+            buffer.append(pattern % self._params[key])
 
     def write_key_raw(self, key, input_string):
         """ write everything without changes """
-        self.base.write(input_string)
+        self.base.append(input_string)
         if key in self.others:
-            self.others[key].write(input_string.decode("utf-8"))
+            self.others[key].append(input_string)
+
+    @staticmethod
+    def _replace(file_name, chunks):
+        """ write a file under a temporary name, then rename it """
+        dirname = os.path.dirname(file_name)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        tmpname = os.path.join(
+            dirname, f".{os.path.basename(file_name)}.{os.getpid()}.tmp")
+        try:
+            with open(tmpname, 'w', encoding='utf-8') as filehandle:
+                filehandle.write(''.join(chunks))
+            os.replace(tmpname, file_name)
+        except OSError:
+            if os.path.exists(tmpname):
+                os.unlink(tmpname)
+            raise
 
     def close(self):
         """ close all the outputs """
-        self.base.close()
-        for value in list(self.others.values()):
-            value.close()
+        with METRICS.phase('write'):
+            self._replace(self.base_file_name, self.base)
+            for key, buffer in self.others.items():
+                self._replace(self.file_names[key], buffer)
+        self.discard()
 
-    def write_list(self, mylist, skip_credits, base_url):
-        """ Take a Jira object and write out the relevant parts in a multimarkdown table line"""
-        for jira in sorted(mylist):
-            if skip_credits:
-                line = '| [{id}]({base_url}/browse/{id}) | {summary} |  ' \
-                       '{priority} | {component} |\n'
-            else:
-                line = '| [{id}]({base_url}/browse/{id}) | {summary} |  ' \
-                       '{priority} | {component} | {reporter} | {assignee} |\n'
+    def discard(self):
+        """ forget everything written so far """
+        self.base = []
+        for key in self.others:
+            self.others[key] = []
+
+    @staticmethod
+    def format_list(mylist, skip_credits, base_url, key=None):
+        """ Take Jira objects and turn the relevant parts into multimarkdown
+            table lines, returning (project, line) pairs """
+        if skip_credits:
+            line = '| [{id}]({base_url}/browse/{id}) | {summary} |  ' \
+                   '{priority} | {component} |\n'
+        else:
+            line = '| [{id}]({base_url}/browse/{id}) | {summary} |  ' \
+                   '{priority} | {component} | {reporter} | {assignee} |\n'
+        rows = []
+        for jira in sorted(mylist, key=key):
             args = {
                 'id': jira.get_id(),
                 'base_url': base_url,
@@ -196,5 +350,20 @@ def write_list(self, mylist, skip_credits, base_url):
                 'reporter': sanitize_text(jira.get_reporter()),
                 'assignee': sanitize_text(jira.get_assignee())
             }
-            line = line.format(**args)
-            self.write_key_raw(jira.get_project(), line)
+            rows.append((jira.get_project(), line.format(**args)))
+        return rows
+
+    def write_rows(self, header, rows):
+        """ write (project, line) pairs from format_list, with the header
+            first, to each output that has at least one of them """
+        if rows:
+            self.base.append(header + ''.join(row for _, row in rows))
+        for project, buffer in self.others.items():
+            mine = [row for rowkey, row in rows if rowkey == project]
+            if mine:
+                buffer.append(header + ''.join(mine))
+
+    def write_list(self, mylist, skip_credits, base_url, key=None):
+        """ Take a Jira object and write out the relevant parts in a multimarkdown table line"""
+        self.write_rows('', self.format_list(mylist, skip_credits, base_url,
+                                             key))
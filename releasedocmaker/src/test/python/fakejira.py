@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" A small, in-process JIRA for the releasedocmaker tests
+
+    It answers the handful of REST calls releasedocmaker makes from a
+    list of issues held in memory, and records what it was asked. """
+
+import gzip
+import hashlib
+import http.server
+import json
+import pathlib
+import re
+import subprocess
+import sys
+import threading
+import urllib.parse
+
+SRCDIR = pathlib.Path(__file__).resolve().parents[2] / 'main' / 'python'
+
+FIELDS = [
+    {
+        'id': 'summary',
+        'name': 'Summary'
+    },
+    {
+        'id': 'description',
+        'name': 'Description'
+    },
+    {
+        'id': 'fixVersions',
+        'name': 'Fix Version/s'
+    },
+    {
+        'id': 'labels',
+        'name': 'Labels'
+    },
+    {
+        'id': 'customfield_1',
+        'name': 'Release Note'
+    },
+    {
+        'id': 'customfield_2',
+        'name': 'Hadoop Flags'
+    },
+    {
+        'id': 'customfield_3',
+        'name': 'Flags'
+    },
+]
+
+
+def make_issue(project, num, fixversions, **fields):
+    """ an issue as the search API returns it; fields override the
+        defaults """
+    issue = {
+        'key': f'{project}-{num}',
+        'fields': {
+            'summary': f'Summary of {project}-{num}',
+            'description': f'Description of {project}-{num}',
+            'priority': {
+                'name': 'Major'
+            },
+            'assignee': {
+                'displayName': 'Some Developer'
+            },
+            'reporter': {
+                'displayName': 'Some Reporter'
+            },
+            'components': [{
+                'name': 'core'
+            }],
+            'issuetype': {
+                'name': 'Bug'
+            },
+            'project': {
+                'key': project
+            },
+            'fixVersions': [{
+                'name': name
+            } for name in fixversions],
+            'resolutiondate':
+            f'2020-01-{num % 28 + 1:02d}T10:00:00.000+0000',
+            'updated': '2020-02-01T10:00:00.000+0000',
+            'resolution': {
+                'name': 'Fixed'
+            },
+            'labels': [],
+            'customfield_1': None,
+            'customfield_2': None,
+            'customfield_3': None,
+        }
+    }
+    issue['fields'].update(fields)
+    return issue
+
+
+def _strings(text):
+    return [item.strip().strip("'\"") for item in text.split(',')]
+
+
+class FakeJira:
+    """ a JIRA server on a free local port, serving issues and versions
+
+        versions is {project: [version json, ...]}; a project that is
+        not in it has the fix versions of its issues.  cap limits the
+        size of a search page, whatever the client asks for.  Changing
+        etag_prefix changes the ETags handed out while the old ones are
+        still honoured, the way a redeployed server might. """
+
+    def __init__(self, issues=(), versions=None, cap=100):
+        self.issues = list(issues)
+        self.versions = versions or {}
+        self.cap = cap
+        self.lock = threading.Lock()
+        self.requests = []
+        self.headers = []
+        self.redirects = {}
+        self.etag_prefix = ''
+        self.connections = 0
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                      self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+
+    @property
+    def url(self):
+        """ the base URL to give releasedocmaker """
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def searches(self):
+        """ the parameters of every search so far """
+        with self.lock:
+            return [
+                params for path, params in self.requests
+                if path.endswith('/search')
+            ]
+
+    def match(self, jql):
+        """ the issues a (simple) JQL query selects, in JIRA's order """
+        found = self.issues
+        mobj = re.search(r'project in \(([^)]*)\)', jql)
+        if mobj:
+            projects = [name.upper() for name in _strings(mobj.group(1))]
+            found = [
+                issue for issue in found
+                if issue['fields']['project']['key'] in projects
+            ]
+        mobj = re.search(r'fixVersion in \(([^)]*)\)', jql)
+        if mobj:
+            names = _strings(mobj.group(1))
+            found = [
+                issue for issue in found if any(
+                    fixversion['name'] in names
+                    for fixversion in issue['fields']['fixVersions'])
+            ]
+        if 'resolution = Fixed' in jql:
+            found = [
+                issue for issue in found
+                if issue['fields']['resolution']['name'] == 'Fixed'
+            ]
+        mobj = re.search(r'key in \(([^)]*)\)', jql)
+        if mobj:
+            keys = _strings(mobj.group(1))
+            found = [issue for issue in found if issue['key'] in keys]
+        mobj = re.search(r'updated >= "([^"]*)"', jql)
+        if mobj:
+            since = mobj.group(1).replace('/', '-').replace(' ', 'T')
+            found = [
+                issue for issue in found
+                if issue['fields']['updated'] >= since
+            ]
+        return found
+
+    def project_versions(self, project):
+        """ the versions of a project, or None if there is no such
+            project """
+        if project in self.versions:
+            return self.versions[project]
+        names = []
+        for issue in self.issues:
+            if issue['fields']['project']['key'] == project:
+                names.extend(fixversion['name']
+                             for fixversion in issue['fields']['fixVersions']
+                             if fixversion['name'] not in names)
+        if not names:
+            return None
+        return [{'name': name, 'released': False} for name in names]
+
+    def search(self, params):
+        """ one page of a search """
+        start = int(params.get('startAt', 0))
+        size = min(int(params.get('maxResults', 50)), self.cap)
+        found = self.match(params['jql'])
+        fields = params.get('fields')
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        page = []
+        for issue in found[start:start + size]:
+            if fields:
+                issue = {
+                    'key': issue['key'],
+                    'fields': {
+                        name: value
+                        for name, value in issue['fields'].items()
+                        if name in fields
+                    }
+                }
+            page.append(issue)
+        return {
+            'startAt': start,
+            'maxResults': size,
+            'total': len(found),
+            'issues': page
+        }
+
+    def answer(self, path, params):
+        """ (status, json) for a request """
+        if path == '/rest/api/2/field':
+            return 200, FIELDS
+        mobj = re.match(r'/rest/api/2/project/([^/]+)/versions$', path)
+        if mobj:
+            versions = self.project_versions(mobj.group(1))
+            if versions is None:
+                return 404, {'errorMessages': ['No project could be found']}
+            return 200, versions
+        if path == '/rest/api/2/search':
+            return 200, self.search(params)
+        return 404, {'errorMessages': ['not found']}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            """ hands every request to the FakeJira """
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections += 1
+
+            def _serve(self, params):
+                url = urllib.parse.urlparse(self.path)
+                params.update(urllib.parse.parse_qsl(url.query))
+                with fake.lock:
+                    fake.requests.append((url.path, params))
+                    fake.headers.append(dict(self.headers))
+                if url.path in fake.redirects:
+                    self.send_response(302)
+                    self.send_header('Location', fake.redirects[url.path])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                status, data = fake.answer(url.path, params)
+                body = json.dumps(data).encode('utf-8')
+                digest = hashlib.sha256(body).hexdigest()[:16]
+                etag = f'"{fake.etag_prefix}{digest}"'
+                if status == 200 and self.headers.get(
+                        'If-None-Match', '').endswith(f'{digest}"'):
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """ a GET """
+                self._serve({})
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """ a POST with a JSON body """
+                length = int(self.headers.get('Content-Length', 0))
+                self._serve(json.loads(self.rfile.read(length) or b'{}'))
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        return Handler
+
+
+def written(outdir, url):
+    """ every markdown file under outdir with its contents, sorted, and
+        with the fake JIRA's URL (which has a random port) replaced """
+    return sorted((path.relative_to(outdir),
+                   path.read_text(encoding='utf-8').replace(url, 'JIRA'))
+                  for path in pathlib.Path(outdir).rglob('*.md'))
+
+
+def releasedocmaker(*args, cwd=None):
+    """ run releasedocmaker.py, returning the CompletedProcess """
+    return subprocess.run(
+        [sys.executable,
+         str(SRCDIR / 'releasedocmaker.py')] + [str(arg) for arg in args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False)
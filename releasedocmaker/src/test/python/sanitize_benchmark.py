@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Micro-benchmark for releasedocmaker.sanitize
+
+    Runs the text escaping that releasedocmaker does for every issue
+    over a synthetic release, once with the character-at-a-time code
+    that sanitize replaced and once with sanitize itself:
+
+        python3 sanitize_benchmark.py [issues]
+"""
+
+import pathlib
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(
+    0, str(pathlib.Path(__file__).resolve().parents[2] / 'main' / 'python'))
+# pylint: disable=wrong-import-position
+from releasedocmaker import sanitize
+# pylint: enable=wrong-import-position
+
+PRIORITIES = ['Blocker', 'Critical', 'Major', 'Minor', 'Trivial']
+PEOPLE = [f'Developer_{num} <dev{num}@example.org>' for num in range(200)]
+COMPONENTS = ['build', 'fs (1)', "ipc's", 'common', 'documentation', '']
+
+
+def old_sanitize_markdown(input_string):
+    """ sanitize_markdown as it used to be """
+    input_string = input_string.replace('\r', '')
+    input_string = input_string.rstrip()
+    return input_string
+
+
+def old_sanitize_text(input_string):
+    """ sanitize_text as it used to be """
+    escapes = {}
+    slash_escapes = "_<>*|"
+    slash_escapes += "`"
+    slash_escapes += "\\"
+    all_chars = set()
+    for char in slash_escapes:
+        all_chars.add(char)
+    for char in all_chars:
+        escapes[char] = "\\" + char
+
+    output_string = ""
+    for char in input_string:
+        out = char
+        if escapes.get(char):
+            out = escapes[char]
+        output_string += out
+
+    return old_sanitize_markdown(output_string.rstrip())
+
+
+def old_format_components(input_string):
+    """ format_components as it used to be """
+    name_pattern = re.compile(r' \([0-9]+\)')
+    input_string = re.sub(name_pattern, '', input_string).replace("'", "")
+    if input_string != "":
+        ret = input_string
+    else:
+        ret = "."
+    return old_sanitize_markdown(re.sub(name_pattern, "", ret))
+
+
+def old_processrelnote(input_string):
+    """ processrelnote as it used to be """
+    relnote_pattern = re.compile(r'^\<\!\-\- ([a-z]+) \-\-\>')
+    fmt = relnote_pattern.match(input_string)
+    if fmt is None:
+        return old_sanitize_text(input_string)
+    return {
+        'markdown': old_sanitize_markdown(input_string),
+    }.get(fmt.group(1), old_sanitize_text(input_string))
+
+
+def make_issues(count):
+    """ a release worth of issue fields """
+    rand = random.Random(0)
+    words = ['the', 'file_system', '<b>', '*bold*', 'a|b', '`code`', 'c:\\x',
+             'NameNode', 'should', 'not', 'crash', 'when', 'restarted']
+    issues = []
+    for num in range(count):
+        summary = ' '.join(rand.choice(words) for _ in range(12))
+        note = ' '.join(rand.choice(words) for _ in range(rand.choice(
+            [0, 0, 50, 800])))
+        if note and rand.random() < 0.2:
+            note = '<!-- markdown -->\n' + note
+        issues.append({
+            'id': f'HADOOP-{num}',
+            'summary': summary,
+            'priority': rand.choice(PRIORITIES),
+            'reporter': rand.choice(PEOPLE),
+            'assignee': rand.choice(PEOPLE),
+            'components': ', '.join(rand.sample(COMPONENTS, 2)),
+            'note': note,
+        })
+    return issues
+
+
+def render(issues, text, components, relnote):
+    """ escape everything the way releasedocmaker does for an issue """
+    for issue in issues:
+        text(issue['id'])
+        text(issue['summary'])
+        text(issue['priority'])
+        text(issue['reporter'])
+        text(issue['assignee'])
+        components(issue['components'])
+        if issue['note']:
+            relnote(issue['note'])
+
+
+def main():
+    """ run both versions and report the times """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    issues = make_issues(count)
+
+    for issue in issues:
+        assert sanitize.sanitize_text(issue['summary']) == \
+            old_sanitize_text(issue['summary'])
+        assert sanitize.processrelnote(issue['note']) == \
+            old_processrelnote(issue['note'])
+        assert sanitize.format_components(issue['components']) == \
+            old_format_components(issue['components'])
+
+    old = min(
+        timeit.repeat(lambda: render(issues, old_sanitize_text,
+                                     old_format_components,
+                                     old_processrelnote),
+                      number=1,
+                      repeat=3))
+    new = min(
+        timeit.repeat(lambda: render(issues, sanitize.sanitize_text,
+                                     sanitize.format_components,
+                                     sanitize.processrelnote),
+                      number=1,
+                      repeat=3))
+    print(f"{count} issues: old {old * 1000:.1f}ms, "
+          f"new {new * 1000:.1f}ms ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" The keep-alive connection pool behind get_jira
+
+        python3 -m pytest test_connection_pool.py
+"""
+
+import json
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fakejira import FakeJira, FIELDS, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker import utils
+# pylint: enable=wrong-import-position
+
+
+class TestConnectionPool(unittest.TestCase):
+    """ requests share connections """
+
+    def setUp(self):
+        self.pool = utils.ConnectionPool()
+        self.addCleanup(self.pool.close)
+
+    def test_reuse(self):
+        """ one connection serves many requests, one after another """
+        with FakeJira() as fake:
+            for _ in range(20):
+                response = self.pool.request('GET',
+                                             f'{fake.url}/rest/api/2/field')
+                self.assertEqual(json.loads(response.read()), FIELDS)
+        self.assertEqual(fake.connections, 1)
+        self.assertEqual(self.pool.stats(), {
+            'connections': 1,
+            'requests': 20
+        })
+
+    def test_concurrent(self):
+        """ concurrent requests never open more connections than
+            there are threads """
+        with FakeJira() as fake:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                bodies = list(
+                    executor.map(
+                        lambda _: self.pool.request(
+                            'GET', f'{fake.url}/rest/api/2/field').read(),
+                        range(40)))
+        self.assertTrue(all(json.loads(body) == FIELDS for body in bodies))
+        self.assertLessEqual(fake.connections, 4)
+
+    def test_gzip_and_redirect(self):
+        """ responses are asked for gzipped, and redirects followed """
+        with FakeJira() as fake:
+            fake.redirects['/old/rest/api/2/field'] = '/rest/api/2/field'
+            response = self.pool.request('GET',
+                                         f'{fake.url}/old/rest/api/2/field')
+        self.assertEqual(json.loads(response.read()), FIELDS)
+        self.assertIn('gzip', fake.headers[-1]['Accept-Encoding'])
+
+    def test_basic_auth(self):
+        """ get_jira sends the credentials from the environment """
+        with FakeJira() as fake, \
+                mock.patch.dict(os.environ, {
+                    'RDM_JIRA_USERNAME': 'user',
+                    'RDM_JIRA_PASSWORD': 'secret'
+                }):
+            utils.get_jira(f'{fake.url}/rest/api/2/field')
+        self.assertEqual(fake.headers[-1]['Authorization'],
+                         'Basic dXNlcjpzZWNyZXQ=')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Modules that are only loaded when they are used
+
+        python3 -m pytest test_imports.py
+"""
+
+import subprocess
+import sys
+import unittest
+
+from fakejira import SRCDIR
+
+DEFERRED = ('dateutil', 'multiprocessing', 'sqlite3', 'tomllib',
+            'xml.etree.ElementTree')
+
+
+class TestImports(unittest.TestCase):
+    """ importing releasedocmaker leaves the slow optional modules be """
+
+    def test_deferred(self):
+        """ none of them are loaded by the import itself """
+        result = subprocess.run([
+            sys.executable, '-c', 'import sys, releasedocmaker; '
+            f'print([name for name in {DEFERRED!r} if name in sys.modules])'
+        ],
+                                cwd=SRCDIR,
+                                capture_output=True,
+                                text=True,
+                                check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Sharing issues between searches with ISSUE_CACHE
+
+        python3 -m pytest test_issue_cache.py
+"""
+
+import sys
+import unittest
+from unittest import mock
+
+from fakejira import FakeJira, make_issue, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker import jira
+from releasedocmaker.jira import IssueCache, Jira, JiraIter
+# pylint: enable=wrong-import-position
+
+LABEL = jira.BACKWARD_INCOMPATIBLE_LABEL
+
+
+def kinds(fake):
+    """ what each search asked for: full issues, stubs or keys """
+    found = []
+    for params in fake.searches():
+        if params['jql'].startswith('key in'):
+            found.append('keys')
+        elif params['fields'] == ['updated']:
+            found.append('stubs')
+        else:
+            found.append('full')
+    return found
+
+
+class TestIssueCache(unittest.TestCase):
+    """ the cache itself """
+
+    def test_lru(self):
+        """ the least recently used issues go first """
+        cache = IssueCache(max_size=3)
+        jiras = [
+            Jira(make_issue('TEST', num, ['1.0']), {}) for num in range(4)
+        ]
+        cache.add('url', LABEL, jiras[:3])
+        self.assertIs(cache.get('url', LABEL, 'TEST-0', jiras[0].updated),
+                      jiras[0])
+        cache.add('url', LABEL, jiras[3:])
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get('url', LABEL, 'TEST-1', jiras[1].updated))
+        self.assertIsNotNone(
+            cache.get('url', LABEL, 'TEST-0', jiras[0].updated))
+        self.assertIsNone(cache.get('url', LABEL, 'TEST-0', 'later'))
+        self.assertIsNone(cache.get('url', 'other', 'TEST-0',
+                                    jiras[0].updated))
+
+    def test_overlap(self):
+        """ keys-only searches are only worth it with enough hits """
+        cache = IssueCache()
+        self.assertFalse(cache.worth_stubs('scope'))
+        cache.record('scope', 1, 4)
+        self.assertFalse(cache.worth_stubs('scope'))
+        cache.record('scope', 0, 0)
+        self.assertFalse(cache.worth_stubs('scope'))
+        cache.record('scope', 2, 4)
+        self.assertTrue(cache.worth_stubs('scope'))
+        self.assertFalse(cache.worth_stubs('other'))
+
+
+class TestCollectJiras(unittest.TestCase):
+    """ how collect_jiras uses the cache """
+
+    def setUp(self):
+        patcher = mock.patch.object(jira, 'ISSUE_CACHE', IssueCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def collect(self, fake, version, projects=('TEST', )):
+        """ the keys of the issues of a version """
+        return [
+            found.key for found in JiraIter.collect_jiras(
+                fake.url, [version], list(projects), 2)
+        ]
+
+    def test_disjoint(self):
+        """ versions without shared issues never search twice """
+        issues = [
+            make_issue('TEST', num, [f'1.{num % 3}']) for num in range(90)
+        ]
+        with FakeJira(issues, cap=20) as fake:
+            for version in ('1.0', '1.1', '1.2', '1.0'):
+                self.assertEqual(len(self.collect(fake, version)), 30)
+            self.assertEqual(set(kinds(fake)), {'full'})
+            self.assertEqual(len(fake.searches()), 4 * 2)
+
+    def test_shared(self):
+        """ once versions share issues, only keys and changed issues
+            are asked for """
+        issues = [make_issue('TEST', num, ['1.0', '1.1']) for num in range(50)]
+        issues.append(make_issue('TEST', 99, ['1.1']))
+        with FakeJira(issues) as fake:
+            expected = self.collect(fake, '1.1')
+            self.assertEqual(self.collect(fake, '1.0'), expected[:-1])
+            self.assertEqual(kinds(fake), ['full', 'full'])
+            issues[3]['fields']['updated'] = '2100-01-01T00:00:00.000+0000'
+            issues[3]['fields']['summary'] = 'Changed'
+            found = JiraIter.collect_jiras(fake.url, ['1.1'], ['TEST'], 2)
+            self.assertEqual([issue.key for issue in found], expected)
+            self.assertEqual(found[3].summary, 'Changed')
+            self.assertEqual(kinds(fake), ['full', 'full', 'stubs', 'keys'])
+            self.assertIn('TEST-3)', fake.searches()[-1]['jql'])
+
+    def test_projects(self):
+        """ each set of projects keeps its own hit rate """
+        issues = [make_issue('ONE', num, ['1.0']) for num in range(10)]
+        issues += [make_issue('TWO', num, ['1.0']) for num in range(10)]
+        with FakeJira(issues) as fake:
+            self.collect(fake, '1.0', ['ONE'])
+            self.collect(fake, '1.0', ['ONE'])
+            self.collect(fake, '1.0', ['TWO'])
+            self.collect(fake, '1.0', ['ONE'])
+            self.assertEqual(kinds(fake), ['full', 'full', 'full', 'stubs'])
+
+    def test_collect_keys(self):
+        """ every issue is fetched in full, whatever the page size """
+        issues = [make_issue('TEST', num, ['1.0']) for num in range(250)]
+        with FakeJira(issues, cap=30) as fake:
+            found = JiraIter.collect_keys(
+                fake.url, [issue['key'] for issue in issues], 2)
+        self.assertEqual(sorted(found),
+                         sorted(issue['key'] for issue in issues))
+        for issue in issues:
+            self.assertEqual(found[issue['key']].summary,
+                             issue['fields']['summary'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Limited search fields and searches by issue key
+
+        python3 -m pytest test_jira_paging.py
+"""
+
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.jira import JiraIter
+# pylint: enable=wrong-import-position
+
+
+def incompatible(num):
+    """ an incompatible issue on a JIRA without a release note field,
+        so that its release note is its description """
+    issue = make_issue('TEST', num, ['1.0'], labels=['backward-incompatible'])
+    for field in ('customfield_1', 'customfield_2', 'customfield_3'):
+        del issue['fields'][field]
+    return issue
+
+
+ISSUES = [incompatible(num) for num in range(1, 251)]
+
+
+class TestJiraPaging(unittest.TestCase):
+    """ key searches must page when JIRA caps the page size """
+
+    def test_search_keys(self):
+        """ every issue comes back, however small the pages are """
+        keys = sorted(issue['key'] for issue in ISSUES)
+        for cap in (7, 50, 100, 1000):
+            with FakeJira(ISSUES, cap=cap) as fake:
+                issues = JiraIter.search_keys(fake.url, keys, ['summary'], 2)
+            self.assertEqual(sorted(issue['key'] for issue in issues), keys)
+            self.assertEqual(
+                {tuple(issue['fields']) for issue in issues}, {('summary', )})
+
+    def test_descriptions(self):
+        """ only descriptions that are needed are fetched, and all of
+            them arrive even when JIRA returns small pages """
+        with FakeJira(ISSUES[:10] + [make_issue('TEST', 300, ['1.0'])],
+                      cap=3) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0', cwd=outdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            notes = (pathlib.Path(outdir) / 'RELEASENOTES.md').read_text(
+                encoding='utf-8')
+            searches = fake.searches()
+
+        for issue in ISSUES[:10]:
+            self.assertIn(issue['fields']['description'], notes)
+        self.assertNotIn('Description of TEST-300', notes)
+        first = [
+            params for params in searches if 'fixVersion' in params['jql']
+        ]
+        self.assertTrue(first)
+        for params in first:
+            self.assertNotIn('description', params['fields'])
+            self.assertIn('summary', params['fields'])
+        described = [
+            params for params in searches if params['jql'].startswith('key in')
+        ]
+        self.assertEqual(len(described), 4)
+        self.assertEqual([params['fields'] for params in described],
+                         [['description']] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Jira records built from search results
+
+        python3 -m pytest test_jira_record.py
+"""
+
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.jira import Jira
+# pylint: enable=wrong-import-position
+
+FIELD_ID_MAP = {
+    'Fix Version/s': 'fixVersions',
+    'Labels': 'labels',
+    'Release Note': 'customfield_1',
+    'Hadoop Flags': 'customfield_2',
+    'Flags': 'customfield_3'
+}
+
+
+class TestJiraRecord(unittest.TestCase):
+    """ the record keeps what is rendered, and nothing else """
+
+    def test_fields(self):
+        """ values are pulled out of the JSON """
+        issue = make_issue('TEST',
+                           1, ['1.0', '1.1'],
+                           customfield_1='a note',
+                           customfield_2=[{
+                               'value': 'Incompatible change'
+                           }, {
+                               'value': 'Reviewed'
+                           }],
+                           customfield_3=[{
+                               'value': 'Important'
+                           }])
+        jira = Jira(issue, FIELD_ID_MAP)
+        self.assertFalse(hasattr(jira, '__dict__'))
+        self.assertEqual(jira.get_id(), 'TEST-1')
+        self.assertEqual(jira.get_summary(), 'Summary of TEST-1')
+        self.assertEqual(jira.get_components(), 'core')
+        self.assertEqual(jira.get_fix_versions(), ['1.0', '1.1'])
+        self.assertEqual(jira.fix_versions, ('1.0', '1.1'))
+        self.assertEqual(jira.get_release_note(), 'a note')
+        self.assertTrue(jira.get_incompatible_change())
+        self.assertTrue(jira.reviewed)
+        self.assertTrue(jira.get_important())
+
+    def test_round_trip(self):
+        """ to_json and from_json give back the same record """
+        issue = make_issue('TEST', 2, ['1.0'], labels=['my-label'])
+        del issue['fields']['customfield_2']
+        jira = Jira(issue, FIELD_ID_MAP, 'my-label')
+        again = Jira.from_json(json.loads(json.dumps(jira.to_json())),
+                               'my-label')
+        for name in Jira.__slots__:
+            self.assertEqual(getattr(again, name), getattr(jira, name), name)
+        self.assertTrue(again.get_incompatible_change())
+        self.assertFalse(
+            Jira.from_json(jira.to_json()).get_incompatible_change())
+
+    def test_incompatible_label(self):
+        """ -X reaches the records """
+        issues = [make_issue('TEST', 3, ['1.0'], labels=['breaks-things'])]
+        del issues[0]['fields']['customfield_2']
+        with FakeJira(issues) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0', '-X',
+                                     'breaks-things', cwd=outdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            changelog = (pathlib.Path(outdir) / 'CHANGELOG.md').read_text(
+                encoding='utf-8')
+        self.assertIn('INCOMPATIBLE', changelog)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" --lint-only and its JSON and JUnit reports
+
+        python3 -m pytest test_lint_only.py
+"""
+
+import json
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from fakejira import FakeJira, make_issue, releasedocmaker
+
+ISSUES = [
+    make_issue('TEST', 1, ['1.0']),
+    make_issue('TEST', 2, ['1.0'], assignee=None),
+    make_issue('TEST',
+               3, ['1.0'],
+               customfield_2=[{
+                   'value': 'Incompatible change'
+               }]),
+    make_issue('TEST', 4, ['1.1']),
+]
+
+
+class TestLintOnly(unittest.TestCase):
+    """ lint without writing documents """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+        self.fake = FakeJira(ISSUES)
+        self.fake.__enter__()
+        self.addCleanup(self.fake.__exit__)
+
+    def run_rdm(self, *args):
+        """ run over both versions in tmpdir """
+        return releasedocmaker('--baseurl', self.fake.url, '--project', 'TEST',
+                               '--version', '1.0', '--version', '1.1',
+                               '--fileversions', *args,
+                               cwd=self.tmpdir)
+
+    def test_matches_lint(self):
+        """ the same messages and exit code as a full --lint run """
+        full = self.run_rdm('--lint', 'all')
+        self.assertEqual(full.returncode, 1)
+        for path in self.tmpdir.rglob('*.md'):
+            path.unlink()
+        only = self.run_rdm('--lint-only')
+        self.assertEqual(only.returncode, 1)
+        # a full run also reports how many requests it made
+        self.assertTrue(full.stderr.startswith(only.stderr))
+        self.assertIn('ERROR: missing assignee for TEST-2', only.stderr)
+        self.assertEqual(list(self.tmpdir.rglob('*.md')), [])
+
+    def test_lint_fields(self):
+        """ the search only asks for what lint needs """
+        self.run_rdm('--lint-only')
+        searches = self.fake.searches()
+        # there is a release note field, so no descriptions are needed
+        self.assertEqual(len(searches), 1)
+        fields = searches[0]['fields']
+        self.assertIn('assignee', fields)
+        self.assertIn('customfield_1', fields)
+        self.assertNotIn('summary', fields)
+        self.assertNotIn('reporter', fields)
+
+    def test_reports(self):
+        """ JSON and JUnit XML with one entry per version and issue """
+        jsonfile = self.tmpdir / 'lint.json'
+        junitfile = self.tmpdir / 'lint.xml'
+        result = self.run_rdm('--lint-only', '--lint-json', jsonfile,
+                              '--lint-junit', junitfile)
+        self.assertEqual(result.returncode, 1)
+
+        report = json.loads(jsonfile.read_text(encoding='utf-8'))
+        first, second = report['versions']
+        self.assertEqual(
+            (first['version'], first['issues'], first['errors'],
+             first['warnings']), ('1.0', 3, 1, 1))
+        self.assertEqual(
+            (second['version'], second['issues'], second['errors']),
+            ('1.1', 1, 0))
+        self.assertIn(
+            {
+                'issue': 'TEST-2',
+                'severity': 'error',
+                'check': 'assignee',
+                'message': 'missing assignee'
+            }, first['results'])
+
+        suites = ET.parse(junitfile).getroot()
+        suite = suites.find('testsuite')
+        self.assertEqual(suite.get('tests'), '3')
+        self.assertEqual(suite.get('failures'), '1')
+        cases = {case.get('name'): case for case in suite.iter('testcase')}
+        self.assertEqual(cases['TEST-2'].find('failure').get('message'),
+                         'missing assignee')
+        self.assertIn('incompatible change',
+                      cases['TEST-3'].find('system-out').text)
+        self.assertEqual(list(cases['TEST-1']), [])
+
+    def test_reports_need_lint_only(self):
+        """ the report options make no sense without --lint-only """
+        result = self.run_rdm('--lint-json', self.tmpdir / 'lint.json')
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('require --lint-only', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
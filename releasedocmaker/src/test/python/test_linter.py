@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Linter option handling
+
+        python3 -m pytest test_linter.py
+"""
+
+import argparse
+import pathlib
+import sys
+import unittest
+
+sys.path.insert(
+    0, str(pathlib.Path(__file__).resolve().parents[2] / 'main' / 'python'))
+# pylint: disable=wrong-import-position
+from releasedocmaker.jira import Linter
+# pylint: enable=wrong-import-position
+
+
+class TestLinterOptions(unittest.TestCase):
+    """ building Linters must not change Linter itself """
+
+    def test_many_linters(self):
+        """ the filter list stays the same however many Linters there are """
+        filters = list(Linter._valid_filters)  # pylint: disable=protected-access
+        options = argparse.Namespace(lint=['all,-component'])
+        for _ in range(50):
+            linter = Linter('1.0', options)
+        self.assertEqual(Linter._valid_filters, filters)  # pylint: disable=protected-access
+        self.assertTrue(linter.enabled)
+
+    def test_unknown_filter(self):
+        """ an unknown filter is still fatal """
+        options = argparse.Namespace(lint=['all,-nosuchfilter'])
+        with self.assertRaises(SystemExit):
+            Linter('1.0', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
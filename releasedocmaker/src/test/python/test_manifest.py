@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Several projects in one run with --manifest
+
+        python3 -m pytest test_manifest.py
+"""
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, written
+
+ISSUES = [make_issue('ONE', num, ['1.0']) for num in range(1, 4)] + [
+    make_issue('ONE', 4, ['1.1']),
+    make_issue('TWO', 5, ['2.0']),
+]
+
+
+class TestManifest(unittest.TestCase):
+    """ a manifest writes what the separate runs would """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+        self.fake = FakeJira(ISSUES)
+        self.fake.__enter__()
+        self.addCleanup(self.fake.__exit__)
+
+    def write_manifest(self, manifest):
+        """ save a manifest in tmpdir """
+        filename = self.tmpdir / 'manifest.json'
+        filename.write_text(json.dumps(manifest), encoding='utf-8')
+        return filename
+
+    def test_same_as_separate_runs(self):
+        """ each entry gets the files a run of its own would write """
+        entries = [
+            {
+                'project': 'ONE',
+                'version': ['1.0', '1.1'],
+                'outputdir': 'one'
+            },
+            {
+                'project': 'TWO',
+                'version': '2.0',
+                'outputdir': 'two',
+                'index': False
+            },
+        ]
+        manifest = self.write_manifest({
+            'jobs': 2,
+            'defaults': {
+                'dirversions': True,
+                'index': True
+            },
+            'projects': entries
+        })
+        result = releasedocmaker('--baseurl', self.fake.url, '--manifest',
+                                 manifest, cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        alone = self.tmpdir / 'alone'
+        for args in (['--project', 'ONE', '--version', '1.0', '--version',
+                      '1.1', '--index', '--outputdir', alone / 'one'],
+                     ['--project', 'TWO', '--version', '2.0', '--outputdir',
+                      alone / 'two']):
+            result = releasedocmaker('--baseurl', self.fake.url,
+                                     '--dirversions', *args)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+        for name in ('one', 'two'):
+            self.assertEqual(
+                written(self.tmpdir / name, self.fake.url),
+                written(alone / name, self.fake.url))
+        self.assertTrue((self.tmpdir / 'one' / 'index.md').exists())
+        self.assertFalse((self.tmpdir / 'two' / 'index.md').exists())
+
+    def test_shared_lookups(self):
+        """ the same project twice only looks up its versions and the
+            fields once """
+        manifest = self.write_manifest({
+            'jobs': 1,
+            'projects': [{
+                'project': 'ONE',
+                'version': '1.0',
+                'outputdir': name
+            } for name in ('first', 'second')]
+        })
+        result = releasedocmaker('--baseurl', self.fake.url, '--manifest',
+                                 manifest, cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        paths = [path for path, _ in self.fake.requests]
+        self.assertEqual(paths.count('/rest/api/2/field'), 1)
+        self.assertEqual(paths.count('/rest/api/2/project/ONE/versions'), 1)
+        self.assertEqual(
+            written(self.tmpdir / 'first', self.fake.url),
+            written(self.tmpdir / 'second', self.fake.url))
+
+    def test_command_line_only(self):
+        """ --sync-db cannot be set per entry """
+        manifest = self.write_manifest({
+            'projects': [{
+                'project': 'ONE',
+                'version': '1.0',
+                'sync-db': 'sync.db'
+            }]
+        })
+        result = releasedocmaker('--baseurl', self.fake.url, '--manifest',
+                                 manifest, cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('can only be given on the command line', result.stderr)
+
+    def test_bad_manifest(self):
+        """ a manifest without projects is an error """
+        manifest = self.write_manifest({'jobs': 2})
+        result = releasedocmaker('--baseurl', self.fake.url, '--manifest',
+                                 manifest, cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('does not have a list of projects', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
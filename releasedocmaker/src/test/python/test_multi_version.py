@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" One search for several versions
+
+        python3 -m pytest test_multi_version.py
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker
+
+ISSUES = [
+    make_issue('TEST', 1, ['1.0']),
+    make_issue('TEST', 2, ['1.0', '2.0']),
+    make_issue('TEST', 3, ['2.0']),
+    make_issue('TEST', 4, ['3.0']),
+]
+
+
+class TestMultiVersion(unittest.TestCase):
+    """ the issues of every version come from a single search """
+
+    def test_one_search(self):
+        """ each version gets its own issues, and shared ones """
+        with FakeJira(ISSUES) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0', '--version',
+                                     '2.0-SNAPSHOT', '--dirversions',
+                                     cwd=outdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            changelogs = {
+                version:
+                (pathlib.Path(outdir) / version / 'CHANGELOG.md').read_text(
+                    encoding='utf-8')
+                for version in ('1.0', '2.0-SNAPSHOT')
+            }
+            searches = fake.searches()
+            fields = [
+                path for path, _ in fake.requests if path.endswith('/field')
+            ]
+
+        self.assertEqual(len(searches), 1)
+        self.assertIn("fixVersion in ('1.0','2.0')", searches[0]['jql'])
+        self.assertEqual(len(fields), 1)
+        self.assertIn('TEST-1', changelogs['1.0'])
+        self.assertIn('TEST-2', changelogs['1.0'])
+        self.assertNotIn('TEST-3', changelogs['1.0'])
+        self.assertIn('TEST-2', changelogs['2.0-SNAPSHOT'])
+        self.assertIn('TEST-3', changelogs['2.0-SNAPSHOT'])
+        self.assertNotIn('TEST-4', changelogs['2.0-SNAPSHOT'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Buffered, atomic Outputs
+
+        python3 -m pytest test_outputs.py
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.utils import Outputs
+# pylint: enable=wrong-import-position
+
+
+class TestOutputs(unittest.TestCase):
+    """ files appear whole on close(), or not at all """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+
+    def outputs(self):
+        """ a base file and one per project, in a directory that does
+            not exist yet """
+        return Outputs(f'{self.tmpdir}/%(ver)s/LOG%(ext)s',
+                       f'{self.tmpdir}/%(ver)s/LOG.%(key)s%(ext)s',
+                       ['ONE', 'TWO'], {
+                           'ver': '1.0',
+                           'ext': '.md'
+                       })
+
+    def test_close(self):
+        """ everything is written on close, and only then """
+        outputs = self.outputs()
+        outputs.write_all('# %(key)s %(ver)s\n')
+        outputs.write_key_raw('ONE', 'only one\n')
+        self.assertFalse((self.tmpdir / '1.0').exists())
+        outputs.close()
+        self.assertEqual(sorted(os.listdir(self.tmpdir / '1.0')),
+                         ['LOG.ONE.md', 'LOG.TWO.md', 'LOG.md'])
+        self.assertEqual((self.tmpdir / '1.0' / 'LOG.md').read_text(
+            encoding='utf-8'), '#  1.0\nonly one\n')
+        self.assertEqual((self.tmpdir / '1.0' / 'LOG.ONE.md').read_text(
+            encoding='utf-8'), '# ONE 1.0\nonly one\n')
+        self.assertEqual((self.tmpdir / '1.0' / 'LOG.TWO.md').read_text(
+            encoding='utf-8'), '# TWO 1.0\n')
+
+    def test_discard(self):
+        """ discarded output never reaches the disk """
+        outputs = self.outputs()
+        outputs.write_all('text\n')
+        outputs.discard()
+        self.assertFalse((self.tmpdir / '1.0').exists())
+
+    def test_lint_failure(self):
+        """ a version that fails lint writes nothing """
+        issues = [
+            make_issue('TEST', 1, ['1.0']),
+            make_issue('TEST', 2, ['1.1'], assignee=None)
+        ]
+        with FakeJira(issues) as fake:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0', '--version',
+                                     '1.1', '--fileversions', '--lint',
+                                     'assignee', cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['CHANGELOG.1.0.md', 'RELEASENOTES.1.0.md'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Fetching versions in the background with --prefetch
+
+        python3 -m pytest test_prefetch.py
+"""
+
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, written
+
+VERSIONS = ['1.0', '1.1', '1.2', '1.3', '1.4']
+ISSUES = [
+    make_issue('TEST', num, [VERSIONS[num % len(VERSIONS)]])
+    for num in range(1, 101)
+]
+
+
+class TestPrefetch(unittest.TestCase):
+    """ the output does not depend on how versions are fetched """
+
+    def run_rdm(self, *args):
+        """ write every version, returning the files and the
+            fixVersion searches """
+        with FakeJira(ISSUES) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', VERSIONS[0],
+                                     '--version', VERSIONS[-1], '--range',
+                                     '--dirversions', *args, cwd=outdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            return written(outdir, fake.url), [
+                params['jql'] for params in fake.searches()
+                if 'fixVersion' in params['jql']
+            ]
+
+    def test_windows(self):
+        """ one search per window, and the same files """
+        expected, searches = self.run_rdm()
+        self.assertEqual(len(expected), 2 * len(VERSIONS))
+        self.assertEqual(len(searches), 1)
+        for prefetch, windows in (('1', 5), ('2', 3), ('5', 1), ('9', 1)):
+            found, searches = self.run_rdm('--prefetch', prefetch)
+            self.assertEqual(found, expected, prefetch)
+            self.assertEqual(len(searches), windows, prefetch)
+            if prefetch == '2':
+                self.assertIn("fixVersion in ('1.4')", searches[-1])
+
+    def test_negative(self):
+        """ a negative window is an error """
+        result = releasedocmaker('--project', 'TEST', '--version', '1.0',
+                                 '--prefetch', '-1')
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('--prefetch must not be negative', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Per-project files with --projectfiles
+
+        python3 -m pytest test_project_files.py
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, written
+
+ISSUES = [
+    make_issue('ONE', 1, ['1.0'], issuetype={'name': 'Bug'}),
+    make_issue('ONE', 2, ['1.0'], issuetype={'name': 'New Feature'}),
+    make_issue('TWO', 3, ['1.0'], issuetype={'name': 'Bug'}),
+]
+
+
+class TestProjectFiles(unittest.TestCase):
+    """ one query, combined files plus one set per project """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+        self.fake = FakeJira(ISSUES)
+        self.fake.__enter__()
+        self.addCleanup(self.fake.__exit__)
+
+    def run_rdm(self, outdir, *args):
+        """ run over both projects, returning the files written """
+        outdir.mkdir(exist_ok=True)
+        result = releasedocmaker('--baseurl', self.fake.url, '--project',
+                                 'ONE', '--project', 'two', '--version',
+                                 '1.0', *args, cwd=outdir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return dict(written(outdir, self.fake.url))
+
+    def test_project_files(self):
+        """ each project only gets its own issues and sections """
+        combined = self.run_rdm(self.tmpdir / 'combined')
+        files = self.run_rdm(self.tmpdir / 'split', '--projectfiles')
+        self.assertEqual(sorted(str(name) for name in files), [
+            'CHANGELOG.ONE.md', 'CHANGELOG.TWO.md', 'CHANGELOG.md',
+            'RELEASENOTES.ONE.md', 'RELEASENOTES.TWO.md', 'RELEASENOTES.md'
+        ])
+        for name, text in combined.items():
+            self.assertEqual(files[name], text)
+        one = files[pathlib.Path('CHANGELOG.ONE.md')]
+        two = files[pathlib.Path('CHANGELOG.TWO.md')]
+        self.assertIn('ONE-1', one)
+        self.assertIn('ONE-2', one)
+        self.assertNotIn('TWO-3', one)
+        self.assertIn('TWO-3', two)
+        self.assertNotIn('NEW FEATURES', two)
+        self.assertIn('NEW FEATURES', one)
+        self.assertEqual(len(self.fake.searches()), 2)
+
+    def test_sync_db(self):
+        """ a missing per-project file is written again """
+        args = ('--projectfiles', '--sync-db', self.tmpdir / 'sync.db')
+        self.run_rdm(self.tmpdir, *args)
+        (self.tmpdir / 'CHANGELOG.TWO.md').unlink()
+        self.run_rdm(self.tmpdir, *args)
+        self.assertTrue((self.tmpdir / 'CHANGELOG.TWO.md').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
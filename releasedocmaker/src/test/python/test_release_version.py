@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Comparing and sorting ReleaseVersions
+
+        python3 -m pytest test_release_version.py
+"""
+
+import functools
+import pickle
+import sys
+import unittest
+
+from fakejira import FakeJira, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.getversions import GetVersions, ReleaseVersion
+# pylint: enable=wrong-import-position
+
+VERSIONS = [
+    '2.0', '1.10', '1.2', '1.2.0', '1.2.1', '0.9', '1.0-beta', '1.0-alpha',
+    '1.0', 'v1.1', '1.1 RC1', '3', '1.2.0.0'
+]
+
+
+class TestReleaseVersion(unittest.TestCase):
+    """ versions are shared, immutable and ordered as before """
+
+    def test_shared(self):
+        """ one object per version string """
+        self.assertIs(ReleaseVersion('1.2'), ReleaseVersion('1.2'))
+        self.assertIs(pickle.loads(pickle.dumps(ReleaseVersion('1.2'))),
+                      ReleaseVersion('1.2'))
+        with self.assertRaises(AttributeError):
+            ReleaseVersion('1.2').rawversion = '1.3'
+
+    def test_compare(self):
+        """ trailing zeros do not matter, numbers compare as numbers """
+        self.assertEqual(ReleaseVersion('1.2'), ReleaseVersion('1.2.0'))
+        self.assertEqual(hash(ReleaseVersion('1.2')),
+                         hash(ReleaseVersion('1.2.0')))
+        self.assertLess(ReleaseVersion('1.2'), ReleaseVersion('1.10'))
+        self.assertLess(ReleaseVersion('1.2'), '1.2.1')
+        self.assertGreaterEqual(ReleaseVersion('2.0'), 2)
+        self.assertLess(ReleaseVersion('1.0-alpha'), '1.0-beta')
+        self.assertNotEqual(ReleaseVersion('1.0'), None)
+
+    def test_sort(self):
+        """ the fast sort agrees with the rich comparisons """
+        expected = sorted(VERSIONS,
+                          key=functools.cmp_to_key(
+                              lambda a, b: ReleaseVersion(a)._compare(  # pylint: disable=protected-access
+                                  ReleaseVersion(b))))
+        self.assertEqual(ReleaseVersion.sort(VERSIONS), expected)
+        numeric = [version for version in VERSIONS if version[0].isdigit()
+                   and '-' not in version and ' ' not in version]
+        self.assertEqual(ReleaseVersion.sort(numeric),
+                         ['0.9', '1.0', '1.2', '1.2.0', '1.2.0.0', '1.2.1',
+                          '1.10', '2.0', '3'])
+        self.assertEqual(ReleaseVersion.sort(numeric, reverse=True)[0], '3')
+
+    def test_range(self):
+        """ GetVersions picks the server's versions in the range """
+        versions = [{
+            'name': name
+        } for name in ('2.0', '1.10', '1.2.1', '1.2', '1.1', '1.0', '0.9')]
+        with FakeJira(versions={'TEST': versions}) as fake:
+            found = GetVersions(['1.10', '1.1'], ['TEST'], fake.url).getlist()
+        self.assertEqual(found, ['1.1', '1.2', '1.2.1', '1.10'])
+
+if __name__ == '__main__':
+    unittest.main()
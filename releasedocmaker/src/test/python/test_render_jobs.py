@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Rendering versions in worker processes with --render-jobs
+
+        python3 -m pytest test_render_jobs.py
+"""
+
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, written
+
+VERSIONS = ['1.0', '1.1', '1.2', '1.3']
+ISSUES = [
+    make_issue('TEST', num, [VERSIONS[num % len(VERSIONS)]])
+    for num in range(1, 41)
+] + [make_issue('TEST', 50, ['1.2'], assignee=None)]
+
+
+class TestRenderJobs(unittest.TestCase):
+    """ worker processes write what a serial run writes """
+
+    def run_rdm(self, *args):
+        """ the exit code, log and files of a run over every version """
+        with FakeJira(ISSUES) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', VERSIONS[0],
+                                     '--version', VERSIONS[-1], '--range',
+                                     '--fileversions', '--index', *args,
+                                     cwd=outdir)
+            return (result.returncode, result.stdout,
+                    result.stderr.replace(fake.url, 'JIRA'),
+                    written(outdir, fake.url))
+
+    def test_same_output(self):
+        """ files, log and exit code match, lint failures included """
+        for lint in ([], ['--lint', 'assignee']):
+            expected = self.run_rdm(*lint)
+            self.assertEqual(expected[0], 1 if lint else 0, expected[2])
+            self.assertTrue(expected[3])
+            for jobs in ('2', '3'):
+                self.assertEqual(self.run_rdm('--render-jobs', jobs, *lint),
+                                 expected, (jobs, lint))
+
+
+if __name__ == '__main__':
+    unittest.main()
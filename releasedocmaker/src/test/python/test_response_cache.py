@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" The on-disk JIRA response cache
+
+        python3 -m pytest test_response_cache.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, FIELDS, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker import utils
+from releasedocmaker.cache import OfflineCacheMiss, ResponseCache
+# pylint: enable=wrong-import-position
+
+
+class TestResponseCache(unittest.TestCase):
+    """ requests are answered from disk when they can be """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = tmpdir.name
+        self.addCleanup(utils.set_cache, None)
+
+    def fetch(self, fake):
+        """ GET the field list through the cache """
+        response = utils.fetch('GET', f'{fake.url}/rest/api/2/field', {})
+        self.assertEqual(response.status, 200)
+        return json.loads(response.read())
+
+    def test_fresh(self):
+        """ a fresh entry never goes to the server """
+        utils.set_cache(ResponseCache(self.directory))
+        with FakeJira() as fake:
+            for _ in range(3):
+                self.assertEqual(self.fetch(fake), FIELDS)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual((utils.get_cache().hits, utils.get_cache().misses),
+                         (2, 1))
+
+    def test_revalidate(self):
+        """ a stale entry is revalidated, and keeps the newest ETag """
+        utils.set_cache(ResponseCache(self.directory, ttl=0))
+        with FakeJira() as fake:
+            self.assertEqual(self.fetch(fake), FIELDS)
+            first = fake.headers[-1]
+            self.assertNotIn('If-None-Match', first)
+            self.assertEqual(self.fetch(fake), FIELDS)
+            etag = fake.headers[-1]['If-None-Match']
+            fake.etag_prefix = 'v2-'
+            self.assertEqual(self.fetch(fake), FIELDS)
+            self.assertEqual(fake.headers[-1]['If-None-Match'], etag)
+            self.assertEqual(self.fetch(fake), FIELDS)
+            self.assertEqual(fake.headers[-1]['If-None-Match'],
+                             etag.replace('"', '"v2-', 1))
+        self.assertEqual((utils.get_cache().hits, utils.get_cache().misses),
+                         (3, 1))
+
+    def test_revalidated_without_validators(self):
+        """ a 304 without validators keeps the stored ones """
+        cache = ResponseCache(self.directory, ttl=0)
+        key = cache.key('GET', 'http://jira/x')
+        cache.store(key, 'http://jira/x', b'{}', '"abc"', 'yesterday')
+        cache.revalidated(cache.lookup(key))
+        entry = cache.lookup(key)
+        self.assertEqual((entry.etag, entry.last_modified),
+                         ('"abc"', 'yesterday'))
+        self.assertEqual(entry.body, b'{}')
+
+    def test_offline(self):
+        """ offline, a miss is an error rather than a request """
+        with FakeJira() as fake:
+            utils.set_cache(ResponseCache(self.directory))
+            self.fetch(fake)
+            utils.set_cache(ResponseCache(self.directory, offline=True))
+            self.assertEqual(self.fetch(fake), FIELDS)
+            with self.assertRaises(OfflineCacheMiss):
+                utils.fetch('GET', f'{fake.url}/rest/api/2/search', {})
+        self.assertEqual(len(fake.requests), 1)
+
+    def test_eviction(self):
+        """ the least recently used entries go first """
+        cache = ResponseCache(self.directory, max_size=2500)
+        for num in range(5):
+            key = cache.key('GET', str(num))
+            cache.store(key, str(num), b'x' * 1000)
+            os.utime(cache.lookup(key).path, (1000 + num, 1000 + num))
+        self.assertLessEqual(cache._size, 2500)  # pylint: disable=protected-access
+        self.assertIsNone(cache.lookup(cache.key('GET', '0')))
+        self.assertIsNotNone(cache.lookup(cache.key('GET', '4')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" --retries reaching the code that retries
+
+        python3 -m pytest test_retries.py
+"""
+
+import pathlib
+import socket
+import sys
+import unittest
+
+sys.path.insert(
+    0, str(pathlib.Path(__file__).resolve().parents[2] / 'main' / 'python'))
+# pylint: disable=wrong-import-position
+from releasedocmaker import jira
+from releasedocmaker.telemetry import METRICS
+# pylint: enable=wrong-import-position
+
+
+def closed_port():
+    """ a local port that nothing is listening on """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestRetries(unittest.TestCase):
+    """ set_retries() decides how often a failed search is retried """
+
+    def tearDown(self):
+        jira.set_retries(5)
+
+    def retried(self, count):
+        """ how many retries a search against a dead server gets """
+        jira.set_retries(count)
+        before = METRICS.count('retries')
+        with self.assertRaises(SystemExit):
+            jira.JiraIter.load_jira(f'http://127.0.0.1:{closed_port()}',
+                                    {'jql': 'project = TEST'}, 0)
+        return METRICS.count('retries') - before
+
+    def test_retries(self):
+        """ the count given is the count used """
+        self.assertEqual(self.retried(0), 0)
+        self.assertEqual(self.retried(2), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
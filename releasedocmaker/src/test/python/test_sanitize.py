@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Escaping JIRA text for MultiMarkdown
+
+        python3 -m pytest test_sanitize.py
+"""
+
+import sys
+import unittest
+
+from fakejira import SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker import sanitize, utils
+from sanitize_benchmark import (old_format_components, old_processrelnote,
+                                old_sanitize_text)
+# pylint: enable=wrong-import-position
+
+TEXTS = [
+    '', 'plain', 'a_b', '<tag>', '**bold**', 'a|b', '`code`', 'C:\\dir\\_x',
+    '\\_', 'trailing  \r\n', 'line\r\nline\r\n', 'x' * 200 + '_*',
+    '<!-- markdown -->\n*kept*', '<!-- text -->\n*escaped*'
+]
+
+
+class TestSanitize(unittest.TestCase):
+    """ the escaping gives what it always gave """
+
+    def test_sanitize_text(self):
+        """ every escaped character, short and long text """
+        for text in TEXTS:
+            self.assertEqual(sanitize.sanitize_text(text),
+                             old_sanitize_text(text), repr(text))
+            # and again, now that short values are cached
+            self.assertEqual(sanitize.sanitize_text(text),
+                             old_sanitize_text(text), repr(text))
+        self.assertEqual(sanitize.sanitize_text('\\_'), '\\\\\\_')
+
+    def test_processrelnote(self):
+        """ markdown release notes are left alone """
+        for text in TEXTS:
+            self.assertEqual(sanitize.processrelnote(text),
+                             old_processrelnote(text), repr(text))
+        self.assertEqual(sanitize.processrelnote('<!-- markdown -->\n*x*'),
+                         '<!-- markdown -->\n*x*')
+
+    def test_format_components(self):
+        """ JIRA ids and quotes are dropped, empty becomes a period """
+        for text in ('build', 'fs (1)', "ipc's", '', "a (1')2)", 'x_y'):
+            self.assertEqual(sanitize.format_components(text),
+                             old_format_components(text), repr(text))
+        self.assertEqual(sanitize.format_components(''), '.')
+        self.assertEqual(sanitize.format_components("a (1')2)"), 'a2)')
+
+    def test_reexported(self):
+        """ utils still has the functions """
+        self.assertIs(utils.sanitize_text, sanitize.sanitize_text)
+        self.assertIs(utils.processrelnote, sanitize.processrelnote)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Fetching the pages of a search concurrently
+
+        python3 -m pytest test_search_pages.py
+"""
+
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.jira import JiraIter
+# pylint: enable=wrong-import-position
+
+ISSUES = [make_issue('TEST', num, ['1.0']) for num in range(250, 0, -1)]
+
+
+class TestSearchPages(unittest.TestCase):
+    """ every page comes back, in JIRA's order """
+
+    def collect(self, cap, threads):
+        """ the keys collect_jiras finds, and the offsets it asked for """
+        with FakeJira(ISSUES, cap=cap) as fake:
+            jiras = JiraIter.collect_jiras(fake.url, '1.0', ['TEST'], threads)
+            offsets = sorted(
+                int(params['startAt']) for params in fake.searches())
+        return [jira.key for jira in jiras], offsets
+
+    def test_pages_in_order(self):
+        """ the pages are put back together in order """
+        expected = [issue['key'] for issue in ISSUES]
+        for threads in (1, 4):
+            keys, offsets = self.collect(100, threads)
+            self.assertEqual(keys, expected)
+            self.assertEqual(offsets, [0, 100, 200])
+
+    def test_server_page_size(self):
+        """ the offsets follow the page size JIRA actually uses """
+        keys, offsets = self.collect(30, 4)
+        self.assertEqual(keys, [issue['key'] for issue in ISSUES])
+        self.assertEqual(offsets, list(range(0, 250, 30)))
+
+    def test_threads_option(self):
+        """ the output does not depend on --threads """
+        outputs = []
+        with FakeJira(ISSUES, cap=50) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            for threads in (1, 4):
+                result = releasedocmaker('--baseurl', fake.url, '--project',
+                                         'TEST', '--version', '1.0',
+                                         '--threads', threads, '--outputdir',
+                                         f'{outdir}/{threads}')
+                self.assertEqual(result.returncode, 0, result.stderr)
+                outputs.append(
+                    sorted((path.relative_to(f'{outdir}/{threads}'),
+                            path.read_text(encoding='utf-8'))
+                           for path in pathlib.Path(
+                               f'{outdir}/{threads}').rglob('*.md')))
+        self.assertTrue(outputs[0])
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Sorting issues with precomputed keys
+
+        python3 -m pytest test_sort_key.py
+"""
+
+import pathlib
+import re
+import sys
+import tempfile
+import unittest
+
+import dateutil.parser
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.jira import Jira, parse_date, sort_key
+# pylint: enable=wrong-import-position
+
+ISSUES = [
+    make_issue('TEST', 9, ['1.0'],
+               resolutiondate='2020-01-02T10:00:00.000+0000'),
+    make_issue('TEST', 10, ['1.0'],
+               resolutiondate='2020-01-03T10:00:00.000+0100'),
+    make_issue('TEST', 100, ['1.0'],
+               resolutiondate='2020-01-01T10:00:00.000+0000'),
+]
+
+
+class TestSortKey(unittest.TestCase):
+    """ the keys sort the way the old comparisons did """
+
+    def test_parse_date(self):
+        """ the fast path agrees with dateutil """
+        for value in ('2015-06-30T09:04:41.000+0000',
+                      '2015-06-30T09:04:41.123-0530', '2015-06-30T09:04:41Z',
+                      '2015-06-30T09:04:41+02:00', '2015-06-30T09:04:41.5Z',
+                      'June 30 2015 09:04:41 UTC'):
+            self.assertEqual(parse_date(value),
+                             dateutil.parser.parse(value).timestamp(), value)
+        self.assertEqual(parse_date(None), 0.0)
+
+    def test_sort_key(self):
+        """ every sort type and order """
+        jiras = [Jira(issue, {}) for issue in ISSUES]
+        for sorttype, sortorder, expected in (
+            ('issueid', 'older', [9, 10, 100]),
+            ('issueid', 'desc', [100, 10, 9]),
+            ('resolutiondate', 'older', [100, 9, 10]),
+            ('resolutiondate', 'newer', [10, 9, 100]),
+        ):
+            self.assertEqual([
+                int(jira.key.split('-')[1])
+                for jira in sorted(jiras, key=sort_key(sorttype, sortorder))
+            ], expected, (sorttype, sortorder))
+
+    def test_options(self):
+        """ --sorttype and --sortorder change the changelog """
+        with FakeJira(ISSUES) as fake, \
+                tempfile.TemporaryDirectory() as outdir:
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0', '--sorttype',
+                                     'issueid', '--sortorder', 'desc',
+                                     cwd=outdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            changelog = (pathlib.Path(outdir) / 'CHANGELOG.md').read_text(
+                encoding='utf-8')
+        self.assertEqual(re.findall(r'\[(TEST-\d+)\]', changelog),
+                         ['TEST-100', 'TEST-10', 'TEST-9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Incremental runs with --sync-db
+
+        python3 -m pytest test_sync_db.py
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker
+
+SKIPPED = 'Nothing has changed for 1.0, skipping it.'
+
+
+class TestSyncDb(unittest.TestCase):
+    """ only what changed is fetched and written again """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+        self.fake = FakeJira(
+            [make_issue('TEST', num, ['1.0']) for num in range(1, 31)] +
+            [make_issue('TEST', num, ['2.0']) for num in range(31, 41)])
+        self.fake.__enter__()
+        self.addCleanup(self.fake.__exit__)
+
+    def run_rdm(self, *args):
+        """ run releasedocmaker on versions 1.0 and 2.0, returning stderr
+            and the searches it made """
+        before = len(self.fake.searches())
+        result = releasedocmaker('--baseurl', self.fake.url, '--project',
+                                 'TEST', '--version', '1.0', '--version',
+                                 '2.0', '--dirversions', '--sync-db',
+                                 self.tmpdir / 'sync.db', *args,
+                                 cwd=self.tmpdir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stderr, self.fake.searches()[before:]
+
+    def changelog(self):
+        """ the changelog of version 1.0 """
+        return (self.tmpdir / '1.0' / 'CHANGELOG.md').read_text(
+            encoding='utf-8')
+
+    def test_incremental(self):
+        """ later runs only ask for updated issues """
+        log, searches = self.run_rdm()
+        self.assertNotIn(SKIPPED, log)
+        self.assertEqual(len(searches), 1)
+        first = self.changelog()
+
+        log, searches = self.run_rdm()
+        self.assertIn(SKIPPED, log)
+        self.assertEqual(len(searches), 1)
+        self.assertRegex(searches[0]['jql'],
+                         r"^project in \('TEST'\) "
+                         r'and updated >= "[^"]*"$')
+        self.assertEqual(self.changelog(), first)
+
+        self.fake.issues[0]['fields'].update(
+            summary='A new summary', updated='2100-01-01T00:00:00.000+0000')
+        log, searches = self.run_rdm()
+        self.assertNotIn(SKIPPED, log)
+        self.assertEqual(len(searches), 1)
+        self.assertIn('A new summary', self.changelog())
+
+    def test_options(self):
+        """ only options that change the output cause a rewrite """
+        self.run_rdm()
+        log, _ = self.run_rdm('--threads', '1', '--retries', '2')
+        self.assertIn(SKIPPED, log)
+        log, _ = self.run_rdm('--sortorder', 'newer')
+        self.assertNotIn(SKIPPED, log)
+
+    def test_missing_file(self):
+        """ a deleted file is written again """
+        self.run_rdm()
+        (self.tmpdir / '1.0' / 'RELEASENOTES.md').unlink()
+        log, _ = self.run_rdm()
+        self.assertNotIn(SKIPPED, log)
+        self.assertTrue((self.tmpdir / '1.0' / 'RELEASENOTES.md').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Run metrics
+
+        python3 -m pytest test_telemetry.py
+"""
+
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import SRCDIR, FakeJira, make_issue, releasedocmaker
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.telemetry import Telemetry
+# pylint: enable=wrong-import-position
+
+
+class TestTelemetry(unittest.TestCase):
+    """ the Telemetry class on its own """
+
+    def test_phases(self):
+        """ phases add up their time and how often they ran """
+        metrics = Telemetry()
+        for _ in range(3):
+            with metrics.phase('render'):
+                pass
+        with self.assertRaises(ValueError):
+            with metrics.phase('fetch'):
+                raise ValueError()
+        report = metrics.report()
+        self.assertEqual(report['phases']['render']['count'], 3)
+        self.assertEqual(report['phases']['fetch']['count'], 1)
+        self.assertGreaterEqual(report['wall'],
+                                report['phases']['render']['wall'])
+
+    def test_take_and_merge(self):
+        """ phase times can be moved from one Telemetry to another, the
+            way --render-jobs workers hand them back """
+        worker = Telemetry()
+        with worker.phase('render'):
+            pass
+        phases = worker.take()
+        self.assertEqual(worker.take(), {})
+        metrics = Telemetry()
+        metrics.merge(phases)
+        metrics.merge(phases)
+        self.assertEqual(metrics.report()['phases']['render']['count'], 2)
+
+    def test_counters_and_versions(self):
+        """ counters start at zero and versions are kept in order """
+        metrics = Telemetry()
+        self.assertEqual(metrics.count('retries'), 0)
+        metrics.add('retries')
+        metrics.add('retries', 2)
+        self.assertEqual(metrics.count('retries'), 3)
+        metrics.version(['ONE'], '1.0', 4)
+        metrics.version(['ONE'], '1.1', 0)
+        report = metrics.report({'extra': True})
+        self.assertEqual(
+            [version['version'] for version in report['versions']],
+            ['1.0', '1.1'])
+        self.assertTrue(report['extra'])
+
+
+class TestMetricsFile(unittest.TestCase):
+    """ --metrics-file and --metrics-summary """
+
+    def test_metrics_file(self):
+        """ the report counts what the run did """
+        issues = [make_issue('TEST', num, ['1.0']) for num in range(5)]
+        with FakeJira(issues) as fake, \
+                tempfile.TemporaryDirectory() as tmpdir:
+            metricsfile = pathlib.Path(tmpdir) / 'metrics.json'
+            result = releasedocmaker('--baseurl', fake.url, '--project',
+                                     'TEST', '--version', '1.0',
+                                     '--metrics-file', metricsfile,
+                                     '--metrics-summary', cwd=tmpdir)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            report = json.loads(metricsfile.read_text(encoding='utf-8'))
+            self.assertEqual(report['http']['requests'], len(fake.requests))
+        self.assertEqual(report['versions'], [{
+            'projects': ['TEST'],
+            'version': '1.0',
+            'issues': 5
+        }])
+        for name in ('versions', 'fetch', 'render', 'write'):
+            self.assertIn(name, report['phases'])
+        self.assertIsNone(report['cache'])
+        self.assertIn('HTTP: ', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" The index of project versions
+
+        python3 -m pytest test_version_index.py
+"""
+
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from fakejira import FakeJira, make_issue, releasedocmaker, SRCDIR
+
+sys.path.insert(0, str(SRCDIR))
+# pylint: disable=wrong-import-position
+from releasedocmaker.getversions import VersionIndex
+# pylint: enable=wrong-import-position
+
+VERSIONS = {
+    'ONE': [{
+        'name': '1.0',
+        'released': True,
+        'releaseDate': '2020-03-01'
+    }, {
+        'name': '1.1',
+        'archived': True
+    }, {
+        'name': '1.2'
+    }],
+    'TWO': [{
+        'name': '1.0',
+        'released': True,
+        'releaseDate': '2020-04-01'
+    }, {
+        'name': '1.1'
+    }, {
+        'name': '2.0',
+        'archived': True
+    }],
+}
+
+
+class TestVersionIndex(unittest.TestCase):
+    """ the versions of several projects, merged """
+
+    def test_merge(self):
+        """ the first release date wins, and archived means archived
+            everywhere """
+        with FakeJira(versions=VERSIONS) as fake:
+            index = VersionIndex(['ONE', 'TWO'], fake.url)
+            requests = [path for path, _ in fake.requests]
+        self.assertEqual(sorted(requests), [
+            '/rest/api/2/project/ONE/versions',
+            '/rest/api/2/project/TWO/versions'
+        ])
+        self.assertEqual(index.release_date('1.0'), '2020-03-01')
+        self.assertIsNone(index.release_date('1.2'))
+        self.assertIsNone(index.release_date('9.9'))
+        self.assertIn('2.0', index)
+        self.assertEqual(sorted(index.names()), ['1.0', '1.1', '1.2', '2.0'])
+        self.assertEqual(sorted(index.names(archived=False)),
+                         ['1.0', '1.1', '1.2'])
+
+    def test_skip_archived(self):
+        """ --skip-archived leaves archived versions out of a range, and
+            the release date comes from the index """
+        issues = [
+            make_issue('ONE', num, [version])
+            for num, version in enumerate(['1.0', '1.1', '1.2'], 1)
+        ]
+        for args, expected in (([], ['1.0', '1.1', '1.2']),
+                               (['--skip-archived'], ['1.0', '1.2'])):
+            with FakeJira(issues, versions={'ONE': VERSIONS['ONE']}) as fake, \
+                    tempfile.TemporaryDirectory() as outdir:
+                result = releasedocmaker('--baseurl', fake.url, '--project',
+                                         'ONE', '--version', '1.0',
+                                         '--version', '1.2', '--range',
+                                         '--dirversions', *args, cwd=outdir)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                written = sorted(path.name
+                                 for path in pathlib.Path(outdir).iterdir())
+                changelog = (pathlib.Path(outdir) / '1.0' /
+                             'CHANGELOG.md').read_text(encoding='utf-8')
+            self.assertEqual(written, expected)
+            self.assertIn('2020-03-01', changelog)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,13 +18,18 @@
 
 # Do this immediately to prevent compiled forms
 
+import hashlib
+import io
+import json
 import logging
 import os
 import pathlib
 import re
 import sys
+import tempfile
+import time
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 
 sys.dont_write_bytecode = True
 
@@ -65,6 +70,8 @@ def __init__(self, filename='Unknown'):
         self.replacetext = 'Not Replaceable'
         self.returnt = []
         self.stability = ''
+        self.docstart = 0
+        self.lintresults = None
 
     def __lt__(self, other):
         '''comparison'''
@@ -113,27 +120,44 @@ def isprivateandnotreplaceable(self):
         ''' is this function Private and not replaceable? '''
         return self.audience == "Private" and not self.replacebool
 
-    def lint(self):
-        '''Lint this function'''
+    def lint_messages(self):
+        '''the problems lint() reports, without the file:line prefix'''
+        if self.lintresults is not None:
+            return self.lintresults
         validvalues = {
             "audience": ("Public", "Private"),
             "stability": ("Stable", "Evolving"),
             "replacerawtext": ("yes", "no"),
         }
+        self.lintresults = []
         for attribute, attrvalues in validvalues.items():
             value = getattr(self, attribute)
             if (not value or value == '') and attribute != 'replacerawtext':
-                logging.error("%s:%u:ERROR: function %s has no @%s",
-                              self.filename, self.linenum, self.name,
-                              attribute.lower())
+                self.lintresults.append(
+                    f"ERROR: function {self.name} has no @{attribute.lower()}"
+                )
             elif value not in attrvalues:
                 if attribute == 'replacerawtext' and value == '':
                     continue
                 validvalue = "|".join(v.lower() for v in attrvalues)
-                logging.error(
-                    "%s:%d:ERROR: function %s has invalid value (%s) for @%s (%s)",
-                    self.filename, self.linenum, self.name, value.lower(),
-                    attribute.lower().replace('rawtext', 'able'), validvalue)
+                self.lintresults.append(
+                    f"ERROR: function {self.name} has invalid value "
+                    f"({value.lower()}) for "
+                    f"@{attribute.lower().replace('rawtext', 'able')} "
+                    f"({validvalue})")
+        return self.lintresults
+
+    def overlaps(self, ranges):
+        '''does the doc block or the definition of this function
+        touch any of the (start, end) line ranges?'''
+        first = self.docstart or self.linenum
+        return any(start <= self.linenum and end >= first
+                   for start, end in ranges)
+
+    def lint(self):
+        '''Lint this function'''
+        for message in self.lint_messages():
+            logging.error("%s:%d:%s", self.filename, self.linenum, message)
 
     def __str__(self):
         '''Generate a string for this function'''
@@ -145,9 +169,25 @@ class ProcessFile:
 
     FUNCTIONRE = re.compile(r"^(\w+) *\(\) *{")
 
+    ANNOTATIONS = {
+        'description': '_process_description',
+        'audience': '_process_audience',
+        'stability': '_process_stability',
+        'replaceable': '_process_replaceable',
+        'param': '_process_param',
+        'return': '_process_return',
+    }
+
+    # the only lines process_file() cares about: annotations and
+    # (possible) function definitions.  Matching from the newline
+    # before each line lets re jump from one newline to the next.
+    CANDIDATERE = re.compile(r"\n(?:## @(" + "|".join(ANNOTATIONS) +
+                             r")|function|\w+ *\(\) *{)[^\n]*")
+
     def __init__(self, filename=None, skipsuperprivate=False):
         self.filename = filename
         self.functions = []
+        self.errors = []
         self.skipsuperprivate = skipsuperprivate
 
     def isignored(self):
@@ -164,15 +204,21 @@ def isignored(self):
       """
         with open(self.filename) as input_file:  #pylint: disable=unspecified-encoding
             for line in input_file:
-                if line.startswith(
-                        "#") and line[1:].strip() == "SHELLDOC-IGNORE":
+                if self._isignoreline(line):
                     return True
             return False
 
+    @staticmethod
+    def _isignoreline(line):
+        '''is this line the SHELLDOC-IGNORE marker?'''
+        return line.startswith("#") and line[1:].strip() == "SHELLDOC-IGNORE"
+
     @staticmethod
     def _docstrip(key, dstr):
         '''remove extra spaces from shelldoc phrase'''
-        dstr = re.sub(f"^## @{key} ", "", dstr)
+        prefix = f"## @{key} "
+        if dstr.startswith(prefix):
+            dstr = dstr[len(prefix):]
         dstr = dstr.strip()
         return dstr
 
@@ -225,10 +271,11 @@ def _process_return(self, funcdef, text=None):
         funcdef.returnt.append(self._docstrip('return', text))
 
     @staticmethod
-    def _process_function(funcdef, text=None, linenum=1):
-        '''set the name of the function'''
-        if ProcessFile.FUNCTIONRE.match(text):
-            definition = ProcessFile.FUNCTIONRE.match(text).groups()[0]
+    def _process_function(funcdef, text=None, linenum=1, match=None):
+        '''set the name of the function, given what FUNCTIONRE
+        made of text'''
+        if match:
+            definition = match.groups()[0]
         else:
             definition = text.split()[1]
         funcdef.name = definition.replace("(", "").replace(")", "")
@@ -238,48 +285,57 @@ def process_file(self):
         """ stuff all of the functions into an array """
         self.functions = []
 
-        mapping = {
-            '## @description': '_process_description',
-            '## @audience': '_process_audience',
-            '## @stability': '_process_stability',
-            '## @replaceable': '_process_replaceable',
-            '## @param': '_process_param',
-            '## @return': '_process_return',
-        }
-
-        if self.isignored():
-            return
-
         try:
             with open(self.filename, "r") as shellcode:  #pylint: disable=unspecified-encoding
-                # if the file contains a comment containing
-                # only "SHELLDOC-IGNORE" then skip that file
-
-                funcdef = ShellFunction(self.filename)
-                linenum = 0
-                for line in shellcode:
-                    linenum = linenum + 1
-                    for text, method in mapping.items():
-                        if line.startswith(text):
-                            getattr(self, method)(funcdef, text=line)
-
-                    if line.startswith(
-                            'function') or ProcessFile.FUNCTIONRE.match(line):
-                        self._process_function(funcdef,
-                                               text=line,
-                                               linenum=linenum)
-
-                        if self.skipsuperprivate and funcdef.isprivateandnotreplaceable(
-                        ):
-                            pass
-                        else:
-                            self.functions.append(funcdef)
-                        funcdef = ShellFunction(self.filename)
+                content = shellcode.read()
+        except (OSError, UnicodeDecodeError):
+            self.errors.append(read_error(self.filename))
+            return
+        self.process_text(content)
 
-        except OSError as err:
-            logging.error("ERROR: Failed to read from file: %s. Skipping.",
-                          err.filename)
-            self.functions = []
+    def process_text(self, content):
+        """ stuff all of the functions in the contents of the file
+            into an array
+
+            CANDIDATERE picks out the few lines that matter, so
+            everything else (most of any script) is skipped without
+            a trip through Python code. """
+        self.functions = []
+        content = '\n' + content
+
+        # if the file contains a comment containing
+        # only "SHELLDOC-IGNORE" then skip that file
+        if 'SHELLDOC-IGNORE' in content and any(
+                self._isignoreline(line) for line in content.split('\n')):
+            return
+
+        funcdef = ShellFunction(self.filename)
+        linenum = 0
+        pos = 0
+        for candidate in ProcessFile.CANDIDATERE.finditer(content):
+            # the match starts at the newline before the line
+            line = candidate.group()[1:]
+            linenum += content.count('\n', pos, candidate.end())
+            pos = candidate.end()
+
+            annotation = candidate.group(1)
+            if annotation:
+                if not funcdef.docstart:
+                    funcdef.docstart = linenum
+                getattr(self, self.ANNOTATIONS[annotation])(funcdef,
+                                                            text=line)
+                continue
+
+            self._process_function(funcdef,
+                                   text=line,
+                                   linenum=linenum,
+                                   match=ProcessFile.FUNCTIONRE.match(line))
+
+            if self.skipsuperprivate and funcdef.isprivateandnotreplaceable():
+                pass
+            else:
+                self.functions.append(funcdef)
+            funcdef = ShellFunction(self.filename)
 
 
 class MarkdownReport:
@@ -321,34 +377,391 @@ def write_output(self):
                 outfile.write(function.getdocpage())
 
 
-def process_input(inputlist, skipprnorep):
-    """ take the input and loop around it """
+def is_shell_file(filename):
+    """ is this a file that shelldocs reads when it is in a directory? """
+    return str(filename).endswith('sh')
+
+
+def expand_input(inputname):
+    """ the shell files an input stands for: itself, or everything
+        in a directory that ends in sh """
+    if not os.path.isdir(inputname):
+        return [inputname]
+    filenames = []
+    for dirpath, dirnames, fnames in os.walk(inputname):  #pylint: disable=unused-variable
+        for fname in fnames:
+            if is_shell_file(fname):
+                filenames.append(pathlib.Path(dirpath).joinpath(fname))
+    return filenames
+
+
+class ParseCache:
+    ''' parsed functions and their lint results, by file contents
+
+        Everything lives in one file in the cache directory, read
+        once at the start of a run and written once at the end.
+        Only what this run used is written back, so the cache only
+        ever holds one tree's worth of files.
+
+        Besides the hash of its contents, the size and modification
+        time of every file are kept.  A file that still has the same
+        ones is not even read again. '''
+
+    # bump whenever what gets stored changes
+    FORMAT = 4
+
+    # a file modified this shortly before it was looked at might be
+    # modified again without its modification time changing, so its
+    # size and time are not trusted next time
+    RACY_NS = 2 * 1000 * 1000 * 1000
+
+    # a function is stored as a list of these, which is smaller and
+    # quicker to load than an object with names
+    FIELDS = ('audience', 'description', 'docstart', 'linenum', 'name',
+              'params', 'replacebool', 'replacerawtext', 'replacetext',
+              'returnt', 'stability', 'lintresults')
+
+    def __init__(self, directory, stamp):
+        self.directory = directory
+        self.stamp = stamp
+        self.filename = os.path.join(directory, 'shelldocs-cache.json')
+        self._entries = {}
+        self._files = {}
+        self._used = {}
+        self._seen = {}
+        try:
+            with open(self.filename, encoding='utf-8') as cachefile:
+                stored = json.load(cachefile)
+            if stored.get('format') == self.FORMAT and stored.get(
+                    'tool') == self.stamp:
+                self._entries = stored['entries']
+                self._files = stored['files']
+        except (OSError, ValueError, AttributeError, KeyError):
+            # missing or unusable: start from scratch
+            pass
+
+    @staticmethod
+    def key(digest, skipsuperprivate):
+        ''' the cache key for a file with the given content hash '''
+        return f"{digest}-{int(bool(skipsuperprivate))}"
+
+    def _functions(self, records, filename):
+        functions = []
+        for record in records:
+            # every attribute is in the record, so skip __init__
+            funcdef = ShellFunction.__new__(ShellFunction)
+            funcdef.__dict__ = dict(zip(self.FIELDS, record))
+            funcdef.filename = filename
+            functions.append(funcdef)
+        return functions
+
+    def _records(self, functions):
+        records = []
+        for funcdef in functions:
+            # fills in lintresults
+            funcdef.lint_messages()
+            records.append([getattr(funcdef, field) for field in self.FIELDS])
+        return records
+
+    def _lookup(self, path, stat, skipsuperprivate):
+        ''' the records of a file that has not changed since it was
+            last seen, or None '''
+        known = self._files.get(path)
+        if known is None or known[:2] != [stat.st_size, stat.st_mtime_ns]:
+            return None
+        key = self.key(known[2], skipsuperprivate)
+        records = self._entries.get(key)
+        if records is not None:
+            self._seen[path] = known
+            self._used[key] = records
+        return records
+
+    def parse_files(self, filenames, skipsuperprivate, jobs=1):
+        ''' parse_files(), but only the files not already in the cache
+            actually get parsed '''
+        started = time.time_ns()
+        results = [None] * len(filenames)
+        misses = []
+        for index, filename in enumerate(filenames):
+            path = os.path.abspath(filename)
+            try:
+                # before reading, so that a change while reading
+                # shows up as a different time next time
+                stat = os.stat(filename)
+                records = self._lookup(path, stat, skipsuperprivate)
+                if records is not None:
+                    results[index] = (self._functions(records, filename), [])
+                    continue
+                with open(filename, 'rb') as shellcode:
+                    content = shellcode.read()
+            except OSError:
+                results[index] = ([], [read_error(filename)])
+                continue
+            digest = hashlib.sha256(content).hexdigest()
+            if stat.st_mtime_ns < started - self.RACY_NS:
+                self._seen[path] = [stat.st_size, stat.st_mtime_ns, digest]
+            key = self.key(digest, skipsuperprivate)
+            records = self._entries.get(key)
+            if records is None:
+                misses.append((index, path, key, content))
+                continue
+            self._used[key] = records
+            results[index] = (self._functions(records, filename), [])
+
+        parsed = parse_files([filenames[miss[0]] for miss in misses],
+                             skipsuperprivate, jobs,
+                             [miss[3] for miss in misses])
+        for (index, path, key, _), (functions, errors) in zip(misses, parsed):
+            if errors:
+                # so that it is reported again next time
+                self._seen.pop(path, None)
+            else:
+                self._used[key] = self._records(functions)
+            results[index] = (functions, errors)
+        return results
+
+    def save(self):
+        ''' write back what this run used '''
+        if self._used == self._entries and self._seen == self._files:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, tmpname = tempfile.mkstemp(dir=self.directory,
+                                               suffix='.tmp')
+            with os.fdopen(handle, 'w', encoding='utf-8') as tmpfile:
+                # dumps(), not dump(): only dumps() has a C encoder
+                tmpfile.write(
+                    json.dumps({
+                        'format': self.FORMAT,
+                        'tool': self.stamp,
+                        'files': self._seen,
+                        'entries': self._used
+                    }))
+            os.replace(tmpname, self.filename)
+        except OSError as err:
+            # the cache is only there to save time
+            logging.warning("WARNING: Cannot write %s: %s", self.filename,
+                            err)
+
+
+def read_error(filename):
+    """ what to say about a file that could not be read (or decoded) """
+    return f"ERROR: Failed to read from file: {filename}. Skipping."
 
-    def call_process_file(filename, skipsuperprivate):
-        ''' handle building a ProcessFile '''
-        fileprocessor = ProcessFile(filename=filename,
-                                    skipsuperprivate=skipsuperprivate)
+
+def parse_file(filename, skipsuperprivate, content=None):
+    """ the functions in a file and any errors reading it.  If the
+        raw contents have already been read, they are used instead
+        of reading the file again. """
+    fileprocessor = ProcessFile(filename=filename,
+                                skipsuperprivate=skipsuperprivate)
+    if content is None:
         fileprocessor.process_file()
-        return fileprocessor.functions
+    else:
+        try:
+            # decoded the same way open() in process_file() would
+            text = io.TextIOWrapper(io.BytesIO(content)).read()
+        except UnicodeDecodeError:
+            return [], [read_error(filename)]
+        fileprocessor.process_text(text)
+    return fileprocessor.functions, fileprocessor.errors
+
+
+def usable_cpus():
+    """ how many CPUs this process may run on """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_files(filenames, skipsuperprivate, jobs=1, contents=None):
+    """ parse_file() every file, in order.  With more than one job,
+        the parsing is spread over a process pool; the results still
+        come back in the same order. """
+    if contents is None:
+        contents = [None] * len(filenames)
+    jobs = min(jobs, len(filenames))
+    if jobs <= 1:
+        return [
+            parse_file(name, skipsuperprivate, content)
+            for name, content in zip(filenames, contents)
+        ]
+
+    # multiprocessing is only loaded when it is going to be used
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    chunksize = max(1, len(filenames) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(parse_file,
+                         filenames, [skipsuperprivate] * len(filenames),
+                         contents,
+                         chunksize=chunksize))
+
+
+def process_groups(groups, skipprnorep, jobs=1, cache=None):
+    """ generate the sorted functions of each group of inputs
+
+        The files of all the groups are parsed up front, so that
+        they can be spread over the jobs.  Errors reading a file are
+        logged as its group comes up, in file order. """
+    groups = [[
+        filename for inputname in group
+        for filename in expand_input(inputname)
+    ] for group in groups]
+    filenames = [name for group in groups for name in group]
+    if cache is None:
+        parsed = parse_files(filenames, skipprnorep, jobs)
+    else:
+        parsed = cache.parse_files(filenames, skipprnorep, jobs)
+        cache.save()
+    parsed = iter(parsed)
+    for group in groups:
+        allfuncs = []
+        for _ in group:
+            functions, errors = next(parsed)
+            for error in errors:
+                logging.error("%s", error)
+            allfuncs.extend(functions)
+        yield sorted(allfuncs)
+
+
+def process_input(inputlist, skipprnorep, jobs=1):
+    """ take the input and loop around it """
+    return next(process_groups([inputlist], skipprnorep, jobs))
 
-    allfuncs = []
+
+def read_filelist(listname):
+    """ the file names in a list file (or stdin for '-'), one per line
+        or separated by NULs """
+    try:
+        if listname == '-':
+            data = sys.stdin.read()
+        else:
+            with open(listname, encoding='utf-8') as listfile:
+                data = listfile.read()
+    except OSError as err:
+        logging.error("ERROR: Failed to read file list: %s", err)
+        sys.exit(1)
+    if '\0' in data:
+        names = data.split('\0')
+    else:
+        names = data.splitlines()
+    return [name for name in names if name]
+
+
+def input_groups(inputlist):
+    """ split the inputs into groups that are processed together
+
+        Everything given directly with --input is one group, as it
+        always has been.  Every file named by a list ('-' or @listfile)
+        is a group of its own, so that its results are exactly what
+        running shelldocs on just that file would give. """
+    groups = []
+    direct = []
     for inputname in inputlist:
-        if pathlib.Path(inputname).is_dir():
-            for dirpath, dirnames, filenames in os.walk(inputname):  #pylint: disable=unused-variable
-                for fname in filenames:
-                    if fname.endswith('sh'):
-                        allfuncs = allfuncs + call_process_file(
-                            filename=pathlib.Path(dirpath).joinpath(fname),
-                            skipsuperprivate=skipprnorep)
+        if inputname == '-' or inputname.startswith('@'):
+            groups.extend([name] for name in read_filelist(
+                '-' if inputname == '-' else inputname[1:]))
         else:
-            allfuncs = allfuncs + call_process_file(
-                filename=inputname, skipsuperprivate=skipprnorep)
-    if allfuncs is None:
-        logging.error("ERROR: no functions found.")
+            if not direct:
+                groups.append(direct)
+            direct.append(inputname)
+    return groups
+
+
+def add_lines(ranges, start, end):
+    """ add the lines start to end to a list of (start, end) ranges,
+        merging them into the last range if they carry on from it """
+    if ranges and ranges[-1][1] >= start - 1:
+        ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+    else:
+        ranges.append((start, end))
+
+
+HUNKRE = re.compile(r"@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def diff_changes(diff):
+    """ the changed lines of every file in a unified diff, as
+        {filename: [(start, end), ...]} in the numbering of the new
+        file.  A removed line counts as a change to the line that
+        now takes its place. """
+    changes = {}
+    current = None
+    oldleft = newleft = 0
+    linenum = 0
+    for line in diff:
+        if oldleft > 0 or newleft > 0:
+            tag = line[:1]
+            if tag == '+':
+                add_lines(current, linenum, linenum)
+                linenum += 1
+                newleft -= 1
+            elif tag == '-':
+                add_lines(current, linenum, linenum)
+                oldleft -= 1
+            elif tag != '\\':
+                linenum += 1
+                oldleft -= 1
+                newleft -= 1
+            continue
+        if line.startswith('+++ '):
+            name = line[4:].rstrip('\n').split('\t')[0]
+            if name == '/dev/null':
+                # deleted: nothing left to lint
+                current = []
+                continue
+            if name.startswith('b/'):
+                name = name[2:]
+            current = changes.setdefault(name, [])
+            continue
+        match = HUNKRE.match(line)
+        if match and current is not None:
+            oldleft = int(match.group(1) or 1)
+            linenum = int(match.group(2))
+            newleft = int(match.group(3) or 1)
+            if newleft == 0:
+                # only removals: numbered from the line before
+                linenum += 1
+    return changes
+
+
+def read_diff(diffname):
+    """ diff_changes() of a diff file, or of stdin for '-' """
+    try:
+        if diffname == '-':
+            return diff_changes(sys.stdin)
+        with open(diffname, encoding='utf-8', errors='replace') as diff:
+            return diff_changes(diff)
+    except OSError as err:
+        logging.error("ERROR: Failed to read diff: %s", err)
         sys.exit(1)
 
-    allfuncs = sorted(allfuncs)
-    return allfuncs
+
+def line_range(text):
+    """ argparse type for FILE:START-END (or FILE:LINE) """
+    filename, sep, lines = text.rpartition(':')
+    start, _, end = lines.partition('-')
+    try:
+        start = int(start)
+        end = int(end or start)
+    except ValueError:
+        start = end = 0
+    if not sep or not filename or start < 1 or end < start:
+        raise ArgumentTypeError(f"expected FILE:START-END, not '{text}'")
+    return filename, start, end
+
+
+def changed_ranges(diffnames, linelist):
+    """ every changed range from the diffs and the FILE:START-END
+        arguments, as {filename: [(start, end), ...]} """
+    changes = {}
+    for diffname in diffnames or []:
+        for filename, ranges in read_diff(diffname).items():
+            changes.setdefault(filename, []).extend(ranges)
+    for filename, start, end in linelist or []:
+        changes.setdefault(filename, []).append((start, end))
+    return changes
 
 
 def getversion():
@@ -371,13 +784,22 @@ def getversion():
     return 'Unknown'
 
 
+def toolstamp():
+    """ the version of shelldocs plus a hash of its source, so that
+        a cache is never used by code that might parse differently """
+    with open(__file__, 'rb') as source:
+        digest = hashlib.sha256(source.read()).hexdigest()
+    return f"{getversion().strip()} {digest}"
+
+
 def process_arguments():
     ''' deal with parameters '''
     parser = ArgumentParser(
         prog='shelldocs',
         epilog="You can mark a file to be ignored by shelldocs by adding"
         " 'SHELLDOC-IGNORE' as comment in its own line. " +
-        "--input may be given multiple times.")
+        "--input may be given multiple times.  An --input of - reads a list"
+        " of files from stdin and @FILE reads one from FILE.")
     parser.add_argument("-o",
                         "--output",
                         dest="outfile",
@@ -385,13 +807,39 @@ def process_arguments():
                         type=str,
                         help="file to create",
                         metavar="OUTFILE")
+    parser.add_argument("--changed",
+                        dest="changed",
+                        action="append",
+                        type=line_range,
+                        help="only lint functions documented or defined "
+                        "within these lines",
+                        metavar="FILE:START-END")
+    parser.add_argument("--cache-dir",
+                        dest="cachedir",
+                        help="keep parsed files in DIR to speed up later runs",
+                        metavar="DIR")
+    parser.add_argument("--diff",
+                        dest="diff",
+                        action="append",
+                        help="only lint functions documented or defined "
+                        "within the lines this unified diff (- for stdin) "
+                        "changes",
+                        metavar="DIFFFILE")
     parser.add_argument("-i",
                         "--input",
                         dest="infile",
                         action="append",
                         type=str,
-                        help="file to read",
+                        help="file to read, - or @FILE for a list of files",
                         metavar="INFILE")
+    parser.add_argument("-j",
+                        "--jobs",
+                        dest="jobs",
+                        type=int,
+                        default=1,
+                        help="number of processes to parse files with "
+                        "(default: 1, 0 for one per CPU)",
+                        metavar="JOBS")
     parser.add_argument("--skipprnorep",
                         dest="skipprnorep",
                         action="store_true",
@@ -414,7 +862,17 @@ def process_arguments():
         print(getversion())
         sys.exit(0)
 
-    if options.infile is None:
+    if options.jobs < 0:
+        parser.error("--jobs cannot be negative")
+    if options.jobs == 0:
+        options.jobs = usable_cpus()
+
+    if options.diff and '-' in options.diff and options.infile and \
+            '-' in options.infile:
+        parser.error("--diff and --input cannot both read from stdin")
+    if options.diff or options.changed:
+        options.lint = True
+    elif options.infile is None:
         parser.error("At least one input file needs to be supplied")
     elif options.outfile is None and options.lint is None:
         parser.error(
@@ -429,11 +887,38 @@ def main():
 
     options = process_arguments()
 
-    allfuncs = process_input(options.infile, options.skipprnorep)
-
-    if options.lint:
-        for funcs in allfuncs:
-            funcs.lint()
+    allfuncs = []
+    cache = None
+    if options.cachedir is not None:
+        cache = ParseCache(options.cachedir, toolstamp())
+
+    changes = None
+    if options.diff or options.changed:
+        changes = {}
+        changedfiles = []
+        for filename, ranges in changed_ranges(options.diff,
+                                               options.changed).items():
+            abspath = os.path.abspath(filename)
+            if abspath not in changes:
+                changedfiles.append(filename)
+            changes.setdefault(abspath, []).extend(ranges)
+
+    if options.infile is not None:
+        groups = input_groups(options.infile)
+    else:
+        # just the shell files that changed
+        groups = [[filename]
+                  for filename in changedfiles
+                  if is_shell_file(filename)]
+
+    for funcs in process_groups(groups, options.skipprnorep, options.jobs,
+                                cache):
+        if options.lint:
+            for function in funcs:
+                if changes is None or function.overlaps(
+                        changes.get(os.path.abspath(function.filename), [])):
+                    function.lint()
+        allfuncs.extend(funcs)
 
     if options.outfile:
         mdreport = MarkdownReport(allfuncs, filename=options.outfile)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Micro-benchmark for shelldocs.ProcessFile.process_file
+
+    Parses the shell code in this source tree (plus a few odd cases)
+    with the two-read, every-prefix-on-every-line parser that
+    process_file replaced and with process_file itself, checks that
+    they find the same functions, and reports lines per second:
+
+        python3 parse_benchmark.py [copies]
+"""
+
+import pathlib
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, str(pathlib.Path(__file__).resolve().parents[2] / 'main' / 'python'))
+# pylint: disable=wrong-import-position
+import shelldocs
+# pylint: enable=wrong-import-position
+
+TOPDIR = pathlib.Path(__file__).resolve().parents[4]
+
+ODDITIES = ('#!/bin/bash\r\n'
+            '## @description  windows line endings\r\n'
+            '## @audience public\r\n'
+            'function crlf {\r\n'
+            '}\r\n'
+            '## @paramx no space after the tag\n'
+            '## @stability   stable\n'
+            'functions=(a b)\n'
+            'ünïcode () {\n'
+            '}\n'
+            '## @replaceable yes\x0c still the same line\n'
+            'function() {\n'
+            '}\n'
+            '   indented() {\n'
+            '}\n'
+            '# SHELLDOC-IGNORE is not alone on this line\n'
+            'function last()')
+
+
+def old_process_file(filename, skipsuperprivate):
+    """ ProcessFile.process_file as it used to be """
+    fileprocessor = shelldocs.ProcessFile(filename=filename,
+                                          skipsuperprivate=skipsuperprivate)
+    mapping = {
+        '## @description': '_process_description',
+        '## @audience': '_process_audience',
+        '## @stability': '_process_stability',
+        '## @replaceable': '_process_replaceable',
+        '## @param': '_process_param',
+        '## @return': '_process_return',
+    }
+    with open(filename) as input_file:  #pylint: disable=unspecified-encoding
+        for line in input_file:
+            if line.startswith("#") and line[1:].strip() == "SHELLDOC-IGNORE":
+                return []
+    functions = []
+    with open(filename, "r") as shellcode:  #pylint: disable=unspecified-encoding
+        funcdef = shelldocs.ShellFunction(filename)
+        linenum = 0
+        for line in shellcode:
+            linenum = linenum + 1
+            for text, method in mapping.items():
+                if line.startswith(text):
+                    getattr(fileprocessor, method)(funcdef, text=line)
+            if line.startswith('function') or \
+               fileprocessor.FUNCTIONRE.match(line):
+                funcre = fileprocessor.FUNCTIONRE
+                if funcre.match(line):
+                    definition = funcre.match(line).groups()[0]
+                else:
+                    definition = line.split()[1]
+                funcdef.name = definition.replace("(", "").replace(")", "")
+                funcdef.linenum = linenum
+                if not (skipsuperprivate
+                        and funcdef.isprivateandnotreplaceable()):
+                    functions.append(funcdef)
+                funcdef = shelldocs.ShellFunction(filename)
+    return functions
+
+
+def new_process_file(filename, skipsuperprivate):
+    """ ProcessFile.process_file as it is now """
+    fileprocessor = shelldocs.ProcessFile(filename=filename,
+                                          skipsuperprivate=skipsuperprivate)
+    fileprocessor.process_file()
+    return fileprocessor.functions
+
+
+def corpus(workdir):
+    """ every shell file in the source tree, and the odd cases """
+    files = [
+        path for path in TOPDIR.rglob('*.sh')
+        if path.is_file() and not re.search(r'\.(orig|rej)$', str(path))
+    ]
+    oddfile = pathlib.Path(workdir, 'oddities.sh')
+    with open(oddfile, 'w', encoding='utf-8', newline='') as oddities:
+        oddities.write(ODDITIES)
+    files.append(oddfile)
+    return files
+
+
+def timed(parser, files, copies):
+    """ how long it takes to parse every file copies times """
+    start = time.perf_counter()
+    for _ in range(copies):
+        for filename in files:
+            parser(filename, False)
+    return time.perf_counter() - start
+
+
+def main():
+    """ run both versions and report the times """
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as workdir:
+        files = corpus(workdir)
+        lines = 0
+        for filename in files:
+            with open(filename, 'rb') as shellcode:
+                lines += shellcode.read().count(b'\n') + 1
+            for skip in (False, True):
+                old = [vars(func) for func in old_process_file(filename, skip)]
+                new = [vars(func) for func in new_process_file(filename, skip)]
+                # the old parser did not know where doc blocks start
+                for func in new:
+                    func['docstart'] = 0
+                assert old == new, filename
+
+        old = timed(old_process_file, files, copies)
+        new = timed(new_process_file, files, copies)
+    lines *= copies
+    print(f"{len(files)} files, {lines} lines")
+    print(f"old: {old * 1000:8.1f}ms {lines / old:12.0f} lines/s")
+    print(f"new: {new * 1000:8.1f}ms {lines / new:12.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
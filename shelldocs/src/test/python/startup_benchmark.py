@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Startup benchmark for shelldocs
+
+    The precommit plugin runs shelldocs once per shell file, so
+    its startup is paid over and over.  Times -V, --help and linting
+    a single file, and lists the slowest imports as reported by
+    python -X importtime:
+
+        python3 startup_benchmark.py [runs]
+"""
+
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN = pathlib.Path(__file__).resolve().parents[2].joinpath('main')
+SCRIPT = MAIN.joinpath('python', 'shelldocs.py')
+SHELLFILE = MAIN.parents[2].joinpath('precommit', 'src', 'main', 'shell',
+                                     'core.d', '01-common.sh')
+
+COMMANDS = {
+    '-V': ['-V'],
+    '--help': ['--help'],
+    '--lint (one file)': ['--lint', '--input', str(SHELLFILE)],
+}
+
+
+def timed(args, runs):
+    """ the median wall time of running python with args runs times """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args,
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL,
+                       check=False)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def importtimes(args, count=15):
+    """ the imports with the largest cumulative time, in microseconds """
+    result = subprocess.run([sys.executable, '-X', 'importtime',
+                             str(SCRIPT)] + args,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            text=True,
+                            check=False)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        imports.append((int(cumulative), name.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    """ run the commands and report the times """
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'python -c pass':>18}: "
+          f"{timed(['-c', 'pass'], runs) * 1000:7.1f}ms")
+    for name, args in COMMANDS.items():
+        print(f"{name:>18}: {timed([str(SCRIPT)] + args, runs) * 1000:7.1f}ms")
+
+    print("\nslowest imports for --lint (cumulative):")
+    for cumulative, name in importtimes(COMMANDS['--lint (one file)']):
+        print(f"{cumulative / 1000:8.1f}ms {name}")
+
+
+if __name__ == "__main__":
+    main()
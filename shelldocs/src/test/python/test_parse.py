@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" The single-pass parser in ProcessFile.process_file
+
+        python3 -m pytest test_parse.py
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from parse_benchmark import (ODDITIES, corpus, new_process_file,
+                             old_process_file)
+
+
+class TestParse(unittest.TestCase):
+    """ process_file finds exactly what the old parser did """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = pathlib.Path(tmpdir.name)
+
+    def write(self, content, name='test.sh'):
+        """ a shell file, written exactly as given """
+        path = self.tmpdir / name
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            output.write(content)
+        return path
+
+    def assertSameParse(self, filename):  # pylint: disable=invalid-name
+        """ the old and new parsers agree, with and without skipping
+            private functions """
+        for skip in (False, True):
+            new = [vars(func) for func in new_process_file(filename, skip)]
+            # the old parser did not know where doc blocks start
+            for func in new:
+                func['docstart'] = 0
+            self.assertEqual(
+                new, [vars(func) for func in old_process_file(filename, skip)])
+
+    def test_oddities(self):
+        """ line endings, odd function lines and unicode """
+        filename = self.write(ODDITIES)
+        self.assertSameParse(filename)
+        functions = new_process_file(filename, False)
+        self.assertEqual([(func.name, func.linenum) for func in functions],
+                         [('crlf', 4), ('b', 8), ('ünïcode', 9),
+                          ('function', 12), ('last', 17)])
+        self.assertEqual(functions[0].audience, 'Public')
+
+    def test_ignored(self):
+        """ a marker on a line of its own skips the whole file, wherever
+            it is """
+        for marker in ('# SHELLDOC-IGNORE', '#SHELLDOC-IGNORE  ',
+                       '#\tSHELLDOC-IGNORE\r'):
+            filename = self.write(
+                f'function early {{\n}}\n{marker}\nfunction late {{\n}}\n')
+            self.assertEqual(new_process_file(filename, False), [])
+            self.assertSameParse(filename)
+
+    def test_annotations(self):
+        """ every annotation lands on the function that follows it """
+        filename = self.write('#!/usr/bin/env bash\n'
+                              '## @description  first line\n'
+                              '## @description  second line\n'
+                              '## @audience     private\n'
+                              '## @stability    evolving\n'
+                              '## @replaceable  no\n'
+                              '## @param        one\n'
+                              '## @param        two\n'
+                              '## @return       nothing\n'
+                              'private_function () {\n'
+                              '  : ## @audience  not an annotation\n'
+                              '}\n')
+        functions = new_process_file(filename, False)
+        self.assertEqual(len(functions), 1)
+        func = functions[0]
+        self.assertEqual(
+            (func.name, func.linenum, func.audience, func.stability,
+             func.replacebool, func.params, func.returnt, func.description),
+            ('private_function', 10, 'Private', 'Evolving', False,
+             ['one', 'two'], ['nothing'], ['first line', 'second line']))
+        self.assertEqual(new_process_file(filename, True), [])
+        self.assertSameParse(filename)
+
+    def test_source_tree(self):
+        """ every shell file in this source tree """
+        for filename in corpus(self.tmpdir):
+            with self.subTest(filename=filename):
+                self.assertSameParse(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
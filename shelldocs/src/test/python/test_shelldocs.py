@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" shelldocs lint runs over several files
+
+        python3 -m pytest test_shelldocs.py
+"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SHELLDOCS = pathlib.Path(
+    __file__).resolve().parents[2] / 'main' / 'python' / 'shelldocs.py'
+
+UNDOCUMENTED = '#!/usr/bin/env bash\nfunction undocumented {\n  :\n}\n'
+
+DOCUMENTED = '''#!/usr/bin/env bash
+## @description  does nothing
+## @audience     public
+## @stability    stable
+## @replaceable  no
+function documented {
+  :
+}
+'''
+
+IGNORED = '#!/usr/bin/env bash\n# SHELLDOC-IGNORE\n' + UNDOCUMENTED
+
+
+class TestLint(unittest.TestCase):
+    """ lint mode, as precommit runs it """
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.workdir.cleanup)
+
+    def write(self, name, content):
+        """ create a file in the work directory """
+        path = os.path.join(self.workdir.name, name)
+        with open(path, 'wb') as output:
+            output.write(content.encode('utf-8') if isinstance(
+                content, str) else content)
+        return path
+
+    def shelldocs(self, *args, stdin=''):
+        """ run shelldocs, returning what it logged """
+        env = dict(os.environ, PYTHONUTF8='1')
+        result = subprocess.run([sys.executable, str(SHELLDOCS)] + list(args),
+                                input=stdin,
+                                capture_output=True,
+                                text=True,
+                                cwd=self.workdir.name,
+                                env=env,
+                                check=False)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stderr.splitlines()
+
+    def test_list_matches_single_runs(self):
+        """ a list gives what one run per file would, in order """
+        names = [
+            self.write('a.sh', UNDOCUMENTED),
+            self.write('b.sh', DOCUMENTED),
+            self.write('c.sh', IGNORED),
+            self.write('d.sh', UNDOCUMENTED.replace('undocumented', 'other')),
+        ]
+        expected = []
+        for name in names:
+            expected.extend(self.shelldocs('--lint', '--input', name))
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(
+            self.shelldocs('--lint', '--input', '-', stdin='\0'.join(names)),
+            expected)
+        listfile = self.write('files.txt', '\n'.join(names) + '\n')
+        self.assertEqual(self.shelldocs('--lint', '--input', '@' + listfile),
+                         expected)
+
+    def test_empty_list(self):
+        """ nothing to do is not an error; precommit relies on this to
+            tell a shelldocs that can read lists from one that cannot """
+        self.assertEqual(self.shelldocs('--lint', '--input', '-'), [])
+
+    def test_missing_file(self):
+        """ a file that is not there is reported and the rest of the list
+            still gets linted """
+        missing = os.path.join(self.workdir.name, 'missing.sh')
+        last = self.write('last.sh', UNDOCUMENTED)
+        self.assertEqual(
+            self.shelldocs('--lint',
+                           '--input',
+                           '-',
+                           stdin='\0'.join([missing, last])),
+            [
+                f'ERROR: Failed to read from file: {missing}. Skipping.',
+                f'{last}:2:ERROR: function undocumented has no @audience',
+                f'{last}:2:ERROR: function undocumented has no @stability',
+            ])
+
+    def test_undecodable_file(self):
+        """ a file that is not UTF-8 is reported and the rest still
+            get linted """
+        first = self.write('first.sh', UNDOCUMENTED)
+        broken = self.write('broken.sh', b'#!/bin/sh\n\xff\xfe\xfa\n')
+        last = self.write('last.sh', UNDOCUMENTED)
+        self.assertEqual(
+            self.shelldocs('--lint',
+                           '--input',
+                           '-',
+                           stdin='\0'.join([first, broken, last])),
+            [
+                f'{first}:2:ERROR: function undocumented has no @audience',
+                f'{first}:2:ERROR: function undocumented has no @stability',
+                f'ERROR: Failed to read from file: {broken}. Skipping.',
+                f'{last}:2:ERROR: function undocumented has no @audience',
+                f'{last}:2:ERROR: function undocumented has no @stability',
+            ])
+
+
+class TestJobs(unittest.TestCase):
+    """ parsing with several processes """
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.workdir.cleanup)
+        self.tree = pathlib.Path(self.workdir.name, 'tree')
+        for num in range(20):
+            subdir = self.tree / f'd{num % 3}'
+            subdir.mkdir(parents=True, exist_ok=True)
+            text = DOCUMENTED if num % 2 else UNDOCUMENTED
+            (subdir / f'f{num}.sh').write_text(
+                text.replace('documented', f'documented{num}'),
+                encoding='utf-8')
+        (self.tree / 'd0' / 'broken.sh').write_bytes(b'\xff\xfe\n')
+
+    def shelldocs(self, *args):
+        """ run shelldocs over the tree, returning the exit code, what
+            it logged and the markdown it wrote """
+        output = pathlib.Path(self.workdir.name, 'out.md')
+        result = subprocess.run([
+            sys.executable,
+            str(SHELLDOCS), '--lint', '--input',
+            str(self.tree), '--output',
+            str(output)
+        ] + list(args),
+                                capture_output=True,
+                                text=True,
+                                env=dict(os.environ, PYTHONUTF8='1'),
+                                check=False)
+        markdown = output.read_text(
+            encoding='utf-8') if output.exists() else None
+        return result.returncode, result.stderr, markdown
+
+    def test_same_output(self):
+        """ any number of jobs gives exactly the same results """
+        serial = self.shelldocs()
+        self.assertEqual(serial[0], 0)
+        self.assertIn('broken.sh. Skipping.', serial[1])
+        self.assertIn('documented1', serial[2])
+        self.assertEqual(self.shelldocs('-j', '3'), serial)
+        self.assertEqual(self.shelldocs('--jobs', '0'), serial)
+
+    def test_negative_jobs(self):
+        """ a negative number of jobs is an error """
+        returncode, stderr, _ = self.shelldocs('-j', '-1')
+        self.assertEqual(returncode, 2)
+        self.assertIn('--jobs cannot be negative', stderr)
+
+
+class TestCache(unittest.TestCase):
+    """ --cache-dir """
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.workdir.cleanup)
+        self.tree = pathlib.Path(self.workdir.name, 'tree')
+        self.tree.mkdir()
+        for num in range(6):
+            text = DOCUMENTED if num % 2 else UNDOCUMENTED
+            self.write(f'f{num}.sh', text.replace('documented',
+                                                  f'documented{num}'))
+        (self.tree / 'broken.sh').write_bytes(b'\xff\xfe\n')
+        self.cachedir = pathlib.Path(self.workdir.name, 'cache')
+
+    def write(self, name, text):
+        """ write a file in the tree, an hour in the past so that its
+            size and time can be trusted """
+        path = self.tree / name
+        path.write_text(text, encoding='utf-8')
+        past = path.stat().st_mtime_ns - 3600 * 10**9
+        os.utime(path, ns=(past, past))
+        return path
+
+    def shelldocs(self, *args):
+        """ run shelldocs over the tree, returning what it logged and
+            the markdown it wrote """
+        output = pathlib.Path(self.workdir.name, 'out.md')
+        result = subprocess.run([
+            sys.executable,
+            str(SHELLDOCS), '--lint', '--input',
+            str(self.tree), '--output',
+            str(output)
+        ] + list(args),
+                                capture_output=True,
+                                text=True,
+                                env=dict(os.environ, PYTHONUTF8='1'),
+                                check=False)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stderr, output.read_text(encoding='utf-8')
+
+    def cached(self):
+        """ shelldocs with the cache """
+        return self.shelldocs('--cache-dir', str(self.cachedir))
+
+    def test_same_output(self):
+        """ filling and using the cache gives what no cache does """
+        uncached = self.shelldocs()
+        self.assertIn('broken.sh. Skipping.', uncached[0])
+        self.assertEqual(self.cached(), uncached)
+        self.assertTrue((self.cachedir / 'shelldocs-cache.json').exists())
+        self.assertEqual(self.cached(), uncached)
+
+    def test_changed_file(self):
+        """ a file that changed is parsed again """
+        self.cached()
+        self.write('f0.sh', DOCUMENTED.replace('documented', 'renamed'))
+        stderr, markdown = self.cached()
+        self.assertNotIn('documented0', stderr + markdown)
+        self.assertIn('renamed', markdown)
+        self.assertEqual((stderr, markdown), self.shelldocs())
+
+    def test_unchanged_file_not_read(self):
+        """ a file with the same size and time is taken from the cache
+            without looking at its contents """
+        self.cached()
+        path = self.tree / 'f0.sh'
+        stat = path.stat()
+        path.write_text(UNDOCUMENTED.replace('undocumented', 'sneakyname123'),
+                        encoding='utf-8')
+        self.assertEqual(path.stat().st_size, stat.st_size)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertNotIn('sneakyname', self.cached()[0])
+
+    def test_other_version(self):
+        """ what another shelldocs stored is ignored """
+        expected = self.cached()
+        cachefile = self.cachedir / 'shelldocs-cache.json'
+        stored = json.loads(cachefile.read_text(encoding='utf-8'))
+        for records in stored['entries'].values():
+            for record in records:
+                record[3] = 'bogus'
+        stored['tool'] = 'some other shelldocs'
+        cachefile.write_text(json.dumps(stored), encoding='utf-8')
+        self.assertEqual(self.cached(), expected)
+        cachefile.write_text('not json', encoding='utf-8')
+        self.assertEqual(self.cached(), expected)
+
+
+TWO = '''#!/usr/bin/env bash
+## @description  the first one
+function first {
+  :
+}
+
+function second {
+  :
+}
+'''
+
+
+class TestChanged(unittest.TestCase):
+    """ --diff and --changed """
+
+    setUp = TestLint.setUp
+    write = TestLint.write
+    shelldocs = TestLint.shelldocs
+
+    @staticmethod
+    def errors(name):
+        """ what lint says about a function in TWO """
+        linenum = {'first': 3, 'second': 7}[name]
+        return [
+            f'two.sh:{linenum}:ERROR: function {name} has no @{attribute}'
+            for attribute in ('audience', 'stability')
+        ]
+
+    def test_changed_lines(self):
+        """ only functions whose doc block or definition line is in a
+            range are linted """
+        self.write('two.sh', TWO)
+        self.assertEqual(self.shelldocs('--changed', 'two.sh:7'),
+                         self.errors('second'))
+        self.assertEqual(self.shelldocs('--changed', 'two.sh:2'),
+                         self.errors('first'))
+        self.assertEqual(self.shelldocs('--changed', 'two.sh:4-6'), [])
+        self.assertEqual(
+            self.shelldocs('--changed', 'two.sh:1-3', '--changed',
+                           'two.sh:7'),
+            self.errors('first') + self.errors('second'))
+
+    def test_diff(self):
+        """ a diff with context and a removed line """
+        self.write('two.sh', TWO)
+        diff = ('diff --git a/two.sh b/two.sh\n'
+                '--- a/two.sh\n'
+                '+++ b/two.sh\n'
+                '@@ -5,4 +5,3 @@\n'
+                ' }\n'
+                ' \n'
+                '-# old comment\n'
+                ' function second {\n')
+        diffname = self.write('changes.diff', diff)
+        self.assertEqual(self.shelldocs('--diff', diffname),
+                         self.errors('second'))
+        self.assertEqual(
+            self.shelldocs('--input', 'two.sh', '--diff', '-', stdin=diff),
+            self.errors('second'))
+
+    def test_diff_with_other_files(self):
+        """ only shell files named in a diff are linted """
+        self.write('app.js', 'render() {\n  return 1;\n}\n')
+        self.write('tool.sh', UNDOCUMENTED)
+        diff = ('diff --git a/app.js b/app.js\n'
+                '--- /dev/null\n'
+                '+++ b/app.js\n'
+                '@@ -0,0 +1,3 @@\n'
+                '+render() {\n'
+                '+  return 1;\n'
+                '+}\n'
+                'diff --git a/tool.sh b/tool.sh\n'
+                '--- /dev/null\n'
+                '+++ b/tool.sh\n'
+                '@@ -0,0 +1,4 @@\n'
+                '+#!/usr/bin/env bash\n'
+                '+function undocumented {\n'
+                '+  :\n'
+                '+}\n')
+        expected = [
+            'tool.sh:2:ERROR: function undocumented has no @audience',
+            'tool.sh:2:ERROR: function undocumented has no @stability',
+        ]
+        self.assertEqual(self.shelldocs('--diff', '-', stdin=diff), expected)
+        self.assertEqual(
+            self.shelldocs('--changed', 'app.js:1-3', '--changed',
+                           'tool.sh:2'), expected)
+
+    def test_bad_arguments(self):
+        """ bad ranges and two readers of stdin are errors """
+        for args in (['--changed', 'two.sh'], ['--changed', 'two.sh:5-2'],
+                     ['--diff', '-', '--input', '-']):
+            result = subprocess.run([sys.executable, str(SHELLDOCS)] + args,
+                                    input='',
+                                    capture_output=True,
+                                    text=True,
+                                    cwd=self.workdir.name,
+                                    check=False)
+            self.assertEqual(result.returncode, 2, args)
+
+
+if __name__ == '__main__':
+    unittest.main()